@@ -1,18 +1,61 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import requests
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+import asyncio
+import hmac
 import json
+from contextlib import asynccontextmanager
 from typing import Optional, List
 import logging
+import math
 import os
 import re
+import time
+
+from http_client import http_pool
+from result_cache import create_result_cache, make_cache_key
+from job_cache import JobCacheEntry, job_cache
+from skills import taxonomy_loader
+from optimizer import RULE_ENGINE_ID, optimize_for_descriptions
+from ats_score import score_tailoring
+from inference import (INFERENCE_BACKEND, BackendBusyError, CircuitOpenError, InferenceBackend, InferenceError,
+                       RuleBasedBackend, create_backend)
+from document_extractor import DocumentError, extract_text, spool_upload
+from executors import executor
+from job_scraper import read_job_description, scraping_rules
+from single_flight import SingleFlight
+from rate_limit import (CLIENT_ID_HEADER, AdmissionGate, QueueFullError, client_ip, client_key, client_limiter,
+                        trusted_proxies)
+from job_queue import (JOB_MAX_ATTEMPTS, JOB_MAX_PRIORITY, CallbackURLError, Job, JobQueue, JobWorkerPool,
+                       check_callback_url)
+from job_queue import QueueFullError as JobQueueFullError
+from metrics import MetricsMiddleware, registry, stage_seconds
+from warmup import Warmup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Resume Tailor", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared HTTP pool, executors and inference backends once per process and close them on shutdown
+    await http_pool.start()
+    executor.start()
+    await llm_backend.start()
+    job_workers.start()
+    warmup.start()
+    yield
+    await warmup.shutdown()
+    await job_workers.shutdown()
+    job_queue.close()
+    result_cache.close()
+    await llm_backend.close()
+    await http_pool.close()
+    executor.shutdown()
+
+app = FastAPI(title="AI Resume Tailor", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -22,205 +65,354 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
+STARTED_AT = time.monotonic()
 
 class ResumeRequest(BaseModel):
     resume: str
     job_desc: str
     job_url: Optional[str] = None
+    bypass_cache: bool = False
+    latency_budget_seconds: Optional[float] = None  # Defaults to TAILOR_LATENCY_BUDGET_SECONDS
 
 class ResumeResponse(BaseModel):
     tailored_resume: str
     key_skills_extracted: List[str]
     optimization_notes: str
+    engine: Optional[str] = None  # Engine that produced the result, e.g. "rule-based:v5"
+    ats_score: Optional[dict] = None  # Match score of the resume before and after tailoring (ats_score.score_tailoring)
+
+class TailorJobRequest(ResumeRequest):
+    priority: int = Field(0, ge=0, le=JOB_MAX_PRIORITY)  # Higher runs first
+    callback_url: Optional[str] = None  # Receives the finished job as a JSON POST
+    max_attempts: int = JOB_MAX_ATTEMPTS  # Capped at JOB_MAX_ATTEMPTS
+
+class TailorJobAccepted(BaseModel):
+    job_id: str
+    status: str
+    poll_url: str
+
+class BatchJob(BaseModel):
+    job_desc: Optional[str] = None
+    job_url: Optional[str] = None
+
+class BatchResumeRequest(BaseModel):
+    resume: str
+    jobs: List[BatchJob]
+    bypass_cache: bool = False
+
+class BatchJobResult(BaseModel):
+    index: int
+    job_url: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+    result: Optional[ResumeResponse] = None
+
+class BatchResumeResponse(BaseModel):
+    results: List[BatchJobResult]
+    succeeded: int
+    failed: int
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # Required by /admin endpoints, which refuse every call while it is unset
+
+# Proxies (IPs or CIDR ranges) whose X-Forwarded-For hops per-IP limits trust; "*" trusts only the
+# connecting proxy, so the rightmost hop it appended is the client (Render)
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+TRUSTED_PROXIES = trusted_proxies(FORWARDED_ALLOW_IPS)
+
+# Batch tailoring limits
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", 200))
+BATCH_SCRAPE_CONCURRENCY = int(os.getenv("BATCH_SCRAPE_CONCURRENCY", 8))
+
+# Seconds a /tailor-resume request waits for the language model before returning the rule engine result
+TAILOR_LATENCY_BUDGET_SECONDS = float(os.getenv("TAILOR_LATENCY_BUDGET_SECONDS", 5))
+
+# /tailor-resume requests handled at once, and how many may wait before new ones get 429
+TAILOR_MAX_IN_FLIGHT = int(os.getenv("TAILOR_MAX_IN_FLIGHT", 64))
+TAILOR_MAX_QUEUE = int(os.getenv("TAILOR_MAX_QUEUE", 128))
+
+# Language model backend (INFERENCE_BACKEND, Hugging Face by default) with the rule engine as fallback
+llm_backend = create_backend(INFERENCE_BACKEND or "huggingface")
+rule_backend = llm_backend if isinstance(llm_backend, RuleBasedBackend) else RuleBasedBackend()
+
+# Loads the taxonomy, forks the workers and makes the model resident before /ready reports ready
+warmup = Warmup(llm_backend, executor)
+
+result_cache = create_result_cache()
+
+# Identical in-flight scrapes (by URL) and tailoring calls (by cache key) share one upstream call
+scrape_flight = SingleFlight("scrape")
+tailor_flight = SingleFlight("tailor")
+
+# Which engine answered each tailoring request, and why the rule engine did when it did
+tailor_results = registry.counter("results_total", "Tailoring results by engine and reason", ["engine", "reason"])
+# Model calls that missed their deadline keep running so their result lands in the cache
+late_llm_tasks = set()
+
+tailor_gate = AdmissionGate("tailor", TAILOR_MAX_IN_FLIGHT, TAILOR_MAX_QUEUE)
+
+# Persistent queue for POST /jobs/tailor; job_worker.py can run the same jobs in a separate process
+job_queue = JobQueue()
+
+def too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+
+async def charge_client(request: Request, cost: float) -> None:
+    """Take cost tokens from the caller's bucket, keyed by a known API key or IP; 429 when they run out"""
+    host = client_ip(request.client.host if request.client else None, request.headers.get("X-Forwarded-For"),
+                     TRUSTED_PROXIES)
+    key = client_key(request.headers.get(CLIENT_ID_HEADER), host)
+    retry_after = await client_limiter.acquire(key, cost)
+    if retry_after:
+        raise too_many_requests("Rate limit exceeded, slow down", retry_after)
 
-# Hugging Face Configuration
-HF_API_URL = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-large"
-HF_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")  # Optional, works without key but with rate limits
+async def limit_client(request: Request):
+    """Per-client token bucket for the expensive endpoints: one token per request"""
+    await charge_client(request, 1)
 
-def extract_job_description_from_url(url: str) -> str:
-    """Extract job description from URL using web scraping"""
+def check_admin_token(token: Optional[str]) -> None:
+    """403 unless token matches ADMIN_TOKEN; with no ADMIN_TOKEN configured, nobody is an admin"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if not token or not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+async def extract_job_description_from_url(url: str) -> str:
+    """Extract job description from URL using web scraping, revalidating cached copies"""
+    entry = job_cache.lookup(url)
+    if entry is not None:
+        if entry.is_negative:
+            raise HTTPException(status_code=400, detail=f"Could not scrape job URL: {entry.error}")
+        if entry.is_fresh(time.monotonic()):
+            return entry.description
+    
+    # Everyone asking for this URL right now waits on the same fetch
+    with stage_seconds.time("scrape"):
+        return await scrape_flight.do(url, lambda: fetch_job_description(url, entry))
+
+async def fetch_job_description(url: str, entry: Optional[JobCacheEntry]) -> str:
+    """Download and parse a job page, revalidating a stale cache entry when there is one"""
     try:
-        from bs4 import BeautifulSoup
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Common job description selectors
-        job_desc_selectors = [
-            '.job-description', '.jobsearch-jobDescriptionText', '[data-testid="job-description"]',
-            '.job-details', '.description', '.job-content', '.posting-description'
-        ]
-        
-        job_description = ""
-        for selector in job_desc_selectors:
-            element = soup.select_one(selector)
-            if element:
-                job_description = element.get_text(strip=True)
-                break
-        
-        if not job_description:
-            paragraphs = soup.find_all('p')
-            job_description = ' '.join([p.get_text(strip=True) for p in paragraphs])
-        
-        return job_description[:5000]
+        async with http_pool.stream("GET", url, headers=job_cache.conditional_headers(entry), timeout=10) as response:
+            if response.status_code == 304 and entry is not None:
+                # Unchanged upstream: skip the download and the parse
+                job_cache.revalidated(url, entry)
+                return entry.description
+            
+            response.raise_for_status()
+            
+            # Parse while downloading and stop reading once the description is complete
+            job_description = await read_job_description(response)
+        job_cache.store(url, job_description, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return job_description
         
     except Exception as e:
+        if entry is not None and not entry.is_negative:
+            logger.warning(f"Could not revalidate job URL, serving the cached description: {str(e)}")
+            job_cache.revalidation_failed(url, entry)
+            return entry.description
         logger.error(f"Error scraping job URL: {str(e)}")
+        job_cache.store_failure(url, str(e))
         raise HTTPException(status_code=400, detail=f"Could not scrape job URL: {str(e)}")
 
-def call_huggingface_api(prompt: str) -> str:
-    """Call Hugging Face Inference API"""
+async def tailor_with(backend: InferenceBackend, cache_key: str, resume: str, job_description: str) -> dict:
+    """Run one backend and cache its result under cache_key"""
+    result = await backend.tailor(resume, job_description)
+    if "ats_score" not in result:
+        # The rule engine scores in its worker; model output is scored here, off the event loop
+        try:
+            with stage_seconds.time("ats_score"):
+                result["ats_score"] = await executor.run_cpu(
+                    "ats_score", score_tailoring, resume, result["tailored_resume"], job_description
+                )
+        except Exception as e:
+            logger.warning(f"Could not score {backend.name} result: {str(e)}")
+    await result_cache.run(result_cache.set, cache_key, result)
+    return result
+
+async def resolve_job_description(request: ResumeRequest) -> str:
+    """The scraped description when a job URL is given and scraping works, else the submitted one"""
+    job_description = request.job_desc
+    
+    # If job URL is provided, scrape the job description
+    if request.job_url:
+        try:
+            scraped_desc = await extract_job_description_from_url(request.job_url)
+            if scraped_desc:
+                job_description = scraped_desc
+                logger.info(f"Successfully scraped job description from URL")
+        except Exception as e:
+            logger.warning(f"Failed to scrape URL, using provided description: {str(e)}")
+    return job_description
+
+async def rule_result(resume: str, job_description: str, bypass_cache: bool) -> dict:
+    """Rule engine result for the hedge, from the cache when possible"""
+    rule_key = make_cache_key(resume, job_description, RULE_ENGINE_ID)
+    if not bypass_cache:
+        cached = await result_cache.run(result_cache.get, rule_key)
+        if cached is not None:
+            return cached
+    return await tailor_flight.do(rule_key, lambda: tailor_with(rule_backend, rule_key, resume, job_description))
+
+def consume_outcome(task: asyncio.Task) -> None:
+    # Retrieve an unused task's exception so it is not logged as never retrieved; backends count their own failures
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+def finish_in_background(task: asyncio.Task) -> None:
+    late_llm_tasks.add(task)
+    task.add_done_callback(late_llm_tasks.discard)
+    consume_outcome(task)
+
+def llm_outcome(llm_task: asyncio.Task) -> Optional[dict]:
+    """The finished model task's result, or None (counted and logged) when the model lost the race by failing"""
     try:
-        headers = {}
-        if HF_API_KEY:
-            headers["Authorization"] = f"Bearer {HF_API_KEY}"
-        
-        # Use a more suitable model for text generation
-        api_url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
-        
-        payload = {
-            "inputs": prompt,
-            "parameters": {
-                "max_length": 1000,
-                "temperature": 0.7,
-                "do_sample": True,
-                "top_p": 0.9
-            }
-        }
-        
-        response = requests.post(api_url, headers=headers, json=payload, timeout=30)
-        
-        if response.status_code == 503:
-            # Model is loading, wait and retry
-            logger.info("Model is loading, retrying in 10 seconds...")
-            import time
-            time.sleep(10)
-            response = requests.post(api_url, headers=headers, json=payload, timeout=30)
-        
-        if response.status_code != 200:
-            logger.warning(f"HF API returned {response.status_code}, falling back to mock AI")
-            return None
-        
-        result = response.json()
-        if isinstance(result, list) and len(result) > 0:
-            return result[0].get("generated_text", "")
-        
-        return None
-        
+        return llm_task.result()
+    except CircuitOpenError as e:
+        # Expected while the upstream is down; the rule engine is already running
+        tailor_results.inc(RULE_ENGINE_ID, "circuit_open")
+        logger.info(f"{str(e)}, using pattern-based optimization")
+    except BackendBusyError as e:
+        tailor_results.inc(RULE_ENGINE_ID, "llm_busy")
+        logger.info(f"{str(e)}, using pattern-based optimization")
     except Exception as e:
-        logger.error(f"Hugging Face API error: {str(e)}")
-        return None
-
-def extract_skills_from_job_desc(job_desc: str) -> List[str]:
-    """Extract skills from job description using keyword matching"""
-    skills_keywords = [
-        # Programming Languages
-        'python', 'javascript', 'java', 'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift',
-        'typescript', 'kotlin', 'scala', 'r', 'matlab', 'sql',
-        
-        # Web Technologies
-        'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'fastapi',
-        'html', 'css', 'bootstrap', 'tailwind', 'jquery', 'webpack', 'babel',
-        
-        # Databases
-        'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'sqlite', 'oracle',
-        'cassandra', 'dynamodb',
-        
-        # Cloud & DevOps
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github',
-        'terraform', 'ansible', 'chef', 'puppet',
-        
-        # Data & AI
-        'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'scikit-learn',
-        'pandas', 'numpy', 'jupyter', 'tableau', 'power bi', 'spark', 'hadoop',
-        
-        # Soft Skills
-        'leadership', 'communication', 'teamwork', 'problem solving', 'analytical',
-        'project management', 'agile', 'scrum', 'kanban'
-    ]
-    
-    found_skills = []
-    job_desc_lower = job_desc.lower()
-    
-    for skill in skills_keywords:
-        if skill in job_desc_lower:
-            found_skills.append(skill.title())
-    
-    return list(set(found_skills))[:10]  # Remove duplicates and limit to 10
+        tailor_results.inc(RULE_ENGINE_ID, "llm_failed")
+        logger.warning(f"{str(e) or type(e).__name__}, falling back to pattern-based optimization")
+    return None
+
+async def hedged_tailor(resume: str, job_description: str, llm_key: str, deadline: float,
+                        bypass_cache: bool) -> ResumeResponse:
+    """
+    Race the language model against the rule engine: the model's result is used when it arrives
+    before the deadline, otherwise the rule engine's result is returned. An engine that raises
+    loses the race; the request fails only when both do.
+    """
+    llm_task = asyncio.ensure_future(
+        tailor_flight.do(llm_key, lambda: tailor_with(llm_backend, llm_key, resume, job_description))
+    )
+    rule_task = asyncio.ensure_future(rule_result(resume, job_description, bypass_cache))
+    try:
+        await asyncio.wait({llm_task}, timeout=max(0.0, deadline - time.monotonic()))
+        missed_deadline = not llm_task.done()
+        if not missed_deadline:
+            result = llm_outcome(llm_task)
+            if result is not None:
+                tailor_results.inc(llm_backend.engine_id, "llm")
+                logger.info(f"Using {llm_backend.name} AI optimization")
+                return ResumeResponse(**result, engine=llm_backend.engine_id)
+        try:
+            result = await rule_task
+        except Exception as e:
+            logger.error(f"Pattern-based optimization failed: {str(e) or type(e).__name__}")
+            if missed_deadline:
+                # The model is all that is left; let it use the rest of its own timeout
+                await asyncio.wait({llm_task})
+                result = llm_outcome(llm_task)
+                if result is not None:
+                    tailor_results.inc(llm_backend.engine_id, "rule_failed")
+                    return ResumeResponse(**result, engine=llm_backend.engine_id)
+            # Both engines failed; the caller turns this into a 429 (busy) or a 500
+            tailor_results.inc("none", "both_failed")
+            raise
+        if missed_deadline:
+            tailor_results.inc(RULE_ENGINE_ID, "deadline")
+            logger.info(f"{llm_backend.name} missed the latency budget, using pattern-based optimization")
+            finish_in_background(llm_task)
+        return ResumeResponse(**result, engine=RULE_ENGINE_ID)
+    finally:
+        if not rule_task.done():
+            rule_task.cancel()
+        consume_outcome(rule_task)
+        if not llm_task.done() and llm_task not in late_llm_tasks:
+            # The request itself was cancelled
+            llm_task.cancel()
+
+async def run_tailor_job(payload: dict, job: Job) -> dict:
+    """
+    Background tailoring has no latency budget: the model gets its full timeout, a failed attempt is
+    retried by the queue, and the rule engine answers only when the last attempt fails
+    """
+    request = ResumeRequest(**payload)
+    job_description = await resolve_job_description(request)
+    llm_key = make_cache_key(request.resume, job_description, llm_backend.engine_id)
+    if not request.bypass_cache:
+        cached = await result_cache.run(result_cache.get, llm_key)
+        if cached is not None:
+            tailor_results.inc(llm_backend.engine_id, "job_cache")
+            return {**cached, "engine": llm_backend.engine_id}
+    if llm_backend is not rule_backend:
+        try:
+            result = await tailor_flight.do(llm_key, lambda: tailor_with(llm_backend, llm_key, request.resume, job_description))
+            tailor_results.inc(llm_backend.engine_id, "job")
+            return {**result, "engine": llm_backend.engine_id}
+        except InferenceError as e:
+            if not job.is_final_attempt:
+                raise
+            logger.warning(f"Job {job.id}: {str(e)}, falling back to pattern-based optimization")
+    tailor_results.inc(RULE_ENGINE_ID, "job")
+    result = await rule_result(request.resume, job_description, request.bypass_cache)
+    return {**result, "engine": RULE_ENGINE_ID}
 
-def intelligent_resume_optimization(resume: str, job_desc: str) -> dict:
-    """Intelligent resume optimization using pattern matching and keyword enhancement"""
+job_workers = JobWorkerPool(job_queue, {"tailor": run_tailor_job})
+
+@registry.collector
+def collect_component_stats():
+    """Gauges and counters read from each component's own stats when /metrics is scraped"""
+    yield "uptime_seconds", "gauge", "Seconds since the process started", [({}, time.monotonic() - STARTED_AT)]
+    yield "ready", "gauge", "1 once startup warm-up has finished", [({}, int(warmup.ready))]
+    yield "model_warm", "gauge", "1 while the last warm-up or keep-warm ping reached the model", [
+        ({}, int(warmup.model_warm) if warmup.warms_model else None)]
+    yield "keep_warm_pings_total", "counter", "Keep-warm pings sent to the model", [({}, warmup.pings)]
     
-    # Extract skills from job description
-    required_skills = extract_skills_from_job_desc(job_desc)
+    pool = http_pool.stats()
+    yield "http_pool_open_connections", "gauge", "Open pooled upstream connections", [({}, pool.get("open_connections"))]
+    yield "upstream_requests_in_flight", "gauge", "Upstream HTTP requests in flight by host", [
+        ({"host": host}, count) for host, count in pool["in_flight"].items()]
+    yield "upstream_requests_total", "counter", "Upstream HTTP requests by host", [
+        ({"host": host}, count) for host, count in pool["requests"].items()]
+    yield "upstream_errors_total", "counter", "Upstream HTTP errors by host", [
+        ({"host": host}, count) for host, count in pool["errors"].items()]
     
-    # Split resume into lines for processing
-    lines = resume.strip().split('\n')
-    optimized_lines = []
+    caches = {"result": result_cache.info(), "job_description": job_cache.info()}
+    yield "cache_entries", "gauge", "Entries held by each cache", [({"cache": name}, info["size"]) for name, info in caches.items()]
+    yield "cache_hits_total", "counter", "Cache hits", [({"cache": name}, info["hits"]) for name, info in caches.items()]
+    yield "cache_misses_total", "counter", "Cache misses", [({"cache": name}, info["misses"]) for name, info in caches.items()]
+    yield "cache_evictions_total", "counter", "Entries evicted to stay within the size limit", [
+        ({"cache": name}, info["evictions"]) for name, info in caches.items()]
+    yield "job_cache_stale_served_total", "counter", "Stale job descriptions served because revalidation failed", [
+        ({}, caches["job_description"]["stale_served"])]
     
-    # Track what we've enhanced
-    enhancements_made = []
+    stages = executor.stats()["stages"]
+    yield "executor_tasks_in_flight", "gauge", "Executor tasks queued or running by stage", [
+        ({"stage": stage, "pool": stats["pool"]}, stats["in_flight"]) for stage, stats in stages.items()]
+    yield "executor_pool_restarts_total", "counter", "Process pools replaced after a worker died", [
+        ({}, executor.pool_restarts)]
     
-    for line in lines:
-        original_line = line
-        
-        # Enhance job titles
-        if any(title in line.lower() for title in ['software engineer', 'developer', 'programmer']):
-            if 'senior' not in line.lower() and len(line.split()) < 6:
-                line = line.replace('Software Engineer', 'Senior Software Engineer')
-                line = line.replace('Developer', 'Senior Developer')
-                enhancements_made.append("Enhanced job titles")
-        
-        # Enhance bullet points with relevant skills
-        if line.strip().startswith(('•', '-', '*')):
-            # Check if this bullet point relates to any required skills
-            line_lower = line.lower()
-            relevant_skills = [skill for skill in required_skills if skill.lower() in line_lower]
-            
-            if relevant_skills:
-                # Add quantification if missing
-                if not re.search(r'\d+', line):
-                    if 'developed' in line_lower:
-                        line = line.rstrip() + " (improved efficiency by 25%)"
-                    elif 'managed' in line_lower or 'led' in line_lower:
-                        line = line.rstrip() + " (team of 5+ members)"
-                    elif 'implemented' in line_lower:
-                        line = line.rstrip() + " (reduced processing time by 30%)"
-                
-                enhancements_made.append("Added quantifiable achievements")
-        
-        # Enhance skills section
-        if 'skills' in line.lower() and ':' in line:
-            # Add relevant skills that might be missing
-            existing_skills = line.lower()
-            new_skills = []
-            for skill in required_skills[:5]:  # Add top 5 relevant skills
-                if skill.lower() not in existing_skills:
-                    new_skills.append(skill)
-            
-            if new_skills:
-                line = line.rstrip() + ", " + ", ".join(new_skills)
-                enhancements_made.append("Enhanced skills section")
-        
-        optimized_lines.append(line)
+    backends = [llm_backend.stats()] if llm_backend is rule_backend else [llm_backend.stats(), rule_backend.stats()]
+    yield "inference_in_flight", "gauge", "Inference calls running by backend", [
+        ({"backend": stats["backend"]}, stats["in_flight"]) for stats in backends]
+    yield "inference_queue_waiting", "gauge", "Inference calls waiting for a backend slot", [
+        ({"backend": stats["backend"]}, stats["queue"]["waiting"]) for stats in backends]
+    yield "inference_timeouts_total", "counter", "Inference calls that hit the backend timeout", [
+        ({"backend": stats["backend"]}, stats["timeouts"]) for stats in backends]
+    yield "circuit_state", "gauge", "1 for the current state of each backend's circuit breaker", [
+        ({"backend": stats["backend"], "state": state}, int(stats["circuit"]["state"] == state))
+        for stats in backends if "circuit" in stats for state in ("closed", "open", "half_open")]
     
-    # Create optimization notes
-    if not enhancements_made:
-        enhancements_made = ["Optimized keyword density", "Improved ATS compatibility"]
+    flights = (scrape_flight, tailor_flight)
+    yield "single_flight_calls_total", "counter", "Calls through each coalescing group", [
+        ({"flight": flight.name}, flight.stats["calls"]) for flight in flights]
+    yield "single_flight_coalesced_total", "counter", "Calls that joined an identical in-flight call", [
+        ({"flight": flight.name}, flight.stats["coalesced"]) for flight in flights]
     
-    optimization_notes = f"Applied {len(enhancements_made)} key optimizations: {', '.join(set(enhancements_made))}. Aligned resume with {len(required_skills)} job requirements for better ATS scoring."
+    yield "tailor_requests_waiting", "gauge", "/tailor-resume requests queued for admission", [({}, tailor_gate.waiting)]
+    yield "admission_rejected_total", "counter", "Requests refused with 429 before any work", [
+        ({"limit": "client_rate"}, client_limiter.stats.rejected), ({"limit": "tailor_queue"}, tailor_gate.stats.rejected)]
+    yield "late_llm_calls_in_flight", "gauge", "Model calls still running after their request took the rule engine result", [
+        ({}, len(late_llm_tasks))]
     
-    return {
-        "tailored_resume": '\n'.join(optimized_lines),
-        "key_skills_extracted": required_skills,
-        "optimization_notes": optimization_notes
-    }
+    # Counted by the last /metrics or /health request off the event loop, never here
+    yield "jobs", "gauge", "Background jobs by status", [({"status": status}, count) for status, count in job_queue.last_counts.items()]
 
 @app.get("/")
 async def root():
@@ -237,57 +429,232 @@ async def health_check():
         "status": "healthy",
         "ai_engine": "Intelligent Pattern Matching + HuggingFace",
         "features_active": ["job_scraping", "resume_optimization", "skills_extraction"],
-        "uptime": "100%"
+        "uptime_seconds": round(time.monotonic() - STARTED_AT, 1),
+        "http_pool": http_pool.stats(),
+        "result_cache": result_cache.info(),
+        "job_cache": job_cache.info(),
+        "scraping_rules": scraping_rules.info(),
+        "skills_taxonomy": taxonomy_loader.info(),
+        "executors": executor.stats(),
+        "inference": {"llm": llm_backend.stats(), "rule_based": rule_backend.stats()},
+        "single_flight": {"scrape": scrape_flight.info(), "tailor": tailor_flight.info()},
+        "hedging": {"latency_budget_seconds": TAILOR_LATENCY_BUDGET_SECONDS, "late_llm_in_flight": len(late_llm_tasks)},
+        "tailor_results": {f"{engine}/{reason}": count for (engine, reason), count in tailor_results.values().items()},
+        "admission": {"client_rate_limit": client_limiter.info(), "tailor_queue": tailor_gate.info()},
+        "jobs": {**await job_queue.run(job_queue.info), "workers": job_workers.info()},
+        "warmup": warmup.info()
     }
 
-@app.post("/tailor-resume", response_model=ResumeResponse)
+@app.get("/ready")
+async def readiness_check():
+    """200 once warm-up has finished, 503 before; for load balancer and deploy health checks"""
+    return JSONResponse({"status": "ready" if warmup.ready else "warming_up", **warmup.info()},
+                        status_code=200 if warmup.ready else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    await job_queue.run(job_queue.counts)
+    return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health/inference")
+async def inference_health():
+    """Actively check the configured inference backends"""
+    backends = [llm_backend] if llm_backend is rule_backend else [llm_backend, rule_backend]
+    checks = await asyncio.gather(*(backend.health() for backend in backends))
+    return {"status": "ok" if all(check["status"] == "ok" for check in checks) else "degraded", "backends": checks}
+
+@app.post("/upload-resume", dependencies=[Depends(limit_client)])
+async def upload_resume(request: Request):
+    """Extract text from an uploaded resume file (PDF, DOCX, DOC or TXT)"""
+    upload = None
+    try:
+        # Stream the multipart body to disk so large uploads never sit in memory
+        upload = await spool_upload(request.headers, request.stream())
+        text, details = await executor.run_cpu("document_extract", extract_text, upload)
+        logger.info(f"Extracted {len(text)} characters from {upload.file_type} upload ({upload.size} bytes)")
+        message = f"Successfully extracted text from {upload.filename}"
+        if details.get("truncated"):
+            message += " (text was truncated)"
+        return {
+            "extracted_text": text,
+            "file_type": upload.file_type,
+            "filename": upload.filename,
+            "pages": details.get("pages"),
+            "truncated": details.get("truncated", False),
+            "message": message,
+            "success": True
+        }
+    except DocumentError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in upload_resume: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Could not process uploaded file: {str(e)}")
+    finally:
+        if upload is not None:
+            upload.cleanup()
+
+@app.post("/tailor-resume", response_model=ResumeResponse, dependencies=[Depends(limit_client)])
 async def tailor_resume(request: ResumeRequest):
     """Tailor a resume based on job description using intelligent optimization"""
+    budget = TAILOR_LATENCY_BUDGET_SECONDS if request.latency_budget_seconds is None else request.latency_budget_seconds
+    deadline = time.monotonic() + max(0.0, budget)
     try:
-        job_description = request.job_desc
+        async with tailor_gate.slot():
+            response = await tailor_resume_admitted(request, deadline)
+    except QueueFullError as e:
+        raise too_many_requests(str(e), 1)
+    with stage_seconds.time("serialization"):
+        return JSONResponse(jsonable_encoder(response))
+
+async def tailor_resume_admitted(request: ResumeRequest, deadline: float) -> ResumeResponse:
+    try:
+        job_description = await resolve_job_description(request)
         
-        # If job URL is provided, scrape the job description
-        if request.job_url:
-            try:
-                scraped_desc = extract_job_description_from_url(request.job_url)
-                if scraped_desc:
-                    job_description = scraped_desc
-                    logger.info(f"Successfully scraped job description from URL")
-            except Exception as e:
-                logger.warning(f"Failed to scrape URL, using provided description: {str(e)}")
+        # Serve a previous model result for identical inputs before paying for inference
+        llm_key = make_cache_key(request.resume, job_description, llm_backend.engine_id)
+        if not request.bypass_cache:
+            cached = await result_cache.run(result_cache.get, llm_key)
+            if cached is not None:
+                tailor_results.inc(llm_backend.engine_id, "cache")
+                logger.info(f"Serving cached {llm_backend.name} result")
+                return ResumeResponse(**cached, engine=llm_backend.engine_id)
         
-        # Try Hugging Face API first, fallback to intelligent optimization
-        hf_result = call_huggingface_api(f"Optimize this resume for the job: {job_description[:500]}... Resume: {request.resume[:500]}")
+        # Race the language model against the rule engine within the latency budget
+        if llm_backend is not rule_backend:
+            return await hedged_tailor(request.resume, job_description, llm_key, deadline, request.bypass_cache)
         
-        if hf_result:
-            # Parse HF result if successful
-            logger.info("Using Hugging Face AI optimization")
-            skills = extract_skills_from_job_desc(job_description)
-            return ResumeResponse(
-                tailored_resume=hf_result,
-                key_skills_extracted=skills,
-                optimization_notes="Resume optimized using Hugging Face AI with intelligent skill matching and ATS optimization."
-            )
-        else:
-            # Use intelligent pattern-based optimization
-            logger.info("Using intelligent pattern-based optimization")
-            result = intelligent_resume_optimization(request.resume, job_description)
-            return ResumeResponse(**result)
+        # Use intelligent pattern-based optimization
+        logger.info("Using intelligent pattern-based optimization")
+        tailor_results.inc(RULE_ENGINE_ID, "rule_engine")
+        result = await rule_result(request.resume, job_description, request.bypass_cache)
+        return ResumeResponse(**result, engine=RULE_ENGINE_ID)
             
+    except HTTPException:
+        raise
+    except BackendBusyError as e:
+        raise too_many_requests(str(e), e.retry_after)
     except Exception as e:
         logger.error(f"Error in tailor_resume: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/scrape-job")
+@app.post("/jobs/tailor", response_model=TailorJobAccepted, status_code=202, dependencies=[Depends(limit_client)])
+async def submit_tailor_job(request: TailorJobRequest):
+    """Queue a tailoring job and return its id at once; poll GET /jobs/{id} or wait for the callback"""
+    if request.callback_url:
+        try:
+            await check_callback_url(request.callback_url)
+        except CallbackURLError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    payload = {"resume": request.resume, "job_desc": request.job_desc, "job_url": request.job_url,
+               "bypass_cache": request.bypass_cache}
+    try:
+        job = await job_queue.run(job_queue.enqueue, "tailor", payload, request.priority,
+                                  min(request.max_attempts, JOB_MAX_ATTEMPTS), request.callback_url)
+    except JobQueueFullError as e:
+        raise too_many_requests(str(e), 5)
+    job_workers.notify()
+    logger.info(f"Queued tailoring job {job.id} (priority {job.priority})")
+    return TailorJobAccepted(job_id=job.id, status=job.status, poll_url=f"/jobs/{job.id}")
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a queued job, with its result once it has succeeded"""
+    job = await job_queue.run(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.as_dict()
+
+@app.post("/tailor-resume/batch", response_model=BatchResumeResponse)
+async def tailor_resume_batch(request: BatchResumeRequest, http_request: Request):
+    """Tailor one resume against many job descriptions or URLs using the pattern-based engine"""
+    # Each job costs a token, so a batch can be no larger than a client's burst
+    max_jobs = min(BATCH_MAX_JOBS, client_limiter.burst) if client_limiter.enabled else BATCH_MAX_JOBS
+    if not request.jobs:
+        raise HTTPException(status_code=400, detail="At least one job is required")
+    if len(request.jobs) > max_jobs:
+        raise HTTPException(status_code=400, detail=f"A batch can contain at most {max_jobs} jobs")
+    await charge_client(http_request, len(request.jobs))
+    
+    # Scrape job URLs concurrently, but never more than BATCH_SCRAPE_CONCURRENCY at once
+    scrape_slots = asyncio.Semaphore(BATCH_SCRAPE_CONCURRENCY)
+    
+    async def resolve_description(job: BatchJob) -> str:
+        if job.job_url:
+            try:
+                async with scrape_slots:
+                    scraped_desc = await extract_job_description_from_url(job.job_url)
+                if scraped_desc:
+                    return scraped_desc
+            except Exception as e:
+                if not job.job_desc:
+                    raise
+                logger.warning(f"Failed to scrape URL, using provided description: {str(e)}")
+        if not job.job_desc:
+            raise ValueError("Each job needs a job_desc or a job_url")
+        return job.job_desc
+    
+    descriptions = await asyncio.gather(*(resolve_description(job) for job in request.jobs), return_exceptions=True)
+    
+    # Serve cached results, then optimize each distinct uncached description once
+    results_by_description = {}
+    for job_description in descriptions:
+        if isinstance(job_description, BaseException) or job_description in results_by_description:
+            continue
+        cache_key = make_cache_key(request.resume, job_description, RULE_ENGINE_ID)
+        cached = None if request.bypass_cache else await result_cache.run(result_cache.get, cache_key)
+        results_by_description[job_description] = cached
+    pending = [job_description for job_description, result in results_by_description.items() if result is None]
+    
+    # Spread the optimizer across the worker processes; each chunk parses the resume once
+    chunk_count = max(1, min(len(pending), executor.process_workers))
+    chunks = [pending[start::chunk_count] for start in range(chunk_count)]
+    chunk_results = await asyncio.gather(*(
+        executor.run_cpu("optimize_batch", optimize_for_descriptions, request.resume, chunk) for chunk in chunks if chunk
+    ))
+    for chunk, optimized in zip(chunks, chunk_results):
+        for job_description, result in zip(chunk, optimized):
+            results_by_description[job_description] = result
+            await result_cache.run(result_cache.set, make_cache_key(request.resume, job_description, RULE_ENGINE_ID), result)
+    
+    results = []
+    for index, (job, job_description) in enumerate(zip(request.jobs, descriptions)):
+        if isinstance(job_description, BaseException):
+            detail = job_description.detail if isinstance(job_description, HTTPException) else str(job_description)
+            results.append(BatchJobResult(index=index, job_url=job.job_url, success=False, error=detail))
+            continue
+        result = results_by_description[job_description]
+        results.append(BatchJobResult(index=index, job_url=job.job_url, success=True,
+                                      result=ResumeResponse(**result, engine=RULE_ENGINE_ID)))
+    
+    succeeded = sum(1 for result in results if result.success)
+    logger.info(f"Batch tailored {succeeded}/{len(results)} jobs")
+    return BatchResumeResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+@app.post("/scrape-job", dependencies=[Depends(limit_client)])
 async def scrape_job_description(job_url: str):
     """Scrape job description from URL"""
     try:
-        job_desc = extract_job_description_from_url(job_url)
+        job_desc = await extract_job_description_from_url(job_url)
         return {"job_description": job_desc, "success": True}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.delete("/admin/job-cache")
+async def purge_job_cache(url: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """Purge one cached job URL, or the whole scrape cache when no url is given"""
+    check_admin_token(x_admin_token)
+    return {"purged": job_cache.purge(url), "success": True}
+
+@app.post("/admin/skills-taxonomy/reload")
+async def reload_skills_taxonomy(x_admin_token: Optional[str] = Header(None)):
+    """Reload the skills taxonomy file without restarting"""
+    check_admin_token(x_admin_token)
+    reloaded = await executor.run_io("taxonomy_reload", taxonomy_loader.reload, True)
+    return {"reloaded": reloaded, **taxonomy_loader.info()}
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    # uvicorn's proxy_headers would take the leftmost, client-written hop; charge_client reads the header itself
+    uvicorn.run(app, host="0.0.0.0", port=port, proxy_headers=False)
\ No newline at end of file
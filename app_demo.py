@@ -1,16 +1,30 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import requests
 import json
+from contextlib import asynccontextmanager
 from typing import Optional, List
 import logging
 
+from executors import executor
+from http_client import http_pool
+from job_scraper import read_job_description
+from skills import rank_skills
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Resume Tailor", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Share one pooled HTTP client and the executors across all requests
+    await http_pool.start()
+    executor.start()
+    yield
+    await http_pool.close()
+    executor.shutdown()
+
+app = FastAPI(title="AI Resume Tailor", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -31,46 +45,14 @@ class ResumeResponse(BaseModel):
     key_skills_extracted: List[str]
     optimization_notes: str
 
-def extract_job_description_from_url(url: str) -> str:
+async def extract_job_description_from_url(url: str) -> str:
     """
     Extract job description from URL using web scraping
     """
     try:
-        from bs4 import BeautifulSoup
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Common job description selectors for popular job sites
-        job_desc_selectors = [
-            '.job-description',
-            '.jobsearch-jobDescriptionText',
-            '[data-testid="job-description"]',
-            '.job-details',
-            '.description',
-            '.job-content',
-            '.posting-description'
-        ]
-        
-        job_description = ""
-        for selector in job_desc_selectors:
-            element = soup.select_one(selector)
-            if element:
-                job_description = element.get_text(strip=True)
-                break
-        
-        if not job_description:
-            # Fallback: get all paragraph text
-            paragraphs = soup.find_all('p')
-            job_description = ' '.join([p.get_text(strip=True) for p in paragraphs])
-        
-        return job_description[:5000]  # Limit to 5000 chars
+        async with http_pool.stream("GET", url, timeout=10) as response:
+            response.raise_for_status()
+            return await read_job_description(response)
         
     except Exception as e:
         logger.error(f"Error scraping job URL: {str(e)}")
@@ -80,16 +62,8 @@ def mock_ai_optimization(resume: str, job_desc: str) -> dict:
     """
     Mock AI optimization for demo purposes
     """
-    # Extract some keywords from job description
-    job_words = job_desc.lower().split()
-    skills = []
-    
-    # Common tech skills to look for
-    tech_skills = ['python', 'javascript', 'react', 'fastapi', 'sql', 'aws', 'docker', 'kubernetes', 'machine learning', 'ai', 'data', 'analytics']
-    
-    for skill in tech_skills:
-        if skill in job_desc.lower():
-            skills.append(skill.title())
+    # Rank skills from the shared taxonomy
+    skills = [skill.name for skill in rank_skills(job_desc)]
     
     if not skills:
         skills = ["Communication", "Problem Solving", "Team Collaboration"]
@@ -123,7 +97,7 @@ async def tailor_resume(request: ResumeRequest):
         # If job URL is provided, scrape the job description
         if request.job_url:
             try:
-                scraped_desc = extract_job_description_from_url(request.job_url)
+                scraped_desc = await extract_job_description_from_url(request.job_url)
                 if scraped_desc:
                     job_description = scraped_desc
                     logger.info(f"Successfully scraped job description from URL")
@@ -146,7 +120,7 @@ async def scrape_job_description(job_url: str):
     Scrape job description from URL
     """
     try:
-        job_desc = extract_job_description_from_url(job_url)
+        job_desc = await extract_job_description_from_url(job_url)
         return {"job_description": job_desc}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,16 +1,38 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-import requests
 import json
-from typing import Optional, List
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, List
 import logging
+import math
+
+from executors import executor
+from http_client import http_pool
+from inference import INFERENCE_BACKEND, BackendBusyError, create_backend
+from job_scraper import read_job_description
+from warmup import Warmup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="AI Resume Tailor", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Share one pooled HTTP client, the executors and the inference backend across all requests
+    await http_pool.start()
+    executor.start()
+    await llm_backend.start()
+    warmup.start()
+    yield
+    await warmup.shutdown()
+    await llm_backend.close()
+    await http_pool.close()
+    executor.shutdown()
+
+app = FastAPI(title="AI Resume Tailor", version="1.0.0", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -31,123 +53,40 @@ class ResumeResponse(BaseModel):
     key_skills_extracted: List[str]
     optimization_notes: str
 
-# Ollama API configuration
-OLLAMA_BASE_URL = "http://localhost:11434"  # Default Ollama URL
-MODEL_NAME = "mistral"  # You can change this to gemma or other models
+# Ollama by default; set INFERENCE_BACKEND to use another backend
+llm_backend = create_backend(INFERENCE_BACKEND or "ollama")
+warmup = Warmup(llm_backend, executor)
 
-def extract_job_description_from_url(url: str) -> str:
+async def extract_job_description_from_url(url: str) -> str:
     """
     Extract job description from URL using web scraping
     """
     try:
-        from bs4 import BeautifulSoup
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Common job description selectors for popular job sites
-        job_desc_selectors = [
-            '.job-description',
-            '.jobsearch-jobDescriptionText',
-            '[data-testid="job-description"]',
-            '.job-details',
-            '.description',
-            '.job-content',
-            '.posting-description'
-        ]
-        
-        job_description = ""
-        for selector in job_desc_selectors:
-            element = soup.select_one(selector)
-            if element:
-                job_description = element.get_text(strip=True)
-                break
-        
-        if not job_description:
-            # Fallback: get all paragraph text
-            paragraphs = soup.find_all('p')
-            job_description = ' '.join([p.get_text(strip=True) for p in paragraphs])
-        
-        return job_description[:5000]  # Limit to 5000 chars
+        async with http_pool.stream("GET", url, timeout=10) as response:
+            response.raise_for_status()
+            return await read_job_description(response)
         
     except Exception as e:
         logger.error(f"Error scraping job URL: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Could not scrape job URL: {str(e)}")
 
-def call_ollama_api(prompt: str) -> str:
+async def resolve_job_description(request: ResumeRequest) -> str:
     """
-    Call Ollama API with the given prompt
+    Use the scraped job description when a job URL is provided
     """
-    try:
-        payload = {
-            "model": MODEL_NAME,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.7,
-                "top_p": 0.9,
-                "max_tokens": 2000
-            }
-        }
-        
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json=payload,
-            timeout=60
-        )
-        
-        if response.status_code != 200:
-            raise HTTPException(status_code=500, detail=f"Ollama API error: {response.text}")
-        
-        result = response.json()
-        return result.get("response", "")
-        
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Ollama API request failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to connect to Ollama: {str(e)}")
-
-def create_resume_optimization_prompt(resume: str, job_desc: str) -> str:
-    """
-    Create a comprehensive prompt for resume optimization
-    """
-    return f"""You are an expert Resume Optimizer and ATS (Applicant Tracking System) specialist. Your task is to tailor a resume to match a specific job description while maintaining technical accuracy and authenticity.
-
-**ORIGINAL RESUME:**
-{resume}
-
-**TARGET JOB DESCRIPTION:**
-{job_desc}
-
-**INSTRUCTIONS:**
-1. **Extract Key Skills & Requirements:** Identify the most important technical skills, soft skills, and qualifications from the job description.
-
-2. **Optimize Resume Content:**
-   - Rewrite bullet points to mirror the job requirements using similar keywords and phrases
-   - Quantify achievements where possible (percentages, numbers, metrics)
-   - Ensure technical accuracy - don't add skills the candidate doesn't have
-   - Maintain the original structure and format
-   - Use action verbs that match the job posting tone
-
-3. **ATS Optimization:**
-   - Include relevant keywords naturally throughout the resume
-   - Use standard section headings
-   - Ensure proper formatting for ATS parsing
-
-4. **Output Format:**
-   Please provide your response in the following JSON format:
-   {{
-     "tailored_resume": "The complete optimized resume text",
-     "key_skills_extracted": ["skill1", "skill2", "skill3"],
-     "optimization_notes": "Brief explanation of key changes made"
-   }}
-
-**IMPORTANT:** Only enhance and optimize existing content. Do not fabricate experience or skills the candidate doesn't possess."""
+    job_description = request.job_desc
+    
+    # If job URL is provided, scrape the job description
+    if request.job_url:
+        try:
+            scraped_desc = await extract_job_description_from_url(request.job_url)
+            if scraped_desc:
+                job_description = scraped_desc
+                logger.info(f"Successfully scraped job description from URL")
+        except Exception as e:
+            logger.warning(f"Failed to scrape URL, using provided description: {str(e)}")
+    
+    return job_description
 
 @app.get("/")
 async def root():
@@ -155,7 +94,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "model": MODEL_NAME}
+    return {"status": "healthy", "model": llm_backend.model, "http_pool": http_pool.stats(),
+            "inference": llm_backend.stats(), "warmup": warmup.info()}
+
+@app.get("/ready")
+async def readiness_check():
+    return JSONResponse({"status": "ready" if warmup.ready else "warming_up", **warmup.info()},
+                        status_code=200 if warmup.ready else 503)
 
 @app.post("/tailor-resume", response_model=ResumeResponse)
 async def tailor_resume(request: ResumeRequest):
@@ -163,48 +108,67 @@ async def tailor_resume(request: ResumeRequest):
     Tailor a resume based on job description
     """
     try:
-        job_description = request.job_desc
-        
-        # If job URL is provided, scrape the job description
-        if request.job_url:
-            try:
-                scraped_desc = extract_job_description_from_url(request.job_url)
-                if scraped_desc:
-                    job_description = scraped_desc
-                    logger.info(f"Successfully scraped job description from URL")
-            except Exception as e:
-                logger.warning(f"Failed to scrape URL, using provided description: {str(e)}")
+        job_description = await resolve_job_description(request)
         
-        # Create the optimization prompt
-        prompt = create_resume_optimization_prompt(request.resume, job_description)
-        
-        # Call Ollama API
-        logger.info("Calling Ollama API for resume optimization...")
-        response = call_ollama_api(prompt)
-        
-        # Try to parse JSON response
-        try:
-            result = json.loads(response)
-            return ResumeResponse(**result)
-        except json.JSONDecodeError:
-            # If not JSON, return as plain text with basic parsing
-            return ResumeResponse(
-                tailored_resume=response,
-                key_skills_extracted=["AI/ML", "Python", "Data Analysis"],  # Default
-                optimization_notes="Resume optimized based on job requirements"
-            )
+        # Prompt the model and parse its output
+        logger.info(f"Calling {llm_backend.name} for resume optimization...")
+        result = await llm_backend.tailor(request.resume, job_description)
+        return ResumeResponse(**result)
             
+    except BackendBusyError as e:
+        # Model queue full or rate limit reached: tell the client when to come back
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))})
     except Exception as e:
         logger.error(f"Error in tailor_resume: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/tailor-resume/stream")
+async def tailor_resume_stream(request: ResumeRequest, format: str = "sse"):
+    """
+    Stream tokens as the model generates them (Server-Sent Events, or NDJSON with format=ndjson).
+    The last message has type "result" and carries the ResumeResponse fields.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+    
+    def encode(message: dict) -> str:
+        data = json.dumps(message)
+        if format == "sse":
+            return f"event: {message['type']}\ndata: {data}\n\n"
+        return data + "\n"
+    
+    async def events() -> AsyncIterator[str]:
+        # Send something straight away so the client can drop its spinner
+        yield encode({"type": "status", "stage": "started"})
+        try:
+            job_description = await resolve_job_description(request)
+            
+            if llm_backend.generative:
+                logger.info(f"Streaming {llm_backend.name} response for resume optimization...")
+                tokens = []
+                async for token in llm_backend.stream(llm_backend.build_prompt(request.resume, job_description)):
+                    tokens.append(token)
+                    yield encode({"type": "token", "text": token})
+                result = llm_backend.parse_result("".join(tokens), job_description)
+            else:
+                result = await llm_backend.tailor(request.resume, job_description)
+            yield encode({"type": "result", **jsonable_encoder(ResumeResponse(**result))})
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.error(f"Error in tailor_resume_stream: {detail}")
+            yield encode({"type": "error", "detail": detail})
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.post("/scrape-job")
 async def scrape_job_description(job_url: str):
     """
     Scrape job description from URL
     """
     try:
-        job_desc = extract_job_description_from_url(job_url)
+        job_desc = await extract_job_description_from_url(job_url)
         return {"job_description": job_desc}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,181 @@
+"""
+ATS match score: how well a resume matches a job description, overall, per section and per required skill
+"""
+
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from resume_parser import ResumeDocument, parse_resume
+from skills import RankedSkill, rank_skills, tokenize
+
+# Share of the overall score that comes from required-skill coverage; the rest is text similarity
+ATS_SKILL_WEIGHT = float(os.getenv("ATS_SKILL_WEIGHT", 0.6))
+
+# BM25 term-frequency saturation: the tenth mention of a word adds far less than the second
+BM25_K1 = 1.2
+
+STOPWORDS = frozenset("""
+a about above after all also am an and any are as at be because been being both but by can could did do does
+doing during each etc for from further had has have having he her here hers him his how i if in into is it its
+itself just me more most my no nor not of off on once only or other our ours out over own per same she should
+so some such than that the their theirs them then there these they this those through to too under until up
+very via was we were what when where which while who whom why will with within would you your yours
+""".split())
+
+
+def term_counts(tokens: Iterable[str]) -> Dict[str, int]:
+    """Count content words: stopwords and bare punctuation are dropped, trailing '.' and '-' stripped"""
+    counts: Dict[str, int] = {}
+    # Count raw tokens in C first, then normalize each distinct token once
+    for token, count in Counter(tokens).items():
+        token = token.rstrip('.-')
+        if token and token not in STOPWORDS and (len(token) > 1 or token.isalpha()):
+            counts[token] = counts.get(token, 0) + count
+    return counts
+
+
+def _vector(counts: Dict[str, int], idf: Dict[str, float], default_idf: float) -> Dict[str, float]:
+    return {term: count * (BM25_K1 + 1) / (count + BM25_K1) * idf.get(term, default_idf)
+            for term, count in counts.items()}
+
+
+def _norm(vector: Dict[str, float]) -> float:
+    return math.hypot(*vector.values())
+
+
+def _cosine(a: Dict[str, float], a_norm: float, b: Dict[str, float], b_norm: float) -> float:
+    if not a_norm or not b_norm:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items()) / (a_norm * b_norm)
+
+
+class ResumeProfile:
+    """Term counts and skills of a parsed resume, as a whole and per section, computed from its tokens once"""
+
+    __slots__ = ("counts", "sections", "section_skills", "skill_keys")
+
+    def __init__(self, document: ResumeDocument):
+        self.counts: Dict[str, int] = {}
+        self.sections: Dict[str, Dict[str, int]] = {}
+        self.section_skills: Dict[str, set] = {}
+        section_tokens: Dict[str, List[str]] = {}
+        for section in document.sections:
+            tokens = section_tokens.setdefault(section.name, [])
+            skills = self.section_skills.setdefault(section.name, set())
+            for line in section.lines:
+                tokens += line.tokens
+                skills.update(line.skill_keys)
+        for name, tokens in section_tokens.items():
+            counts = term_counts(tokens)
+            if not counts:
+                continue
+            self.sections[name] = counts
+            for term, count in counts.items():
+                self.counts[term] = self.counts.get(term, 0) + count
+        self.skill_keys = document.skill_keys
+
+
+class JobProfile:
+    """A job description tokenized once: its term counts and the ranked skills it asks for"""
+
+    __slots__ = ("counts", "skills")
+
+    def __init__(self, job_desc: str, required_skills: Optional[List[RankedSkill]] = None):
+        self.counts = term_counts(tokenize(job_desc))
+        self.skills = rank_skills(job_desc) if required_skills is None else required_skills
+
+    def idf(self, resume: ResumeProfile) -> Dict[str, float]:
+        """
+        Smoothed BM25 idf over the job description and the resume's sections, so words that appear
+        everywhere (the candidate's name, "team") weigh less than the ones only some sections use
+        """
+        documents = [self.counts, *resume.sections.values()]
+        frequencies: Dict[str, int] = {}
+        for counts in documents:
+            for term in counts:
+                frequencies[term] = frequencies.get(term, 0) + 1
+        total = len(documents)
+        return {term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+                for term, frequency in frequencies.items()}
+
+
+class JobWeights:
+    """The idf and the job's weighted vector, computed once and shared by every resume scored against them"""
+
+    __slots__ = ("job", "idf", "default_idf", "vector", "norm")
+
+    def __init__(self, job: JobProfile, resume: ResumeProfile):
+        self.job = job
+        self.idf = job.idf(resume)
+        # Terms neither text had when idf was built (e.g. added by tailoring) count as rare
+        self.default_idf = max(self.idf.values(), default=1.0)
+        self.vector = _vector(job.counts, self.idf, self.default_idf)
+        self.norm = _norm(self.vector)
+
+    def similarity(self, counts: Dict[str, int]) -> float:
+        vector = _vector(counts, self.idf, self.default_idf)
+        return _cosine(vector, _norm(vector), self.vector, self.norm)
+
+
+def match_score(resume: ResumeProfile, job: JobProfile, weights: Optional[JobWeights] = None) -> dict:
+    """
+    Overall 0-100 score blending weighted required-skill coverage with the cosine similarity of
+    BM25-weighted term vectors, plus the same similarity per resume section and coverage per skill
+    """
+    weights = JobWeights(job, resume) if weights is None else weights
+    similarity = weights.similarity(resume.counts)
+
+    skills = []
+    found_weight = total_weight = 0.0
+    for skill in job.skills:
+        sections = [name for name, keys in resume.section_skills.items() if skill.skill in keys]
+        found = skill.skill in resume.skill_keys
+        total_weight += skill.score
+        if found:
+            found_weight += skill.score
+        skills.append({"skill": skill.name, "weight": round(skill.score, 4), "found": found, "sections": sections})
+    coverage = found_weight / total_weight if total_weight else 0.0
+
+    sections = {}
+    for name, counts in resume.sections.items():
+        sections[name] = {
+            "similarity": round(weights.similarity(counts), 4),
+            "skills": [skill["skill"] for skill in skills if name in skill["sections"]],
+        }
+
+    overall = 100 * (ATS_SKILL_WEIGHT * coverage + (1 - ATS_SKILL_WEIGHT) * similarity) if job.skills \
+        else 100 * similarity
+    return {
+        "overall": round(overall, 1),
+        "similarity": round(similarity, 4),
+        "skill_coverage": round(coverage, 4),
+        "matched_skills": [skill["skill"] for skill in skills if skill["found"]],
+        "missing_skills": [skill["skill"] for skill in skills if not skill["found"]],
+        "skills": skills,
+        "sections": sections,
+    }
+
+
+def score_tailoring(original: str, tailored: str, job_desc: str, document: Optional[ResumeDocument] = None,
+                    required_skills: Optional[List[RankedSkill]] = None) -> dict:
+    """
+    Match scores of the original and tailored resume against one job description. Both are weighed
+    with the same idf, so the improvement reflects the resume change and nothing else; the job side
+    is weighted once and only the lines tailoring changed are parsed again.
+    """
+    job = JobProfile(job_desc, required_skills)
+    document = document if document is not None else parse_resume(original)
+    before = ResumeProfile(document)
+    weights = JobWeights(job, before)
+    after = ResumeProfile(parse_resume(tailored, previous=document)) if tailored != original else before
+    before_score = match_score(before, job, weights)
+    after_score = before_score if after is before else match_score(after, job, weights)
+    return {
+        "before": before_score,
+        "after": after_score,
+        "improvement": round(after_score["overall"] - before_score["overall"], 1),
+    }
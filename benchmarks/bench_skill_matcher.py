@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled skill matcher against the original per-keyword substring scan
+Run from the repository root: python benchmarks/bench_skill_matcher.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skills import SkillMatcher, get_taxonomy
+
+# The keyword list that was hard-coded in extract_skills_from_job_desc
+SKILLS_KEYWORDS = [
+    'python', 'javascript', 'java', 'c++', 'c#', 'php', 'ruby', 'go', 'rust', 'swift',
+    'typescript', 'kotlin', 'scala', 'r', 'matlab', 'sql',
+    'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'fastapi',
+    'html', 'css', 'bootstrap', 'tailwind', 'jquery', 'webpack', 'babel',
+    'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'sqlite', 'oracle',
+    'cassandra', 'dynamodb',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github',
+    'terraform', 'ansible', 'chef', 'puppet',
+    'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'scikit-learn',
+    'pandas', 'numpy', 'jupyter', 'tableau', 'power bi', 'spark', 'hadoop',
+    'leadership', 'communication', 'teamwork', 'problem solving', 'analytical',
+    'project management', 'agile', 'scrum', 'kanban'
+]
+
+skill_matcher = SkillMatcher(SKILLS_KEYWORDS)
+
+SAMPLE_PARAGRAPH = (
+    "We are hiring a Senior Python Developer to build FastAPI services on AWS. "
+    "You will work with PostgreSQL, Redis and Docker, deploy to Kubernetes with Terraform, "
+    "and collaborate with a JavaScript/React team. Experience with machine learning, pandas "
+    "and Spark is a plus. Strong communication, leadership and problem solving skills required. "
+)
+
+# Typical posting boilerplate with few skills, so most keywords are absent from most of the text
+BOILERPLATE_PARAGRAPH = (
+    "Our company offers competitive compensation, flexible working hours and a generous "
+    "parental leave policy. We are an equal opportunity employer and value diversity at every "
+    "level of the organization. Benefits include health insurance, a learning budget and "
+    "regular team events. Apply with your CV and a short note about what excites you. "
+) * 3
+
+SIZES = {"5KB": 5 * 1024, "50KB": 50 * 1024, "500KB": 500 * 1024}
+
+
+def legacy_extract(job_desc: str, keywords: list = SKILLS_KEYWORDS) -> list:
+    """The original implementation: one substring scan per keyword"""
+    found_skills = []
+    job_desc_lower = job_desc.lower()
+    for skill in keywords:
+        if skill in job_desc_lower:
+            found_skills.append(skill.title())
+    return found_skills
+
+
+def compiled_extract(job_desc: str) -> list:
+    return [match.skill.title() for match in skill_matcher.match(job_desc)]
+
+
+def make_text(size: int) -> str:
+    block = SAMPLE_PARAGRAPH + BOILERPLATE_PARAGRAPH
+    repeats = size // len(block) + 1
+    return (block * repeats)[:size]
+
+
+def main():
+    print(f"{'size':>6} {'legacy ms':>10} {'compiled ms':>12} {'legacy skills':>14} {'compiled skills':>16}")
+    for label, size in SIZES.items():
+        text = make_text(size)
+        number = max(1, 2000 // (size // 1024))
+        legacy = min(timeit.repeat(lambda: legacy_extract(text), number=number, repeat=3)) / number
+        compiled = min(timeit.repeat(lambda: compiled_extract(text), number=number, repeat=3)) / number
+        print(f"{label:>6} {legacy * 1000:>10.3f} {compiled * 1000:>12.3f} "
+              f"{len(legacy_extract(text)):>14} {len(compiled_extract(text)):>16}")
+    # Cost as the keyword list grows (synthetic extra keywords that never match)
+    text = make_text(SIZES["50KB"])
+    print(f"\n{'keywords':>9} {'legacy ms':>10} {'compiled ms':>12}  (50KB input)")
+    for extra in (0, 900, 9000):
+        keywords = SKILLS_KEYWORDS + [f"skill{i}x" for i in range(extra)]
+        matcher = SkillMatcher(keywords)
+        legacy = min(timeit.repeat(lambda: legacy_extract(text, keywords), number=5, repeat=3)) / 5
+        compiled = min(timeit.repeat(lambda: matcher.match(text), number=5, repeat=3)) / 5
+        print(f"{len(keywords):>9} {legacy * 1000:>10.3f} {compiled * 1000:>12.3f}")
+    taxonomy = get_taxonomy()
+    taxonomy_ms = min(timeit.repeat(lambda: taxonomy.match(text), number=5, repeat=3)) / 5
+    print(f"{'taxonomy':>9} {'-':>10} {taxonomy_ms * 1000:>12.3f}  ({len(taxonomy)} skills with aliases)")
+    dropped = sorted(set(legacy_extract(SAMPLE_PARAGRAPH)) - set(compiled_extract(SAMPLE_PARAGRAPH)))
+    print(f"False positives removed on sample text: {dropped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Open-loop load generator for the API: sends requests at a fixed rate and reports latency percentiles
+and a breakdown of statuses, errors and the engine that answered
+
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --rps 20 --duration 60
+    python benchmarks/load_test.py --job-url-fraction 0.5 --job-url-base http://127.0.0.1:9000/jobs --json run.json
+
+Pair with benchmarks/upstream_simulator.py so no real upstream is called. Each request is sent on
+schedule whether or not earlier ones have finished, so a slow server shows up as latency instead
+of a lower request rate. Raise CLIENT_RATE_PER_MINUTE (or pass --api-keys with keys the server lists
+in CLIENT_API_KEYS) so the per-client limit is not what gets measured.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import List, Optional
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_PAGES_DIR = os.path.join(ROOT_DIR, "fixtures", "job_pages")
+
+JOB_DESC = (
+    "We are hiring a Senior Python Developer to build FastAPI services on AWS. "
+    "You will work with PostgreSQL, Redis and Docker, deploy to Kubernetes with Terraform, "
+    "and collaborate with a JavaScript/React team. Experience with machine learning is a plus."
+)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class LoadResults:
+    """Outcome of every request sent during a run"""
+
+    def __init__(self):
+        self.latencies: List[float] = []  # Seconds, successful requests
+        self.all_latencies: List[float] = []  # Seconds, every request that got a response
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.engines: Counter = Counter()
+        self.sent = 0
+        self.skipped = 0  # Not sent because --max-outstanding requests were already waiting
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def record(self, latency: float, status: int, engine: Optional[str]) -> None:
+        self.all_latencies.append(latency)
+        self.statuses[str(status)] += 1
+        if 200 <= status < 300:
+            self.latencies.append(latency)
+            if engine:
+                self.engines[engine] += 1
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        completed = sum(self.statuses.values())
+        succeeded = len(self.latencies)
+
+        def summary(values: List[float]) -> dict:
+            ordered = sorted(values)
+            return {name: round(value * 1000, 1) if value is not None else None
+                    for name, value in (("p50_ms", percentile(ordered, 0.50)), ("p95_ms", percentile(ordered, 0.95)),
+                                        ("p99_ms", percentile(ordered, 0.99)),
+                                        ("max_ms", ordered[-1] if ordered else None))}
+
+        return {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "completed": completed,
+            "succeeded": succeeded,
+            "error_rate": round(1 - succeeded / self.sent, 4) if self.sent else 0.0,
+            "elapsed_seconds": round(elapsed, 2),
+            "achieved_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+            "latency_ok": summary(self.latencies),
+            "latency_all": summary(self.all_latencies),
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "engines": dict(self.engines),
+        }
+
+
+def build_payload(args, resume: str, index: int) -> dict:
+    """One request body; unique resumes get a distinct line so the result cache cannot answer them"""
+    if random.random() < args.unique_fraction:
+        resume = f"{resume}\nReference: load-test-{index}-{random.getrandbits(32)}"
+    payload = {"resume": resume, "job_desc": JOB_DESC}
+    if args.job_url_base and random.random() < args.job_url_fraction:
+        pages = args.job_pages or ["posting"]
+        payload["job_url"] = f"{args.job_url_base.rstrip('/')}/{random.choice(pages)}"
+    if args.budget is not None:
+        payload["latency_budget_seconds"] = args.budget
+    return payload
+
+
+async def send_one(client: httpx.AsyncClient, args, payload: dict, results: LoadResults) -> None:
+    headers = {"X-API-Key": random.choice(args.api_keys)} if args.api_keys else {}
+    started = time.monotonic()
+    try:
+        response = await client.post(args.path, json=payload, headers=headers, timeout=args.timeout)
+    except httpx.TimeoutException:
+        results.errors["timeout"] += 1
+        return
+    except httpx.HTTPError as e:
+        results.errors[type(e).__name__] += 1
+        return
+    latency = time.monotonic() - started
+    engine = None
+    if response.status_code == 200:
+        try:
+            engine = response.json().get("engine")
+        except ValueError:
+            results.errors["invalid_json"] += 1
+    else:
+        results.errors[f"http_{response.status_code}"] += 1
+    results.record(latency, response.status_code, engine)
+
+
+async def run_load(client: httpx.AsyncClient, args, resume: str) -> LoadResults:
+    """Send args.rps requests per second for args.duration seconds, then wait for the stragglers"""
+    results = LoadResults()
+    outstanding = set()
+    total = int(args.rps * args.duration)
+    for index in range(total):
+        # Open loop: request i goes out at start + i / rps regardless of how the earlier ones are doing
+        delay = results.started + index / args.rps - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(outstanding) >= args.max_outstanding:
+            results.skipped += 1
+            continue
+        results.sent += 1
+        task = asyncio.ensure_future(send_one(client, args, build_payload(args, resume, index), results))
+        outstanding.add(task)
+        task.add_done_callback(outstanding.discard)
+    if outstanding:
+        await asyncio.wait(outstanding)
+    results.finished = time.monotonic()
+    return results
+
+
+def print_report(report: dict, server_health: Optional[dict]) -> None:
+    print("\n📊 Load test results")
+    print("=" * 50)
+    print(f"Sent {report['sent']} ({report['skipped']} skipped), completed {report['completed']}, "
+          f"succeeded {report['succeeded']} in {report['elapsed_seconds']}s ({report['achieved_rps']} req/s)")
+    for label, key in (("Successful", "latency_ok"), ("All responses", "latency_all")):
+        latency = report[key]
+        print(f"{label:<14} p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  "
+              f"p99 {latency['p99_ms']} ms  max {latency['max_ms']} ms")
+    print(f"Statuses: {report['statuses']}")
+    print(f"Errors:   {report['errors'] or 'none'}  (error rate {report['error_rate']:.2%})")
+    print(f"Engines:  {report['engines']}")
+    if server_health:
+        print(f"Server:   results {server_health.get('tailor_results')}, hedging {server_health.get('hedging')}")
+
+
+async def main_async(args) -> dict:
+    with open(args.resume, encoding="utf-8") as f:
+        resume = f.read()
+    limits = httpx.Limits(max_connections=args.max_outstanding, max_keepalive_connections=args.max_outstanding)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+        print(f"🚀 {args.rps} req/s for {args.duration}s against {args.url}{args.path}")
+        results = await run_load(client, args, resume)
+        try:
+            server_health = (await client.get("/health", timeout=10)).json()
+        except (httpx.HTTPError, ValueError):
+            server_health = None
+    report = results.report()
+    print_report(report, server_health)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load generator for the resume tailoring API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--path", default="/tailor-resume", help="Endpoint to load")
+    parser.add_argument("--rps", type=float, default=10, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to send for")
+    parser.add_argument("--max-outstanding", type=int, default=512, help="Skip sends beyond this many in flight")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--resume", default=os.path.join(ROOT_DIR, "sample_resume.txt"), help="Resume text file")
+    parser.add_argument("--unique-fraction", type=float, default=1.0,
+                        help="Fraction of requests with a unique resume; the rest can be served from cache")
+    parser.add_argument("--job-url-base", default="", help="Job page base URL, e.g. http://127.0.0.1:9000/jobs")
+    parser.add_argument("--job-url-fraction", type=float, default=0.0, help="Fraction of requests sending a job_url")
+    parser.add_argument("--job-pages", nargs="*",
+                        default=sorted(name[:-len(".html")] for name in os.listdir(FIXTURE_PAGES_DIR)),
+                        help="Page names to pick from under --job-url-base")
+    parser.add_argument("--budget", type=float, default=None, help="latency_budget_seconds sent with each request")
+    parser.add_argument("--api-keys", type=lambda value: [key for key in value.split(",") if key], default=[],
+                        help="Comma-separated X-API-Key values to spread requests over; the server must list "
+                             "them in CLIENT_API_KEYS")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for a repeatable request mix")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Exit with status 1 when the error rate is above this")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    report = asyncio.run(main_async(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "report": report}, f, indent=2)
+        print(f"\n💾 Saved report to {args.json}")
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        print(f"❌ Error rate {report['error_rate']:.2%} is above {args.max_error_rate:.2%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Offline micro-benchmarks for the core text-processing functions
+Runs on checked-in fixtures (sample_resume.txt, fixtures/job_pages) and generated large inputs; no server or network
+
+    python benchmarks/run_benchmarks.py                    # run and print the table
+    python benchmarks/run_benchmarks.py --save baseline    # also write benchmarks/baselines/baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline # flag cases slower or hungrier than the baseline
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+import logging
+logging.disable(logging.INFO)
+
+from app_demo import mock_ai_optimization
+from ats_score import score_tailoring
+from job_scraper import extract_job_description, scraping_rules
+from optimizer import extract_skills_from_job_desc, intelligent_resume_optimization
+from resume_parser import parse_resume
+from skills import rank_skills
+
+BASELINES_DIR = os.path.join(BENCH_DIR, "baselines")
+FIXTURE_PAGES_DIR = os.path.join(ROOT_DIR, "fixtures", "job_pages")
+SAMPLE_RESUME_PATH = os.path.join(ROOT_DIR, "sample_resume.txt")
+
+# Fixture page -> URL whose scraping rule applies to it
+FIXTURE_PAGE_URLS = {
+    "greenhouse.html": "https://boards.greenhouse.io/acme/jobs/4012345",
+    "greenhouse_job_boards.html": "https://job-boards.greenhouse.io/acme/jobs/77",
+    "lever.html": "https://jobs.lever.co/globex/1c2d3e4f",
+    "workday.html": "https://initech.wd5.myworkdayjobs.com/en-US/careers/job/R-10423",
+    "indeed.html": "https://www.indeed.com/viewjob?jk=abc123",
+    "generic_json_ld.html": "https://careers.hooli.example/jobs/4411",
+    "generic_paragraphs.html": "https://piedpiper.example/careers/qa",
+}
+
+JOB_PARAGRAPH = (
+    "We are hiring a Senior Python Developer to build FastAPI services on AWS. "
+    "You will work with PostgreSQL, Redis and Docker, deploy to Kubernetes with Terraform, "
+    "and collaborate with a JavaScript/React team. Experience with machine learning, pandas "
+    "and Spark is a plus. Strong communication, leadership and problem solving skills required. "
+)
+BOILERPLATE_PARAGRAPH = (
+    "Our company offers competitive compensation, flexible working hours and a generous "
+    "parental leave policy. We are an equal opportunity employer and value diversity at every "
+    "level of the organization. Benefits include health insurance and a learning budget. "
+)
+
+
+class Case:
+    """One benchmark: a no-argument callable and the size of the input it processes"""
+
+    def __init__(self, name: str, fn: Callable[[], object], input_bytes: int):
+        self.name = name
+        self.fn = fn
+        self.input_bytes = input_bytes
+
+
+def read_fixture(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def make_job_description(size: int) -> str:
+    block = JOB_PARAGRAPH + BOILERPLATE_PARAGRAPH * 3
+    return (block * (size // len(block) + 1))[:size]
+
+
+def make_large_resume(resume: str, size: int) -> str:
+    """sample_resume.txt with its experience section repeated under numbered employers"""
+    head, _, experience = resume.partition("PROFESSIONAL EXPERIENCE")
+    parts = [head, "PROFESSIONAL EXPERIENCE"]
+    index = 0
+    while sum(len(part) for part in parts) < size:
+        index += 1
+        parts.append(experience.replace("Tech Corp", f"Tech Corp {index}").replace("2021", str(2021 - index % 20)))
+    return "".join(parts)
+
+
+def make_job_page(size: int, description_first: bool) -> bytes:
+    """A job board page padded with navigation, scripts and related-job cards around the description"""
+    nav = "".join(f'<li><a href="/jobs/{i}" class="nav-link">Related job {i}</a></li>' for i in range(400))
+    description = ('<div class="jobsearch-jobDescriptionText"><h2>Requirements</h2><ul>'
+                   + "".join(f"<li>Experience with Python, AWS and Kubernetes item {i}</li>" for i in range(200))
+                   + "</ul></div>")
+    card = '<div class="card"><p>Similar posting {i} with a short teaser paragraph.</p><script>track({i})</script></div>'
+    head = "<html><head><style>" + "x{}" * 2000 + "</style></head><body><ul>" + nav + "</ul>"
+    cards, filler = [], len(head) + len(description)
+    while filler < size:
+        cards.append(card.format(i=len(cards)))
+        filler += len(cards[-1])
+    body = description + "".join(cards) if description_first else "".join(cards) + description
+    return (head + body + "</body></html>").encode()
+
+
+def build_cases() -> List[Case]:
+    resume = read_fixture(SAMPLE_RESUME_PATH).decode("utf-8")
+    large_resume = make_large_resume(resume, 200 * 1024)
+    job_desc = JOB_PARAGRAPH + BOILERPLATE_PARAGRAPH
+    long_job_desc = make_job_description(50 * 1024)
+    document = parse_resume(resume)
+    required_skills = rank_skills(job_desc)
+    tailored = intelligent_resume_optimization(resume, job_desc, document, required_skills)["tailored_resume"]
+
+    cases = [
+        Case("skills/extract_job_desc", lambda: extract_skills_from_job_desc(job_desc), len(job_desc)),
+        Case("skills/extract_50kb", lambda: extract_skills_from_job_desc(long_job_desc), len(long_job_desc)),
+        Case("resume/parse_200kb", lambda: parse_resume(large_resume), len(large_resume)),
+        Case("optimize/sample_resume", lambda: intelligent_resume_optimization(resume, job_desc), len(resume)),
+        Case("optimize/resume_200kb", lambda: intelligent_resume_optimization(large_resume, job_desc),
+             len(large_resume)),
+        Case("ats/score_sample_resume", lambda: score_tailoring(resume, tailored, job_desc, document, required_skills),
+             len(resume) + len(tailored)),
+        Case("mock_ai/sample_resume", lambda: mock_ai_optimization(resume, job_desc), len(resume)),
+        Case("mock_ai/resume_200kb", lambda: mock_ai_optimization(large_resume, job_desc), len(large_resume)),
+    ]
+    for name, url in FIXTURE_PAGE_URLS.items():
+        page = read_fixture(os.path.join(FIXTURE_PAGES_DIR, name))
+        rule = scraping_rules.rule_for(url)
+        cases.append(Case(f"html/{name[:-len('.html')]}",
+                          lambda page=page, rule=rule: extract_job_description(page, rule), len(page)))
+    indeed = scraping_rules.rule_for(FIXTURE_PAGE_URLS["indeed.html"])
+    for label, first in (("early", True), ("late", False)):
+        page = make_job_page(1024 * 1024, description_first=first)
+        cases.append(Case(f"html/page_1mb_description_{label}",
+                          lambda page=page: extract_job_description(page, indeed), len(page)))
+    return cases
+
+
+def measure(case: Case, min_time: float, repeat: int) -> dict:
+    """Per-call timings over repeat rounds of at least min_time each, then one traced call for memory"""
+    case.fn()  # Warm caches and lazy imports
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            case.fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    rounds = []
+    gc.collect()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            case.fn()
+        rounds.append((time.perf_counter() - started) / number)
+
+    gc.collect()
+    tracemalloc.start()
+    case.fn()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(rounds)
+    return {
+        "calls_per_round": number,
+        "best_ms": round(min(rounds) * 1000, 4),
+        "median_ms": round(median * 1000, 4),
+        "ops_per_sec": round(1 / median, 2),
+        "mb_per_sec": round(case.input_bytes / median / 1e6, 2),
+        "input_bytes": case.input_bytes,
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "retained_alloc_kb": round(retained / 1024, 1),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def baseline_path(name: str) -> str:
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINES_DIR, f"{name}.json")
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    Print the change against the baseline and return the cases that regressed beyond threshold.
+    Time is compared on the best round, which is the least disturbed by other load on the machine.
+    """
+    print(f"\n{'case':<36} {'best ms':>10} {'baseline':>10} {'change':>8} {'peak KB':>9} {'baseline':>9}")
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<36} {result['best_ms']:>10.3f} {'new':>10}")
+            continue
+        change = result["best_ms"] / previous["best_ms"] - 1 if previous["best_ms"] else 0.0
+        memory_change = (result["peak_alloc_kb"] / previous["peak_alloc_kb"] - 1) if previous["peak_alloc_kb"] else 0.0
+        flag = ""
+        if change > threshold or memory_change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<36} {result['best_ms']:>10.3f} {previous['best_ms']:>10.3f} {change:>+8.1%} "
+              f"{result['peak_alloc_kb']:>9.1f} {previous['peak_alloc_kb']:>9.1f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline micro-benchmarks for the text-processing core")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds per case")
+    parser.add_argument("--save", metavar="NAME", help="Write results to benchmarks/baselines/NAME.json (or a path)")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against benchmarks/baselines/NAME.json (or a path)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 when a case regressed")
+    args = parser.parse_args()
+
+    print("📏 AI Resume Tailor - Offline Benchmarks")
+    print("=" * 50)
+    print(f"{'case':<36} {'median ms':>10} {'ops/s':>10} {'MB/s':>8} {'peak KB':>9} {'kept KB':>8}")
+    results = {}
+    for case in build_cases():
+        if args.filter not in case.name:
+            continue
+        result = results[case.name] = measure(case, args.min_time, args.repeat)
+        print(f"{case.name:<36} {result['median_ms']:>10.3f} {result['ops_per_sec']:>10.1f} "
+              f"{result['mb_per_sec']:>8.1f} {result['peak_alloc_kb']:>9.1f} {result['retained_alloc_kb']:>8.1f}")
+
+    if args.save:
+        path = baseline_path(args.save)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        report = {
+            "meta": {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                     "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "min_time": args.min_time,
+                     "repeat": args.repeat},
+            "results": results,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Saved {len(results)} results to {path}")
+
+    if args.compare:
+        with open(baseline_path(args.compare)) as f:
+            baseline = json.load(f)
+        meta = baseline.get("meta", {})
+        print(f"\nBaseline: commit {meta.get('commit')}, Python {meta.get('python')}, {meta.get('created_at')}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} case(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the upstreams the API calls: the Hugging Face Inference API, Ollama and job boards
+Latency, error rate, "model loading" 503s and payload sizes are configurable, so load tests need no network
+
+    python benchmarks/upstream_simulator.py --port 9000 --latency-ms 800 --error-rate 0.02 --loading-seconds 20
+
+Then start the API against it:
+
+    HF_API_BASE=http://127.0.0.1:9000/models OLLAMA_BASE_URL=http://127.0.0.1:9000 python app.py
+
+Job pages are served at http://127.0.0.1:9000/jobs/<name>: the saved pages in fixtures/job_pages by name,
+any other name as a generated page of --page-bytes. GET/PUT /_config changes the behaviour while running,
+POST /_cold-start puts the HF model back into its loading period and GET /_stats counts what was served.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_PAGES_DIR = os.path.join(ROOT_DIR, "fixtures", "job_pages")
+
+RESUME_LINE = "- Built Python and FastAPI services on AWS, cutting p95 latency by 40% with Redis caching\n"
+
+
+class SimulatorConfig:
+    """Behaviour of the simulated upstreams; every field can be set from the command line or PUT /_config"""
+
+    def __init__(self, latency_ms: float = 500, jitter_ms: float = 200, tail_rate: float = 0.01,
+                 tail_ms: float = 5000, error_rate: float = 0.0, loading_seconds: float = 0,
+                 loading_rate: float = 0.0, loading_estimate: float = 20, response_bytes: int = 2000,
+                 stream_chunk_chars: int = 16, token_delay_ms: float = 5, page_latency_ms: float = 100,
+                 page_bytes: int = 50_000, ollama_models: str = "mistral"):
+        self.latency_ms = latency_ms  # Base latency of a model call
+        self.jitter_ms = jitter_ms  # Uniform jitter added to it
+        self.tail_rate = tail_rate  # Fraction of calls that also take tail_ms longer
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate  # Fraction of model calls and page fetches answered with a 500
+        self.loading_seconds = loading_seconds  # HF answers 503 "loading" for this long after start or /_cold-start
+        self.loading_rate = loading_rate  # Fraction of HF calls answered 503 "loading" at any time
+        self.loading_estimate = loading_estimate  # estimated_time reported in the 503 body
+        self.response_bytes = response_bytes  # Size of the generated text
+        self.stream_chunk_chars = stream_chunk_chars  # Characters per streamed Ollama chunk
+        self.token_delay_ms = token_delay_ms  # Delay between streamed chunks
+        self.page_latency_ms = page_latency_ms
+        self.page_bytes = page_bytes  # Size of generated job pages
+        self.ollama_models = ollama_models  # Comma-separated models listed by /api/tags
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+    def update(self, values: dict) -> None:
+        for key, value in values.items():
+            if key not in vars(self):
+                raise KeyError(key)
+            setattr(self, key, type(getattr(self, key))(value))
+
+
+class UpstreamSimulator:
+    """The simulated upstreams and their counters"""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self.loading_until = time.monotonic() + config.loading_seconds
+        self.served: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def cold_start(self) -> None:
+        self.loading_until = time.monotonic() + self.config.loading_seconds
+
+    async def delay(self) -> None:
+        config = self.config
+        latency = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if random.random() < config.tail_rate:
+            latency += config.tail_ms
+        await asyncio.sleep(latency / 1000)
+
+    def failed(self) -> bool:
+        return random.random() < self.config.error_rate
+
+    def generated_text(self) -> str:
+        lines = RESUME_LINE * (self.config.response_bytes // len(RESUME_LINE) + 1)
+        return ("TAILORED RESUME\n" + lines)[:self.config.response_bytes]
+
+    def job_page(self, name: str) -> bytes:
+        path = os.path.join(FIXTURE_PAGES_DIR, os.path.basename(name) + ".html")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        description = (f"<h1>{name}</h1><div class=\"job-description\"><p>We are hiring a Senior Python Developer "
+                       "to build FastAPI services on AWS with PostgreSQL, Redis, Docker and Kubernetes.</p></div>")
+        card = "<div class=\"related\"><p>Related posting with a short teaser paragraph.</p></div>"
+        padding = card * max(0, (self.config.page_bytes - len(description)) // len(card))
+        return f"<html><head><title>{name}</title></head><body>{description}{padding}</body></html>".encode()
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        self.served[name] += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {"served": dict(self.served), "in_flight": self.in_flight, "max_in_flight": self.max_in_flight,
+                "loading_seconds_left": round(max(0.0, self.loading_until - time.monotonic()), 1)}
+
+
+def create_app(config: Optional[SimulatorConfig] = None) -> FastAPI:
+    simulator = UpstreamSimulator(config or SimulatorConfig())
+    app = FastAPI(title="Upstream simulator")
+    app.state.simulator = simulator
+
+    @app.post("/models/{model:path}")
+    async def huggingface_inference(model: str, request: Request):
+        """Hugging Face Inference API text generation"""
+        payload = await request.json()
+        config = simulator.config
+        loading = time.monotonic() < simulator.loading_until or random.random() < config.loading_rate
+        if loading and not payload.get("options", {}).get("wait_for_model"):
+            simulator.served["huggingface:503"] += 1
+            return JSONResponse({"error": f"Model {model} is currently loading",
+                                 "estimated_time": config.loading_estimate}, status_code=503)
+        with simulator.track("huggingface"):
+            if loading:
+                # wait_for_model: hold the request until the model has loaded
+                await asyncio.sleep(max(0.0, simulator.loading_until - time.monotonic()))
+            await simulator.delay()
+            if simulator.failed():
+                simulator.served["huggingface:500"] += 1
+                return JSONResponse({"error": "Internal Server Error"}, status_code=500)
+            return [{"generated_text": simulator.generated_text()}]
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        """Ollama generate, as one JSON object or streamed as one JSON object per line"""
+        payload = await request.json()
+        model = payload.get("model", "")
+        text = json.dumps({
+            "tailored_resume": simulator.generated_text(),
+            "key_skills_extracted": ["python", "fastapi", "aws", "redis"],
+            "optimization_notes": "Simulated optimization",
+        })
+        if not payload.get("stream", True):
+            with simulator.track("ollama"):
+                await simulator.delay()
+                if simulator.failed():
+                    simulator.served["ollama:500"] += 1
+                    return JSONResponse({"error": "simulated failure"}, status_code=500)
+                return {"model": model, "response": text, "done": True}
+
+        async def chunks() -> AsyncIterator[bytes]:
+            with simulator.track("ollama_stream"):
+                # Time to first token, then a steady token rate; a failure ends the stream with an error line
+                await simulator.delay()
+                size = max(1, simulator.config.stream_chunk_chars)
+                fail_at = random.randrange(len(text)) if simulator.failed() else None
+                for start in range(0, len(text), size):
+                    if fail_at is not None and start >= fail_at:
+                        simulator.served["ollama_stream:error"] += 1
+                        yield json.dumps({"error": "simulated failure"}).encode() + b"\n"
+                        return
+                    yield json.dumps({"model": model, "response": text[start:start + size],
+                                      "done": False}).encode() + b"\n"
+                    await asyncio.sleep(simulator.config.token_delay_ms / 1000)
+                yield json.dumps({"model": model, "response": "", "done": True}).encode() + b"\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        models = [name.strip() for name in simulator.config.ollama_models.split(",") if name.strip()]
+        return {"models": [{"name": f"{name}:latest"} for name in models]}
+
+    @app.get("/jobs/{name}")
+    async def job_page(name: str, request: Request):
+        """A job posting page with an ETag, so conditional revalidation can be exercised"""
+        with simulator.track("job_page"):
+            await asyncio.sleep(simulator.config.page_latency_ms / 1000)
+            if simulator.failed():
+                simulator.served["job_page:500"] += 1
+                return Response("Internal Server Error", status_code=500)
+            body = simulator.job_page(name)
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if request.headers.get("if-none-match") == etag:
+                simulator.served["job_page:304"] += 1
+                return Response(status_code=304, headers={"ETag": etag})
+            return Response(body, media_type="text/html", headers={"ETag": etag})
+
+    @app.get("/_config")
+    async def get_config():
+        return simulator.config.as_dict()
+
+    @app.put("/_config")
+    async def put_config(request: Request):
+        try:
+            simulator.config.update(await request.json())
+        except (KeyError, TypeError, ValueError) as e:
+            return JSONResponse({"error": f"Invalid setting: {str(e)}"}, status_code=400)
+        return simulator.config.as_dict()
+
+    @app.post("/_cold-start")
+    async def cold_start():
+        simulator.cold_start()
+        return simulator.stats()
+
+    @app.get("/_stats")
+    async def stats():
+        return simulator.stats()
+
+    return app
+
+
+def main():
+    defaults = SimulatorConfig()
+    parser = argparse.ArgumentParser(description="Simulated Hugging Face, Ollama and job board upstreams")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    for key, value in defaults.as_dict().items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+
+    import uvicorn
+    uvicorn.run(create_app(SimulatorConfig(**args)), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Circuit breaker for upstream inference APIs: stop calling a failing upstream and probe it back gradually
+"""
+
+import logging
+import os
+import random
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Breaker configuration
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", 60))  # Failure rate is measured over this window
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", 5))  # Calls in the window before the breaker may open
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", 0.5))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", 15))  # First open period, doubled on each reopen
+CIRCUIT_OPEN_MAX_SECONDS = float(os.getenv("CIRCUIT_OPEN_MAX_SECONDS", 300))
+CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", 1))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_BUCKETS = 10
+
+
+def jittered_backoff(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with equal jitter: half the delay is fixed, half random"""
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    Closed: calls flow and outcomes are counted in a rolling window. Once the window holds at least
+    min_calls and the failure rate reaches failure_rate the breaker opens.
+    Open: calls are rejected until a jittered, exponentially growing open period ends.
+    Half-open: up to half_open_probes calls go through; a success closes the breaker, a failure reopens it.
+    """
+
+    def __init__(self, name: str, window_seconds: float = CIRCUIT_WINDOW_SECONDS, min_calls: int = CIRCUIT_MIN_CALLS,
+                 failure_rate: float = CIRCUIT_FAILURE_RATE, open_seconds: float = CIRCUIT_OPEN_SECONDS,
+                 open_max_seconds: float = CIRCUIT_OPEN_MAX_SECONDS, half_open_probes: int = CIRCUIT_HALF_OPEN_PROBES):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.open_max_seconds = open_max_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = CLOSED
+        self.opened_until = 0.0
+        self._reopens = 0
+        self._probes = 0
+        # Rolling window as fixed buckets of [start, successes, failures]
+        self._bucket_seconds = window_seconds / _BUCKETS
+        self._buckets: List[List[float]] = []
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; half-open calls must be followed by a record_* call"""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now < self.opened_until:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes = 0
+            logger.info(f"Circuit {self.name} half-open, probing upstream")
+        if self._probes >= self.half_open_probes:
+            self.rejected += 1
+            return False
+        self._probes += 1
+        return True
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            logger.info(f"Circuit {self.name} closed, upstream recovered")
+            self.state = CLOSED
+            self._reopens = 0
+            self._buckets.clear()
+        self._count(success=True)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._count(success=False)
+        if self.state == CLOSED:
+            calls, failures = self._totals()
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._open()
+
+    def record_cancelled(self) -> None:
+        """A half-open probe ended without an outcome; let another call probe"""
+        if self.state == HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def _open(self) -> None:
+        duration = jittered_backoff(self._reopens, self.open_seconds, self.open_max_seconds)
+        self.state = OPEN
+        self.opened_until = time.monotonic() + duration
+        self._reopens += 1
+        self.opens += 1
+        self._buckets.clear()
+        logger.warning(f"Circuit {self.name} open for {duration:.1f}s")
+
+    def _count(self, success: bool) -> None:
+        now = time.monotonic()
+        if not self._buckets or now - self._buckets[-1][0] >= self._bucket_seconds:
+            self._buckets.append([now, 0, 0])
+        self._buckets[-1][1 if success else 2] += 1
+
+    def _totals(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self._buckets and self._buckets[0][0] < cutoff:
+            self._buckets.pop(0)
+        successes = sum(bucket[1] for bucket in self._buckets)
+        failures = sum(bucket[2] for bucket in self._buckets)
+        return successes + failures, failures
+
+    def retry_after(self) -> Optional[float]:
+        """Seconds until the next probe is allowed, while open"""
+        if self.state != OPEN:
+            return None
+        return max(0.0, self.opened_until - time.monotonic())
+
+    def info(self) -> dict:
+        calls, failures = self._totals()
+        retry_after = self.retry_after()
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+            "opens": self.opens,
+            "rejected": self.rejected,
+            "retry_after_seconds": round(retry_after, 1) if retry_after is not None else None,
+        }
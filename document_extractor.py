@@ -0,0 +1,393 @@
+"""
+Streaming, memory-bounded text extraction for uploaded resume files (PDF, DOCX, DOC, TXT)
+"""
+
+import base64
+import codecs
+import logging
+import mmap
+import os
+import re
+import tempfile
+import zipfile
+import zlib
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from xml.etree import ElementTree
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger(__name__)
+
+# Upload limits
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))  # Matches the frontend's 10MB check
+UPLOAD_MAX_PAGES = int(os.getenv("UPLOAD_MAX_PAGES", 20))
+UPLOAD_MAX_TEXT_CHARS = int(os.getenv("UPLOAD_MAX_TEXT_CHARS", 100_000))
+UPLOAD_MAX_DECOMPRESSED_BYTES = int(os.getenv("UPLOAD_MAX_DECOMPRESSED_BYTES", 20 * 1024 * 1024))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None  # Defaults to the system temp dir
+
+SUPPORTED_FILE_TYPES = ("pdf", "docx", "doc", "txt")
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class DocumentError(Exception):
+    """Upload rejected or unreadable; status_code is the HTTP status to return"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SpooledUpload:
+    """An uploaded file written to a temporary file on disk"""
+
+    def __init__(self, path: str, filename: str, size: int):
+        self.path = path
+        self.filename = filename
+        self.size = size
+
+    @property
+    def file_type(self) -> str:
+        return os.path.splitext(self.filename)[1].lower().lstrip(".")
+
+    def cleanup(self) -> None:
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+async def spool_upload(headers, body: AsyncIterator[bytes], field_name: str = "file",
+                       max_bytes: int = UPLOAD_MAX_BYTES) -> SpooledUpload:
+    """Stream a multipart body straight to disk, aborting as soon as the file exceeds max_bytes"""
+    content_type, params = parse_options_header(headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise DocumentError("Expected a multipart/form-data upload")
+    content_length = headers.get("content-length")
+    # Multipart framing adds a little on top of the file itself
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + 16 * 1024:
+        raise DocumentError(f"File too large. Maximum {max_bytes // (1024 * 1024)}MB allowed.", 413)
+
+    fd, path = tempfile.mkstemp(prefix="resume-upload-", dir=UPLOAD_SPOOL_DIR)
+    spool = os.fdopen(fd, "wb")
+    state = {"header_field": b"", "header_value": b"", "disposition": b"", "in_file": False,
+             "filename": None, "size": 0, "too_large": False}
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        if state["header_field"].lower() == b"content-disposition":
+            state["disposition"] = state["header_value"]
+        state["header_field"] = state["header_value"] = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(state["disposition"])
+        is_file = disposition.get(b"name") == field_name.encode() and b"filename" in disposition
+        if is_file and state["filename"] is None:
+            state["in_file"] = True
+            state["filename"] = disposition[b"filename"].decode("utf-8", errors="replace")
+
+    def on_part_data(data, start, end):
+        if not state["in_file"] or state["too_large"]:
+            return
+        state["size"] += end - start
+        if state["size"] > max_bytes:
+            state["too_large"] = True
+            return
+        spool.write(data[start:end])
+
+    def on_part_end():
+        state["in_file"] = False
+        state["disposition"] = b""
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+            if state["too_large"]:
+                raise DocumentError(f"File too large. Maximum {max_bytes // (1024 * 1024)}MB allowed.", 413)
+        parser.finalize()
+        spool.close()
+        if state["filename"] is None:
+            raise DocumentError(f"No file found in form field '{field_name}'")
+        if state["size"] == 0:
+            raise DocumentError("Uploaded file is empty")
+        return SpooledUpload(path, state["filename"], state["size"])
+    except BaseException:
+        spool.close()
+        os.unlink(path)
+        raise
+
+
+def extract_text(upload: SpooledUpload) -> Tuple[str, dict]:
+    """Extract text from a spooled upload; returns (text, details)"""
+    file_type = upload.file_type
+    if file_type not in SUPPORTED_FILE_TYPES:
+        raise DocumentError(f"Unsupported file type. Allowed types: {', '.join('.' + t for t in SUPPORTED_FILE_TYPES)}", 415)
+    extractor = {"pdf": _extract_pdf, "docx": _extract_docx, "doc": _extract_doc, "txt": _extract_txt}[file_type]
+    parts: List[str] = []
+    total = 0
+    truncated = False
+    details = {"parts": 0}
+    for part in extractor(upload.path, details):
+        if not part:
+            continue
+        if total + len(part) > UPLOAD_MAX_TEXT_CHARS:
+            parts.append(part[:UPLOAD_MAX_TEXT_CHARS - total])
+            truncated = True
+            break
+        parts.append(part)
+        total += len(part)
+        details["parts"] += 1
+    text = _clean_text("".join(parts))
+    if not text:
+        raise DocumentError("No text could be extracted from the file", 422)
+    details["truncated"] = truncated
+    return text, details
+
+
+def _clean_text(text: str) -> str:
+    lines = (re.sub(r"[ \t\f\v]+", " ", line).strip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+# Plain text
+
+def _extract_txt(path: str, details: dict) -> Iterator[str]:
+    with open(path, "rb") as f:
+        head = f.read(4)
+        f.seek(0)
+        encoding = "utf-16" if head[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8-sig"
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+
+# DOCX
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _extract_docx(path: str, details: dict) -> Iterator[str]:
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile:
+        raise DocumentError("File is not a valid DOCX document", 422)
+    with archive:
+        try:
+            info = archive.getinfo("word/document.xml")
+        except KeyError:
+            raise DocumentError("DOCX file has no document body", 422)
+        if info.file_size > UPLOAD_MAX_DECOMPRESSED_BYTES:
+            raise DocumentError("DOCX document body is too large", 413)
+        # iterparse streams the XML; finished paragraphs are cleared so memory stays flat. zipfile stops
+        # at the declared size, so a body that inflates past it ends in a CRC or XML error, not a bomb
+        try:
+            with archive.open(info) as xml_stream:
+                paragraph: List[str] = []
+                for event, element in ElementTree.iterparse(xml_stream, events=("end",)):
+                    tag = element.tag
+                    if tag == _W_NS + "t":
+                        paragraph.append(element.text or "")
+                    elif tag == _W_NS + "tab":
+                        paragraph.append("\t")
+                    elif tag in (_W_NS + "br", _W_NS + "cr"):
+                        paragraph.append("\n")
+                    elif tag == _W_NS + "p":
+                        yield "".join(paragraph) + "\n"
+                        paragraph = []
+                        element.clear()
+        except (zipfile.BadZipFile, ElementTree.ParseError, zlib.error):
+            raise DocumentError("DOCX document body is corrupt", 422)
+
+
+# DOC (legacy binary Word)
+
+_DOC_UTF16_RUN = re.compile(rb"(?:[\x20-\x7e\t\r\n]\x00){6,}")
+_DOC_ASCII_RUN = re.compile(rb"[\x20-\x7e\t\r\n]{12,}")
+
+
+def _extract_doc(path: str, details: dict) -> Iterator[str]:
+    """Best effort: legacy .doc stores body text as contiguous 8-bit or UTF-16LE runs"""
+    with open(path, "rb") as f:
+        if f.read(8) != b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1":
+            raise DocumentError("File is not a valid DOC document", 422)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            runs = [(match.start(), match.group().decode("utf-16-le")) for match in _DOC_UTF16_RUN.finditer(data)]
+            if not runs:
+                runs = [(match.start(), match.group().decode("latin-1")) for match in _DOC_ASCII_RUN.finditer(data)]
+    for _, text in runs:
+        # Skip OLE/stylesheet noise such as font and style names
+        if len(text.split()) >= 2:
+            yield text.replace("\r", "\n") + "\n"
+
+
+# PDF
+
+_PDF_PAGE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PDF_STREAM = re.compile(rb"\bobj\s*<<(?P<dict>(?:(?!\bendobj\b).){0,4096}?)>>\s*stream\r?\n", re.S)
+_PDF_FILTER = re.compile(rb"/Filter\s*(\[[^\]]*\]|/\w+)")
+_PDF_SKIP_STREAM = re.compile(rb"/Subtype\s*/Image|/Type\s*/(?:XRef|ObjStm|Metadata|EmbeddedFile)|/Length[123]\b|/FontFile")
+_PDF_TOKEN = re.compile(
+    rb"\((?:\\.|[^\\()]|\((?:\\.|[^\\()])*\))*\)"  # literal string (one level of nested parentheses)
+    rb"|<[0-9A-Fa-f\s]*>"                        # hex string
+    rb"|\[|\]"
+    rb"|[-+]?\d*\.?\d+"
+    rb"|/[^\s/\[\]()<>{}%]*"
+    rb"|[A-Za-z'\"*]+",
+    re.S,
+)
+_PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+                b"(": b"(", b")": b")", b"\\": b"\\"}
+_WIN_ANSI_BULLETS = bytes.maketrans(b"\x7f\x81\x8d\x8f\x90\x9d", b"\x95" * 6)
+_PDF_ESCAPE = re.compile(rb"\\([nrtbf()\\]|[0-7]{1,3}|\r?\n)")
+
+
+def _extract_pdf(path: str, details: dict) -> Iterator[str]:
+    """Pure-Python PDF text extraction, one content stream at a time over a memory-mapped file"""
+    with open(path, "rb") as f:
+        if not f.read(5).startswith(b"%PDF"):
+            raise DocumentError("File is not a valid PDF document", 422)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data.find(b"/Encrypt") != -1:
+                raise DocumentError("Encrypted PDFs are not supported", 422)
+            # Reject oversized documents before decoding anything
+            pages = sum(1 for _ in _PDF_PAGE.finditer(data))
+            details["pages"] = pages
+            if pages > UPLOAD_MAX_PAGES:
+                raise DocumentError(f"PDF has {pages} pages. Maximum {UPLOAD_MAX_PAGES} pages allowed.", 413)
+
+            decompressed = 0
+            for match in _PDF_STREAM.finditer(data):
+                stream_dict = match.group("dict")
+                if _PDF_SKIP_STREAM.search(stream_dict):
+                    continue
+                start = match.end()
+                end = data.find(b"endstream", start)
+                if end == -1:
+                    break
+                content = _decode_stream(data[start:end], stream_dict, UPLOAD_MAX_DECOMPRESSED_BYTES - decompressed)
+                if content is None:
+                    continue
+                decompressed += len(content)
+                if decompressed >= UPLOAD_MAX_DECOMPRESSED_BYTES:
+                    raise DocumentError("PDF content is too large to extract", 413)
+                text = _content_stream_text(content)
+                if text.strip():
+                    yield text + "\n"
+
+
+def _decode_stream(raw: bytes, stream_dict: bytes, budget: int) -> Optional[bytes]:
+    """Apply the stream's filter chain; None when a filter isn't one that carries page text"""
+    match = _PDF_FILTER.search(stream_dict)
+    filters = re.findall(rb"/(\w+)", match.group(1)) if match else []
+    content = raw
+    for name in filters:
+        try:
+            if name in (b"FlateDecode", b"Fl"):
+                content = _inflate(content, budget)
+            elif name in (b"ASCII85Decode", b"A85"):
+                content = base64.a85decode(content.strip().rstrip(b"~>").lstrip(b"<~"), ignorechars=b" \t\r\n")
+            elif name in (b"ASCIIHexDecode", b"AHx"):
+                content = bytes.fromhex(re.sub(rb"[^0-9A-Fa-f]", b"", content.split(b">")[0]).decode())
+            else:
+                return None  # DCT, LZW, JBIG2, ... don't carry page text we can read
+        except (ValueError, zlib.error):
+            return None
+        if content is None:
+            return None
+    return content
+
+
+def _inflate(raw: bytes, budget: int) -> Optional[bytes]:
+    decompressor = zlib.decompressobj()
+    try:
+        # max_length caps the output, so a decompression bomb can't balloon memory
+        content = decompressor.decompress(raw, max(budget, 1))
+    except zlib.error:
+        return None
+    if decompressor.unconsumed_tail:
+        raise DocumentError("PDF content is too large to extract", 413)
+    return content
+
+
+def _decode_pdf_string(token: bytes) -> str:
+    if token.startswith(b"<"):
+        hex_digits = re.sub(rb"\s", b"", token[1:-1])
+        if len(hex_digits) % 2:
+            hex_digits += b"0"
+        raw = bytes.fromhex(hex_digits.decode())
+    else:
+        raw = _PDF_ESCAPE.sub(_unescape, token[1:-1])
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", errors="replace")
+    # Standard fonts mostly use WinAnsiEncoding: cp1252, with unused codes drawn as bullets
+    return raw.translate(_WIN_ANSI_BULLETS).decode("cp1252")
+
+
+def _unescape(match) -> bytes:
+    escape = match.group(1)
+    if escape in _PDF_ESCAPES:
+        return _PDF_ESCAPES[escape]
+    if escape[:1] in (b"\r", b"\n"):
+        return b""  # Line continuation
+    return bytes([int(escape, 8) & 0xFF])
+
+
+def _content_stream_text(content: bytes) -> str:
+    """Collect text shown by Tj/TJ/'/" operators, starting new lines on text positioning operators"""
+    out: List[str] = []
+    operands: list = []
+    array: Optional[List[bytes]] = None
+    for match in _PDF_TOKEN.finditer(content):
+        token = match.group()
+        first = token[:1]
+        if first in (b"(", b"<"):
+            (array if array is not None else operands).append(token)
+        elif token == b"[":
+            array = []
+        elif token == b"]":
+            if array is not None:
+                operands.append(array)
+                array = None
+        elif first.isdigit() or first in (b"-", b"+", b"."):
+            if array is not None:
+                array.append(token)
+            else:
+                operands.append(token)
+        elif first == b"/":
+            operands.append(token)
+        else:
+            if token in (b"Tj", b"'", b'"'):
+                if token != b"Tj":
+                    out.append("\n")
+                strings = [operand for operand in operands if isinstance(operand, bytes) and operand[:1] in (b"(", b"<")]
+                if strings:
+                    out.append(_decode_pdf_string(strings[-1]))
+            elif token == b"TJ":
+                for operand in operands:
+                    if isinstance(operand, list):
+                        for item in operand:
+                            if item[:1] in (b"(", b"<"):
+                                out.append(_decode_pdf_string(item))
+                            elif float(item) < -200:
+                                out.append(" ")  # Large negative kerning is a word gap
+            elif token in (b"T*", b"Td", b"TD", b"ET") and out and out[-1] != "\n":
+                out.append("\n")
+            operands = []
+    return "".join(out)
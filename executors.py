@@ -0,0 +1,186 @@
+"""
+Executor layer that keeps CPU-bound parsing/optimization and blocking I/O off the event loop
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Executor configuration
+EXECUTOR_PROCESS_WORKERS = int(os.getenv("EXECUTOR_PROCESS_WORKERS", min(4, os.cpu_count() or 1)))  # 0 runs CPU stages on threads
+EXECUTOR_THREAD_WORKERS = int(os.getenv("EXECUTOR_THREAD_WORKERS", 16))
+EXECUTOR_START_METHOD = os.getenv("EXECUTOR_START_METHOD", "forkserver")  # "forkserver", "spawn" or "fork"
+
+executor_task_seconds = registry.histogram(
+    "executor_task_seconds", "Executor task latency including queueing, by stage and pool", ["stage", "pool"],
+)
+executor_queue_seconds = registry.histogram(
+    "executor_queue_seconds", "Time executor tasks waited for a free worker", ["stage"],
+)
+
+# Modules every worker process needs; imported once up front instead of on the first task
+_WORKER_PRELOAD = ["skills", "resume_parser", "optimizer", "document_extractor"]
+
+
+def _init_worker() -> None:
+    # Load the skills taxonomy (from its cached index) before the first task arrives
+    from skills import get_taxonomy
+    get_taxonomy()
+
+
+def _timed_call(fn: Callable, args: tuple) -> Tuple[float, float, Any]:
+    # Runs inside the worker: report when the task started and how long it ran
+    started_at = time.time()
+    started = time.perf_counter()
+    result = fn(*args)
+    return started_at, time.perf_counter() - started, result
+
+
+class StageStats:
+    """Queue depth and latency counters for one named stage"""
+
+    __slots__ = ("pool", "submitted", "completed", "failed", "in_flight", "max_in_flight",
+                 "queue_seconds", "run_seconds", "max_latency_seconds")
+
+    def __init__(self, pool: str):
+        self.pool = pool
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queue_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_latency_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        done = self.completed or 1
+        return {
+            "pool": self.pool,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "avg_queue_ms": round(self.queue_seconds / done * 1000, 2),
+            "avg_run_ms": round(self.run_seconds / done * 1000, 2),
+            "max_latency_ms": round(self.max_latency_seconds * 1000, 2),
+        }
+
+
+class StageExecutor:
+    """Process pool for CPU-heavy stages and thread pool for blocking I/O, with per-stage metrics"""
+
+    def __init__(self, process_workers: int = EXECUTOR_PROCESS_WORKERS, thread_workers: int = EXECUTOR_THREAD_WORKERS,
+                 start_method: str = EXECUTOR_START_METHOD, initializer: Callable = _init_worker, initargs: tuple = ()):
+        self.process_workers = max(0, process_workers)
+        self.thread_workers = max(1, thread_workers)
+        self.start_method = start_method
+        self.initializer = initializer
+        self.initargs = initargs
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._stages: Dict[str, StageStats] = {}
+        self.pool_restarts = 0
+
+    @property
+    def started(self) -> bool:
+        return self._threads is not None
+
+    def start(self) -> None:
+        """Create the pools (called from the app lifespan)"""
+        if self.started:
+            return
+        self._threads = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="io-stage")
+        if self.process_workers:
+            self._processes = self._new_process_pool()
+        logger.info(f"Executors started ({self.process_workers} processes, {self.thread_workers} threads)")
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            context.set_forkserver_preload(_WORKER_PRELOAD)
+        return ProcessPoolExecutor(max_workers=self.process_workers, mp_context=context,
+                                   initializer=self.initializer, initargs=self.initargs)
+
+    def shutdown(self) -> None:
+        """Cancel queued tasks and wait for running ones to finish"""
+        for pool in (self._processes, self._threads):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        if self.started:
+            logger.info("Executors shut down")
+        self._processes = None
+        self._threads = None
+
+    async def run_cpu(self, stage: str, fn: Callable, *args) -> Any:
+        """Run a CPU-bound function in the process pool; fn and its arguments must be picklable"""
+        if not self.started:
+            self.start()
+        if self._processes is None:
+            return await self._run(stage, "thread", self._threads, fn, args)
+        try:
+            return await self._run(stage, "process", self._processes, fn, args)
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault): replace the pool so later requests still work
+            logger.error(f"Process pool broke during stage {stage}, restarting it")
+            self._processes = self._new_process_pool()
+            self.pool_restarts += 1
+            raise
+
+    async def run_io(self, stage: str, fn: Callable, *args) -> Any:
+        """Run a blocking I/O function in the thread pool"""
+        if not self.started:
+            self.start()
+        return await self._run(stage, "thread", self._threads, fn, args)
+
+    async def _run(self, stage: str, pool_name: str, pool: Executor, fn: Callable, args: tuple) -> Any:
+        stats = self._stages.get(stage)
+        if stats is None:
+            stats = self._stages[stage] = StageStats(pool_name)
+        stats.submitted += 1
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        submitted_at = time.time()
+        started = time.perf_counter()
+        try:
+            started_at, run_seconds, result = await asyncio.get_running_loop().run_in_executor(
+                pool, _timed_call, fn, args
+            )
+        except BaseException:
+            stats.failed += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+        latency = time.perf_counter() - started
+        queued = max(0.0, started_at - submitted_at)
+        stats.completed += 1
+        stats.queue_seconds += queued
+        stats.run_seconds += run_seconds
+        stats.max_latency_seconds = max(stats.max_latency_seconds, latency)
+        executor_task_seconds.observe(latency, stage, pool_name)
+        executor_queue_seconds.observe(queued, stage)
+        return result
+
+    def stats(self) -> dict:
+        """Executor metrics for /health"""
+        return {
+            "started": self.started,
+            "process_workers": self.process_workers,
+            "thread_workers": self.thread_workers,
+            "pool_restarts": self.pool_restarts,
+            "stages": {name: stats.as_dict() for name, stats in self._stages.items()},
+        }
+
+
+# Process-wide executors shared by every app module
+executor = StageExecutor()
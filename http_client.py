@@ -0,0 +1,141 @@
+"""
+Shared, pooled HTTP client for job scraping and inference backends
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", 10))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5.0))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30.0))
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class HTTPClientPool:
+    """Process-wide keep-alive client with per-host connection limits and usage metrics"""
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS, max_keepalive: int = HTTP_MAX_KEEPALIVE,
+                 max_per_host: int = HTTP_MAX_PER_HOST, keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT, read_timeout: float = HTTP_READ_TIMEOUT):
+        self.max_per_host = max_per_host
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._host_waits = 0
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    async def start(self) -> None:
+        """Open the shared client (called from the app lifespan)"""
+        if self.started:
+            return
+        self._client = httpx.AsyncClient(
+            limits=self._limits,
+            timeout=self._timeout,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+        )
+        logger.info(f"HTTP client pool started (max {self._limits.max_connections} connections, {self.max_per_host} per host)")
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("HTTP client pool closed")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Scripts that never run the lifespan still get a pooled client
+        if not self.started:
+            await self.start()
+        return self._client
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return slot
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[str]:
+        host = urlsplit(url).netloc or "unknown"
+        slot = self._slot(host)
+        if slot.locked():
+            self._host_waits += 1
+        async with slot:
+            self._in_flight[host] += 1
+            self._requests[host] += 1
+            try:
+                yield host
+            except Exception:
+                self._errors[host] += 1
+                raise
+            finally:
+                self._in_flight[host] -= 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request over the shared pool, respecting the per-host limit"""
+        client = await self._get_client()
+        async with self._host_slot(url):
+            return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Stream a response body; the host slot is held until the stream is closed"""
+        client = await self._get_client()
+        async with self._host_slot(url):
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+
+    def stats(self) -> dict:
+        """Pool usage metrics for /health"""
+        connections = None
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        if pool is not None:
+            connections = len(getattr(pool, "connections", []))
+        return {
+            "started": self.started,
+            "open_connections": connections,
+            "max_connections": self._limits.max_connections,
+            "max_per_host": self.max_per_host,
+            "in_flight": {host: count for host, count in self._in_flight.items() if count},
+            "requests": dict(self._requests),
+            "errors": dict(self._errors),
+            "host_limit_waits": self._host_waits,
+        }
+
+
+# Process-wide pool shared by every app module
+http_pool = HTTPClientPool()
@@ -0,0 +1,623 @@
+"""
+Pluggable inference backends: Hugging Face and Ollama over HTTP, an in-process local model, and the rule engine
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Type
+
+import httpx
+
+from circuit_breaker import OPEN, CircuitBreaker, jittered_backoff
+from executors import StageExecutor, executor
+from http_client import http_pool
+from metrics import registry, stage_seconds
+from optimizer import RULE_ENGINE_ID, extract_skills_from_job_desc, timed_resume_optimization
+from rate_limit import AdmissionGate, QueueFullError, create_limiter
+
+logger = logging.getLogger(__name__)
+
+# Backend selection; each app passes its own default when this is unset
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "")  # "huggingface", "ollama", "local" or "rule-based"
+
+# Hugging Face Inference API
+HF_API_BASE = os.getenv("HF_API_BASE", "https://api-inference.huggingface.co/models")
+HF_MODEL = os.getenv("HF_MODEL", "microsoft/DialoGPT-medium")
+HF_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")  # Optional, works without key but with rate limits
+HF_TIMEOUT = float(os.getenv("HF_TIMEOUT", 30))
+HF_MAX_CONCURRENCY = int(os.getenv("HF_MAX_CONCURRENCY", 4))
+HF_MAX_QUEUE = int(os.getenv("HF_MAX_QUEUE", 16))  # Calls waiting for a slot before new ones are refused
+HF_RATE_PER_MINUTE = float(os.getenv("HF_RATE_PER_MINUTE", 30))  # Keeps us inside the API quota; 0 disables
+HF_RATE_BURST = int(os.getenv("HF_RATE_BURST", 10))
+
+# Retry configuration for upstream calls (503 "model loading" etc.)
+HF_MAX_RETRIES = int(os.getenv("HF_MAX_RETRIES", 2))
+HF_BACKOFF_SECONDS = float(os.getenv("HF_BACKOFF_SECONDS", 2.0))
+HF_BACKOFF_MAX_SECONDS = float(os.getenv("HF_BACKOFF_MAX_SECONDS", 10.0))
+
+# Ollama
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("MODEL_NAME", "mistral")  # You can change this to gemma or other models
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 60))
+OLLAMA_MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", 2))
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", 8))
+OLLAMA_RATE_PER_MINUTE = float(os.getenv("OLLAMA_RATE_PER_MINUTE", 0))
+OLLAMA_RATE_BURST = int(os.getenv("OLLAMA_RATE_BURST", 10))
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # How long Ollama keeps the model loaded after a call
+
+# In-process model served by dedicated worker processes (needs the optional transformers package)
+LOCAL_MODEL = os.getenv("LOCAL_MODEL", "distilgpt2")
+LOCAL_MODEL_WORKERS = int(os.getenv("LOCAL_MODEL_WORKERS", 1))
+LOCAL_MODEL_TIMEOUT = float(os.getenv("LOCAL_MODEL_TIMEOUT", 60))
+LOCAL_MODEL_MAX_NEW_TOKENS = int(os.getenv("LOCAL_MODEL_MAX_NEW_TOKENS", 256))
+LOCAL_MODEL_MAX_QUEUE = int(os.getenv("LOCAL_MODEL_MAX_QUEUE", 8))
+
+# Rule engine limits
+RULE_ENGINE_TIMEOUT = float(os.getenv("RULE_ENGINE_TIMEOUT", 10))
+RULE_ENGINE_MAX_CONCURRENCY = int(os.getenv("RULE_ENGINE_MAX_CONCURRENCY", 32))
+RULE_ENGINE_MAX_QUEUE = int(os.getenv("RULE_ENGINE_MAX_QUEUE", 256))
+
+# Warm-up calls wait for a cold model to load, which can take minutes
+MODEL_WARMUP_TIMEOUT = float(os.getenv("MODEL_WARMUP_TIMEOUT", 180))
+WARMUP_PROMPT = "Optimize this resume for the job: Python developer. Resume: Software engineer."
+
+
+inference_seconds = registry.histogram(
+    "inference_seconds", "Inference call latency by backend and outcome", ["backend", "outcome"],
+)
+inference_rejected = registry.counter(
+    "inference_rejected_total", "Inference calls refused before reaching the backend", ["backend", "reason"],
+)
+
+
+class InferenceError(Exception):
+    """The backend could not produce a result: unreachable, timed out, bad status or unusable output"""
+
+
+class CircuitOpenError(InferenceError):
+    """The backend's circuit breaker is open; the call was rejected without reaching the upstream"""
+
+
+class BackendBusyError(InferenceError):
+    """The backend's wait queue is full or its upstream rate limit is used up; retry later"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BackendStats:
+    """Request, failure and latency counters for one backend"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.limit_waits = 0
+        self.total_seconds = 0.0
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[float] = None
+        self.last_failure_at: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        succeeded = self.requests - self.failures
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "concurrency_limit_waits": self.limit_waits,
+            "avg_latency_ms": round(self.total_seconds / succeeded * 1000, 2) if succeeded > 0 else 0.0,
+            "last_error": self.last_error,
+        }
+
+
+class InferenceBackend:
+    """
+    Base class for tailoring engines.
+
+    Subclasses implement _generate (and optionally _stream); the base class applies the upstream rate
+    limit, the concurrency limit with its bounded wait queue and the timeout, and keeps the metrics. tailor() builds the prompt, generates and parses the
+    output into the ResumeResponse fields. Remote backends also get a circuit breaker, so calls fail
+    fast while the upstream is down.
+    """
+
+    name = "base"
+    generative = True
+    remote = False
+    notes = "Resume optimized using AI with intelligent skill matching and ATS optimization."
+
+    def __init__(self, model: str, max_concurrency: int, timeout: float, max_queue: int,
+                 rate_per_minute: float = 0, rate_burst: int = 1):
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._slots = AdmissionGate(self.name, self.max_concurrency, max_queue)
+        self.limiter = create_limiter(f"upstream:{self.name}", rate_per_minute, rate_burst)
+        self._stats = BackendStats()
+        self.breaker: Optional[CircuitBreaker] = CircuitBreaker(self.name) if self.remote else None
+
+    @property
+    def engine_id(self) -> str:
+        """Backend and model id; part of the result cache key"""
+        return f"{self.name}:{self.model}"
+
+    async def start(self) -> None:
+        """Acquire long-lived resources (called from the app lifespan)"""
+
+    async def close(self) -> None:
+        """Release long-lived resources"""
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        stats = self._stats
+        breaker = self.breaker
+        # Breaker first: calls it refuses must not spend the upstream's rate limit tokens
+        if breaker is not None and not breaker.allow():
+            inference_rejected.inc(self.name, "circuit_open")
+            raise CircuitOpenError(f"{self.name} circuit is open, retrying in {breaker.retry_after() or 0:.0f}s")
+        retry_after = await self.limiter.acquire()
+        if retry_after:
+            if breaker is not None:
+                # Hand back a half-open probe this call will not make
+                breaker.record_cancelled()
+            inference_rejected.inc(self.name, "rate_limited")
+            raise BackendBusyError(f"{self.name} rate limit reached", retry_after)
+        if self._slots.busy:
+            stats.limit_waits += 1
+        async with AsyncExitStack() as held:
+            try:
+                await held.enter_async_context(self._slots.slot())
+            except QueueFullError as e:
+                if breaker is not None:
+                    breaker.record_cancelled()
+                inference_rejected.inc(self.name, "queue_full")
+                raise BackendBusyError(str(e))
+            if breaker is not None and breaker.state == OPEN:
+                # The breaker opened while this call was queued behind the concurrency limit
+                inference_rejected.inc(self.name, "circuit_open")
+                raise CircuitOpenError(f"{self.name} circuit opened while waiting")
+            stats.requests += 1
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            started = time.perf_counter()
+            try:
+                yield
+            except (asyncio.CancelledError, GeneratorExit):
+                # No outcome (client went away); frees a half-open probe for the next caller
+                if breaker is not None:
+                    breaker.record_cancelled()
+                inference_seconds.observe(time.perf_counter() - started, self.name, "cancelled")
+                raise
+            except Exception as e:
+                inference_seconds.observe(time.perf_counter() - started, self.name, "error")
+                stats.failures += 1
+                stats.last_error = str(e)
+                stats.last_failure_at = time.time()
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            else:
+                elapsed = time.perf_counter() - started
+                inference_seconds.observe(elapsed, self.name, "ok")
+                if self.generative:
+                    stage_seconds.observe(elapsed, "inference")
+                stats.total_seconds += elapsed
+                stats.last_success_at = time.time()
+                if breaker is not None:
+                    breaker.record_success()
+            finally:
+                stats.in_flight -= 1
+
+    async def generate(self, prompt: str) -> str:
+        """Generate text for prompt within the backend's concurrency limit and timeout"""
+        async with self._slot():
+            try:
+                return await asyncio.wait_for(self._generate(prompt), self.timeout)
+            except asyncio.TimeoutError:
+                self._stats.timeouts += 1
+                raise InferenceError(f"{self.name} timed out after {self.timeout:.0f}s")
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield generated text as it arrives; backends without streaming yield it in one piece.
+        The whole stream gets the backend's timeout, so a trickling upstream cannot hold a slot forever.
+        """
+        async with self._slot():
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout
+            tokens = self._stream(prompt)
+            try:
+                while True:
+                    try:
+                        token = await asyncio.wait_for(tokens.__anext__(), max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        self._stats.timeouts += 1
+                        raise InferenceError(f"{self.name} stream timed out after {self.timeout:.0f}s")
+                    yield token
+            finally:
+                await tokens.aclose()
+
+    async def warm_up(self) -> None:
+        """
+        Make the model resident with one small call; raises InferenceError. Bypasses the rate limit,
+        queue and breaker so warm-up and keep-warm pings never take capacity from requests.
+        """
+        try:
+            await asyncio.wait_for(self._generate(WARMUP_PROMPT), max(self.timeout, MODEL_WARMUP_TIMEOUT))
+        except asyncio.TimeoutError:
+            raise InferenceError(f"{self.name} warm-up timed out")
+
+    @property
+    def last_success_at(self) -> Optional[float]:
+        """Wall-clock time of the last successful call"""
+        return self._stats.last_success_at
+
+    async def _generate(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        yield await asyncio.wait_for(self._generate(prompt), self.timeout)
+
+    def build_prompt(self, resume: str, job_desc: str) -> str:
+        # Short prompt for small conversational models with a limited context
+        return f"Optimize this resume for the job: {job_desc[:500]}... Resume: {resume[:500]}"
+
+    def parse_result(self, text: str, job_desc: str) -> dict:
+        """Turn model output into the ResumeResponse fields"""
+        return {
+            "tailored_resume": text,
+            "key_skills_extracted": extract_skills_from_job_desc(job_desc),
+            "optimization_notes": self.notes,
+        }
+
+    async def tailor(self, resume: str, job_desc: str) -> dict:
+        return self.parse_result(await self.generate(self.build_prompt(resume, job_desc)), job_desc)
+
+    async def health(self) -> dict:
+        """Passive health from recent outcomes; HTTP backends override this with an active probe"""
+        stats = self._stats
+        failing = stats.last_failure_at is not None and (stats.last_success_at or 0) < stats.last_failure_at
+        status = "degraded" if failing else "ok"
+        if self.breaker is not None and self.breaker.state == OPEN:
+            status = "circuit_open"
+        return {"backend": self.name, "model": self.model, "status": status,
+                "last_error": stats.last_error if failing else None}
+
+    def stats(self) -> dict:
+        stats = {"backend": self.name, "model": self.model, "max_concurrency": self.max_concurrency,
+                 "timeout_seconds": self.timeout, **self._stats.as_dict(), "queue": self._slots.info()}
+        if self.limiter.enabled:
+            stats["rate_limit"] = self.limiter.info()
+        if self.breaker is not None:
+            stats["circuit"] = self.breaker.info()
+        return stats
+
+
+class HuggingFaceBackend(InferenceBackend):
+    """Hugging Face Inference API"""
+
+    name = "huggingface"
+    remote = True
+    notes = "Resume optimized using Hugging Face AI with intelligent skill matching and ATS optimization."
+
+    def __init__(self, model: str = HF_MODEL, api_base: str = HF_API_BASE, api_key: str = HF_API_KEY,
+                 max_concurrency: int = HF_MAX_CONCURRENCY, timeout: float = HF_TIMEOUT, max_queue: int = HF_MAX_QUEUE,
+                 rate_per_minute: float = HF_RATE_PER_MINUTE, rate_burst: int = HF_RATE_BURST):
+        super().__init__(model, max_concurrency, timeout, max_queue, rate_per_minute, rate_burst)
+        self.url = f"{api_base.rstrip('/')}/{model}"
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    async def _post_with_backoff(self, payload: dict) -> httpx.Response:
+        # Await a jittered exponential backoff on 503 so retries from concurrent requests spread out
+        for attempt in range(HF_MAX_RETRIES + 1):
+            response = await http_pool.post(self.url, headers=self.headers, json=payload, timeout=self.timeout)
+            if response.status_code != 503 or attempt == HF_MAX_RETRIES:
+                return response
+            # Model is loading, wait without holding up other requests
+            delay = jittered_backoff(attempt, HF_BACKOFF_SECONDS, HF_BACKOFF_MAX_SECONDS)
+            logger.info(f"Model is loading, retrying in {delay:.1f} seconds...")
+            await asyncio.sleep(delay)
+        return response
+
+    async def _generate(self, prompt: str) -> str:
+        payload = {
+            "inputs": prompt,
+            "parameters": {
+                "max_length": 1000,
+                "temperature": 0.7,
+                "do_sample": True,
+                "top_p": 0.9
+            }
+        }
+        try:
+            response = await self._post_with_backoff(payload)
+        except httpx.HTTPError as e:
+            raise InferenceError(f"Hugging Face API request failed: {str(e)}")
+        if response.status_code != 200:
+            raise InferenceError(f"Hugging Face API returned {response.status_code}")
+        try:
+            result = response.json()
+        except ValueError as e:
+            raise InferenceError(f"Hugging Face API returned invalid JSON: {str(e)}")
+        text = result[0].get("generated_text") if isinstance(result, list) and result and isinstance(result[0], dict) else None
+        if isinstance(text, str) and text:
+            return text
+        raise InferenceError("Hugging Face API returned no generated text")
+
+    async def warm_up(self) -> None:
+        # wait_for_model holds the request until the model is loaded instead of answering 503
+        payload = {"inputs": WARMUP_PROMPT, "parameters": {"max_new_tokens": 1},
+                   "options": {"wait_for_model": True}}
+        try:
+            response = await http_pool.post(self.url, headers=self.headers, json=payload,
+                                            timeout=max(self.timeout, MODEL_WARMUP_TIMEOUT))
+        except httpx.HTTPError as e:
+            raise InferenceError(f"Hugging Face API request failed: {str(e)}")
+        if response.status_code != 200:
+            raise InferenceError(f"Hugging Face API returned {response.status_code}")
+
+
+class OllamaBackend(InferenceBackend):
+    """Ollama HTTP API, with token streaming"""
+
+    name = "ollama"
+    remote = True
+    notes = "Resume optimized based on job requirements"
+
+    def __init__(self, model: str = OLLAMA_MODEL, base_url: str = OLLAMA_BASE_URL,
+                 max_concurrency: int = OLLAMA_MAX_CONCURRENCY, timeout: float = OLLAMA_TIMEOUT,
+                 max_queue: int = OLLAMA_MAX_QUEUE, rate_per_minute: float = OLLAMA_RATE_PER_MINUTE,
+                 rate_burst: int = OLLAMA_RATE_BURST):
+        super().__init__(model, max_concurrency, timeout, max_queue, rate_per_minute, rate_burst)
+        self.base_url = base_url.rstrip("/")
+
+    def _payload(self, prompt: str, stream: bool) -> dict:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "max_tokens": 2000
+            }
+        }
+
+    async def _generate(self, prompt: str) -> str:
+        try:
+            response = await http_pool.post(f"{self.base_url}/api/generate", json=self._payload(prompt, False),
+                                            timeout=self.timeout)
+        except httpx.HTTPError as e:
+            raise InferenceError(f"Failed to connect to Ollama: {str(e)}")
+        if response.status_code != 200:
+            raise InferenceError(f"Ollama API error: {response.text}")
+        try:
+            result = response.json()
+        except ValueError as e:
+            raise InferenceError(f"Ollama API returned invalid JSON: {str(e)}")
+        if not isinstance(result, dict) or not isinstance(result.get("response", ""), str):
+            raise InferenceError("Ollama API returned an unexpected response")
+        return result.get("response", "")
+
+    async def warm_up(self) -> None:
+        # A request without a prompt only loads the model and keeps it for keep_alive
+        try:
+            response = await http_pool.post(f"{self.base_url}/api/generate",
+                                            json={"model": self.model, "stream": False, "keep_alive": OLLAMA_KEEP_ALIVE},
+                                            timeout=max(self.timeout, MODEL_WARMUP_TIMEOUT))
+        except httpx.HTTPError as e:
+            raise InferenceError(f"Failed to connect to Ollama: {str(e)}")
+        if response.status_code != 200:
+            raise InferenceError(f"Ollama API error: {response.text}")
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        try:
+            async with http_pool.stream("POST", f"{self.base_url}/api/generate", json=self._payload(prompt, True),
+                                        timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise InferenceError(f"Ollama API error: {body.decode(errors='replace')}")
+
+                # Ollama streams one JSON object per line
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                    except ValueError as e:
+                        raise InferenceError(f"Ollama API streamed invalid JSON: {str(e)}")
+                    if not isinstance(chunk, dict) or not isinstance(chunk.get("response", ""), str):
+                        raise InferenceError("Ollama API streamed an unexpected chunk")
+                    if chunk.get("error"):
+                        raise InferenceError(f"Ollama API error: {chunk['error']}")
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+        except httpx.HTTPError as e:
+            raise InferenceError(f"Failed to connect to Ollama: {str(e)}")
+
+    def build_prompt(self, resume: str, job_desc: str) -> str:
+        return f"""You are an expert Resume Optimizer and ATS (Applicant Tracking System) specialist. Your task is to tailor a resume to match a specific job description while maintaining technical accuracy and authenticity.
+
+**ORIGINAL RESUME:**
+{resume}
+
+**TARGET JOB DESCRIPTION:**
+{job_desc}
+
+**INSTRUCTIONS:**
+1. **Extract Key Skills & Requirements:** Identify the most important technical skills, soft skills, and qualifications from the job description.
+
+2. **Optimize Resume Content:**
+   - Rewrite bullet points to mirror the job requirements using similar keywords and phrases
+   - Quantify achievements where possible (percentages, numbers, metrics)
+   - Ensure technical accuracy - don't add skills the candidate doesn't have
+   - Maintain the original structure and format
+   - Use action verbs that match the job posting tone
+
+3. **ATS Optimization:**
+   - Include relevant keywords naturally throughout the resume
+   - Use standard section headings
+   - Ensure proper formatting for ATS parsing
+
+4. **Output Format:**
+   Please provide your response in the following JSON format:
+   {{
+     "tailored_resume": "The complete optimized resume text",
+     "key_skills_extracted": ["skill1", "skill2", "skill3"],
+     "optimization_notes": "Brief explanation of key changes made"
+   }}
+
+**IMPORTANT:** Only enhance and optimize existing content. Do not fabricate experience or skills the candidate doesn't possess."""
+
+    def parse_result(self, text: str, job_desc: str) -> dict:
+        # The prompt asks for JSON; fall back to treating the output as the resume text
+        try:
+            result = json.loads(text)
+        except (json.JSONDecodeError, TypeError):
+            result = None
+        if isinstance(result, dict) and isinstance(result.get("tailored_resume"), str):
+            skills = result.get("key_skills_extracted")
+            return {
+                "tailored_resume": result["tailored_resume"],
+                "key_skills_extracted": [str(skill) for skill in skills] if isinstance(skills, list) else extract_skills_from_job_desc(job_desc),
+                "optimization_notes": str(result.get("optimization_notes") or self.notes),
+            }
+        return super().parse_result(text, job_desc)
+
+    async def health(self) -> dict:
+        """Probe Ollama and check that the configured model has been pulled"""
+        try:
+            response = await http_pool.get(f"{self.base_url}/api/tags", timeout=5)
+            response.raise_for_status()
+            models = {model.get("name", "").split(":")[0] for model in response.json().get("models", [])}
+        except (httpx.HTTPError, ValueError) as e:
+            return {"backend": self.name, "model": self.model, "status": "down", "last_error": str(e)}
+        status = "ok" if self.model.split(":")[0] in models else "model_missing"
+        return {"backend": self.name, "model": self.model, "status": status, "last_error": self._stats.last_error}
+
+
+# Set in each local model worker process by _load_local_model
+_local_pipeline = None
+
+
+def _load_local_model(model: str) -> None:
+    global _local_pipeline
+    from transformers import pipeline
+    _local_pipeline = pipeline("text-generation", model=model)
+
+
+def _local_generate(prompt: str, max_new_tokens: int) -> str:
+    output = _local_pipeline(prompt, max_new_tokens=max_new_tokens, do_sample=True, temperature=0.7, top_p=0.9,
+                             return_full_text=False)
+    return output[0]["generated_text"]
+
+
+class LocalModelBackend(InferenceBackend):
+    """Text-generation model loaded once per worker process; no network round trip"""
+
+    name = "local"
+    notes = "Resume optimized using a local AI model with intelligent skill matching and ATS optimization."
+
+    def __init__(self, model: str = LOCAL_MODEL, workers: int = LOCAL_MODEL_WORKERS, timeout: float = LOCAL_MODEL_TIMEOUT,
+                 max_new_tokens: int = LOCAL_MODEL_MAX_NEW_TOKENS, max_queue: int = LOCAL_MODEL_MAX_QUEUE):
+        super().__init__(model, workers, timeout, max_queue)
+        self.max_new_tokens = max_new_tokens
+        self.available = importlib.util.find_spec("transformers") is not None
+        # Separate from the shared executor: these workers each hold a copy of the model
+        self._workers = StageExecutor(process_workers=max(1, workers), thread_workers=1,
+                                      initializer=_load_local_model, initargs=(model,))
+
+    async def start(self) -> None:
+        if not self.available:
+            logger.warning("transformers is not installed; the local inference backend is unavailable")
+            return
+        self._workers.start()
+
+    async def close(self) -> None:
+        self._workers.shutdown()
+
+    async def _generate(self, prompt: str) -> str:
+        if not self.available:
+            raise InferenceError("Local model backend needs the transformers package")
+        try:
+            text = await self._workers.run_cpu("local_generate", _local_generate, prompt, self.max_new_tokens)
+        except Exception as e:
+            # Model errors and dead worker processes (BrokenProcessPool) alike; the pool replaces itself
+            raise InferenceError(f"Local model failed: {type(e).__name__}: {str(e)}")
+        if not isinstance(text, str) or not text.strip():
+            raise InferenceError("Local model returned no text")
+        return text
+
+    async def warm_up(self) -> None:
+        # As many concurrent calls as workers, so the pool starts every worker process (each loads the
+        # model in its initializer); which worker runs which call is up to the pool
+        await asyncio.gather(*(super(LocalModelBackend, self).warm_up() for _ in range(self.max_concurrency)))
+
+    async def health(self) -> dict:
+        health = await super().health()
+        if not self.available:
+            health.update(status="down", last_error="transformers is not installed")
+        return {**health, "workers": self._workers.stats()}
+
+
+class RuleBasedBackend(InferenceBackend):
+    """The pattern-based optimizer, run on the shared process pool"""
+
+    name = "rule-based"
+    generative = False
+
+    def __init__(self, max_concurrency: int = RULE_ENGINE_MAX_CONCURRENCY, timeout: float = RULE_ENGINE_TIMEOUT,
+                 max_queue: int = RULE_ENGINE_MAX_QUEUE):
+        super().__init__(RULE_ENGINE_ID.split(":", 1)[1], max_concurrency, timeout, max_queue)
+
+    async def _generate(self, prompt: str) -> str:
+        raise InferenceError("The rule-based engine does not generate free text")
+
+    async def warm_up(self) -> None:
+        """Nothing to load; the worker processes are warmed with the shared executor"""
+
+    async def tailor(self, resume: str, job_desc: str) -> dict:
+        async with self._slot():
+            try:
+                result, timings = await asyncio.wait_for(
+                    executor.run_cpu("optimize", timed_resume_optimization, resume, job_desc), self.timeout
+                )
+            except asyncio.TimeoutError:
+                self._stats.timeouts += 1
+                raise InferenceError(f"{self.name} timed out after {self.timeout:.0f}s")
+        # Measured inside the worker process, reported from here
+        for stage, seconds in timings.items():
+            stage_seconds.observe(seconds, stage)
+        return result
+
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    "huggingface": HuggingFaceBackend,
+    "ollama": OllamaBackend,
+    "local": LocalModelBackend,
+    "rule-based": RuleBasedBackend,
+}
+
+
+def create_backend(name: str) -> InferenceBackend:
+    """Build the named backend with its configuration from the environment"""
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown inference backend {name!r}; choose from {', '.join(BACKENDS)}")
+    backend = backend_class()
+    logger.info(f"Using {backend.engine_id} inference backend")
+    return backend
@@ -0,0 +1,143 @@
+"""
+URL-keyed cache of scraped job descriptions with conditional revalidation
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+JOB_CACHE_TTL = float(os.getenv("JOB_CACHE_TTL", 900))  # Serve without revalidating for 15 minutes
+JOB_CACHE_STALE_TTL = float(os.getenv("JOB_CACHE_STALE_TTL", 86400))  # Keep validators for a day
+JOB_CACHE_NEGATIVE_TTL = float(os.getenv("JOB_CACHE_NEGATIVE_TTL", 120))  # Remember failures briefly
+JOB_CACHE_MAX_ENTRIES = int(os.getenv("JOB_CACHE_MAX_ENTRIES", 5000))
+
+
+class JobCacheEntry:
+    __slots__ = ("description", "etag", "last_modified", "fresh_until", "expires_at", "error")
+
+    def __init__(self, description: str = "", etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 fresh_until: float = 0.0, expires_at: float = 0.0, error: Optional[str] = None):
+        self.description = description
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+        self.error = error
+
+    @property
+    def is_negative(self) -> bool:
+        return self.error is not None
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+
+class JobDescriptionCache:
+    """LRU cache of extracted descriptions keeping ETag/Last-Modified validators for 304 revalidation"""
+
+    def __init__(self, ttl: float = JOB_CACHE_TTL, stale_ttl: float = JOB_CACHE_STALE_TTL,
+                 negative_ttl: float = JOB_CACHE_NEGATIVE_TTL, max_entries: int = JOB_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, JobCacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "hits": 0, "misses": 0, "revalidated": 0, "negative_hits": 0, "stores": 0, "failures": 0, "stale_served": 0,
+            "evictions": 0,
+        }
+
+    def lookup(self, url: str) -> Optional[JobCacheEntry]:
+        """Return the entry for url (fresh, stale or negative), dropping it once fully expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry.expires_at <= now:
+                del self._entries[url]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(url)
+            if entry.is_negative:
+                self.stats["negative_hits"] += 1
+            elif entry.is_fresh(now):
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+            return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[JobCacheEntry]) -> dict:
+        """If-None-Match / If-Modified-Since headers for revalidating a stale entry"""
+        headers = {}
+        if entry is not None and not entry.is_negative:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, description: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> None:
+        now = time.monotonic()
+        self._put(url, JobCacheEntry(description, etag, last_modified,
+                                     fresh_until=now + self.ttl,
+                                     expires_at=now + max(self.ttl, self.stale_ttl)))
+        self.stats["stores"] += 1
+
+    def revalidated(self, url: str, entry: JobCacheEntry) -> None:
+        """Upstream answered 304 Not Modified: extend the entry without re-downloading or re-parsing"""
+        now = time.monotonic()
+        entry.fresh_until = now + self.ttl
+        entry.expires_at = now + max(self.ttl, self.stale_ttl)
+        self._put(url, entry)
+        self.stats["revalidated"] += 1
+
+    def revalidation_failed(self, url: str, entry: JobCacheEntry) -> None:
+        """
+        Revalidating a stale entry failed: keep serving it (stale-if-error), and wait negative_ttl
+        before asking the upstream again instead of negative-caching over a good description
+        """
+        entry.fresh_until = time.monotonic() + self.negative_ttl
+        self._put(url, entry)
+        self.stats["failures"] += 1
+        self.stats["stale_served"] += 1
+
+    def store_failure(self, url: str, error: str) -> None:
+        now = time.monotonic()
+        self._put(url, JobCacheEntry(error=error, expires_at=now + self.negative_ttl))
+        self.stats["failures"] += 1
+
+    def _put(self, url: str, entry: JobCacheEntry) -> None:
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def purge(self, url: Optional[str] = None) -> int:
+        """Remove one URL, or everything when url is None; returns the number of entries removed"""
+        with self._lock:
+            if url is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                removed = 1 if self._entries.pop(url, None) is not None else 0
+        logger.info(f"Purged {removed} job cache entries")
+        return removed
+
+    def info(self) -> dict:
+        return {"size": len(self._entries), "max_entries": self.max_entries, "ttl_seconds": self.ttl, **self.stats}
+
+
+job_cache = JobDescriptionCache()
@@ -0,0 +1,459 @@
+"""
+Persistent background job queue: SQLite-backed jobs with priorities, retries, result TTL and callbacks
+"""
+
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from circuit_breaker import jittered_backoff
+from executors import StageExecutor
+from http_client import http_pool
+
+logger = logging.getLogger(__name__)
+
+# Queue configuration
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))  # Worker tasks in each API process; 0 leaves jobs to job_worker.py
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", 5))
+JOB_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_MAX_SECONDS", 300))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 300))  # A running job not finished by then is run again
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", 86400))  # Finished jobs are kept this long for polling
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", 1000))  # Queued jobs before new submissions are refused
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))  # Idle workers look for due retries and other writers
+JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", 10))
+JOB_CALLBACK_ATTEMPTS = int(os.getenv("JOB_CALLBACK_ATTEMPTS", 3))
+# Comma-separated hosts callbacks may go to; when unset, any host whose addresses are all public
+JOB_CALLBACK_ALLOWED_HOSTS = {host.strip().lower() for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",")
+                              if host.strip()}
+JOB_MAX_PRIORITY = int(os.getenv("JOB_MAX_PRIORITY", 10))  # Client-supplied priorities must be within 0..this
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_COLUMNS = ("id", "kind", "payload", "status", "priority", "attempts", "max_attempts", "available_at",
+            "lease_until", "created_at", "started_at", "finished_at", "expires_at", "result", "error",
+            "callback_url", "callback_status")
+
+
+class QueueFullError(Exception):
+    """JOB_MAX_PENDING jobs are already waiting"""
+
+
+class CallbackURLError(ValueError):
+    """The callback URL is not http(s), not allowed or points at a non-public address"""
+
+
+async def check_callback_url(url: str) -> None:
+    """
+    Raise CallbackURLError unless url may receive callbacks: http(s), on an allowed host when
+    JOB_CALLBACK_ALLOWED_HOSTS is set, otherwise on a host whose addresses are all public, so
+    clients cannot make the worker POST to loopback, the private network or 169.254.169.254
+    """
+    try:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port
+    except ValueError:
+        raise CallbackURLError("callback_url is not a valid URL")
+    if parts.scheme not in ("http", "https") or not host:
+        raise CallbackURLError("callback_url must be an http(s) URL")
+    if JOB_CALLBACK_ALLOWED_HOSTS:
+        if host.lower() not in JOB_CALLBACK_ALLOWED_HOSTS:
+            raise CallbackURLError(f"callback_url host {host} is not allowed")
+        return
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            host, port or (443 if parts.scheme == "https" else 80), type=socket.SOCK_STREAM,
+        )
+    except (OSError, UnicodeError):
+        raise CallbackURLError(f"callback_url host {host} does not resolve")
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+        if not address.is_global:
+            raise CallbackURLError(f"callback_url host {host} resolves to a non-public address")
+
+
+class Job:
+    """One row of the jobs table"""
+
+    __slots__ = _COLUMNS
+
+    def __init__(self, row: tuple):
+        for name, value in zip(_COLUMNS, row):
+            setattr(self, name, value)
+
+    @property
+    def is_final_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+    def as_dict(self) -> dict:
+        """Public view for GET /jobs/{id} and callbacks"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at,
+            "result": json.loads(self.result) if self.result else None,
+            "error": self.error,
+            "callback_status": self.callback_status,
+        }
+
+
+class JobQueue:
+    """
+    Jobs table in SQLite (WAL), so queued work survives restarts and several processes can share it.
+    Workers claim the highest-priority due job in a write transaction and hold a lease on it; a job
+    whose lease runs out (its worker died) is queued again, or failed once it has used its attempts.
+
+    The methods block while another process holds the write lock, so async code calls them through
+    run(), which uses the queue's own thread and keeps the event loop free.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, max_pending: int = JOB_MAX_PENDING,
+                 result_ttl: float = JOB_RESULT_TTL, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.path = path
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.lease_seconds = lease_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "priority INTEGER NOT NULL, attempts INTEGER NOT NULL, max_attempts INTEGER NOT NULL, "
+            "available_at REAL NOT NULL, lease_until REAL, created_at REAL NOT NULL, started_at REAL, "
+            "finished_at REAL, expires_at REAL, result TEXT, error TEXT, callback_url TEXT, callback_status TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, priority DESC, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at)")
+        self._lock = threading.Lock()
+        # One thread: the connection is used by one caller at a time anyway
+        self._thread = StageExecutor(process_workers=0, thread_workers=1)
+        self.last_counts: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {"enqueued": 0, "rejected": 0, "succeeded": 0, "retried": 0, "failed": 0,
+                                      "lease_expired": 0, "purged": 0}
+
+    async def run(self, method: Callable, *args) -> Any:
+        """Call one of the queue's methods on the queue thread, e.g. await queue.run(queue.get, job_id)"""
+        return await self._thread.run_io("job_queue", method, *args)
+
+    def enqueue(self, kind: str, payload: dict, priority: int = 0, max_attempts: int = JOB_MAX_ATTEMPTS,
+                callback_url: Optional[str] = None) -> Job:
+        """Store a new job; raises QueueFullError when max_pending jobs are already waiting"""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            pending = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise QueueFullError(f"Job queue is full ({pending} waiting)")
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, priority, attempts, max_attempts, available_at, "
+                "created_at, callback_url) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), QUEUED, priority, max(1, max_attempts), now, now, callback_url),
+            )
+            self.stats["enqueued"] += 1
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = Job(row)
+        if job.expires_at is not None and job.expires_at <= time.time():
+            return None
+        return job
+
+    def claim(self) -> Optional[Job]:
+        """Lease the highest-priority due job to the caller, or None when nothing is due"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status = ? AND available_at <= ? "
+                    "ORDER BY priority DESC, available_at, created_at LIMIT 1",
+                    (QUEUED, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                job = Job(row)
+                job.status = RUNNING
+                job.attempts += 1
+                job.started_at = now
+                job.lease_until = now + self.lease_seconds
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = ?, started_at = ?, lease_until = ? WHERE id = ?",
+                    (RUNNING, job.attempts, now, job.lease_until, job.id),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def complete(self, job: Job, result: dict) -> Job:
+        now = time.time()
+        self._finish(job, SUCCEEDED, now, result=json.dumps(result), error=None)
+        self.stats["succeeded"] += 1
+        return job
+
+    def fail(self, job: Job, error: str) -> Job:
+        """Record a failed attempt: back off and queue the job again, or fail it after its last attempt"""
+        now = time.time()
+        if job.is_final_attempt:
+            self._finish(job, FAILED, now, result=None, error=error)
+            self.stats["failed"] += 1
+            return job
+        delay = jittered_backoff(job.attempts - 1, JOB_RETRY_BACKOFF_SECONDS, JOB_RETRY_BACKOFF_MAX_SECONDS)
+        job.status, job.available_at, job.lease_until, job.error = QUEUED, now + delay, None, error
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, lease_until = NULL, error = ? WHERE id = ?",
+                (QUEUED, job.available_at, error, job.id),
+            )
+        self.stats["retried"] += 1
+        logger.info(f"Job {job.id} attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+        return job
+
+    def renew(self, job: Job) -> bool:
+        """Extend a running job's lease; False when the job is no longer this worker's to run"""
+        lease_until = time.time() + self.lease_seconds
+        with self._lock:
+            renewed = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (lease_until, job.id, RUNNING, job.attempts),
+            ).rowcount
+        if renewed:
+            job.lease_until = lease_until
+        return bool(renewed)
+
+    def release(self, job: Job) -> None:
+        """Put a running job back without counting the attempt (worker shutting down)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_until = NULL WHERE id = ? AND status = ?",
+                (QUEUED, job.id, RUNNING),
+            )
+
+    def _finish(self, job: Job, status: str, now: float, result: Optional[str], error: Optional[str]) -> None:
+        job.status, job.finished_at, job.expires_at = status, now, now + self.result_ttl
+        job.result, job.error, job.lease_until = result, error, None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ?, result = ?, error = ?, "
+                "lease_until = NULL WHERE id = ?",
+                (status, now, job.expires_at, result, error, job.id),
+            )
+
+    def set_callback_status(self, job: Job, status: str) -> None:
+        job.callback_status = status
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, job.id))
+
+    def maintain(self) -> List[Job]:
+        """
+        Requeue jobs whose worker died, fail those that have used all their attempts (so a job that
+        keeps killing its worker cannot loop forever) and delete finished jobs past their TTL.
+        Returns the jobs failed here, for their callbacks.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = [Job(row) for row in self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE status = ? AND lease_until < ?", (RUNNING, now),
+                ).fetchall()]
+                requeued = [job for job in expired if not job.is_final_attempt]
+                failed = [job for job in expired if job.is_final_attempt]
+                self._conn.executemany("UPDATE jobs SET status = ?, lease_until = NULL WHERE id = ?",
+                                       [(QUEUED, job.id) for job in requeued])
+                for job in failed:
+                    job.status, job.finished_at, job.expires_at = FAILED, now, now + self.result_ttl
+                    job.error = f"Lease expired on attempt {job.attempts} of {job.max_attempts}"
+                    job.lease_until = None
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ?, error = ?, lease_until = NULL "
+                    "WHERE id = ?",
+                    [(FAILED, now, job.expires_at, job.error, job.id) for job in failed],
+                )
+                purged = self._conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,)).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if requeued:
+            logger.warning(f"Requeued {len(requeued)} job(s) whose lease expired")
+        if failed:
+            logger.warning(f"Failed {len(failed)} job(s) whose lease expired on their last attempt")
+        self.stats["lease_expired"] += len(expired)
+        self.stats["failed"] += len(failed)
+        self.stats["purged"] += purged
+        return failed
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs by status; also kept in last_counts for readers that cannot wait on the database"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        self.last_counts = {**{status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}, **dict(rows)}
+        return self.last_counts
+
+    def info(self) -> dict:
+        return {"path": self.path, "max_pending": self.max_pending, "result_ttl_seconds": self.result_ttl,
+                "jobs": self.counts(), **self.stats}
+
+    def close(self) -> None:
+        self._thread.shutdown()
+        self._conn.close()
+
+
+JobHandler = Callable[[dict, Job], Awaitable[dict]]
+
+
+class JobWorkerPool:
+    """Asyncio worker tasks that claim jobs, run the handler for their kind and deliver callbacks"""
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, JobHandler], workers: int = JOB_WORKERS,
+                 poll_interval: float = JOB_POLL_INTERVAL):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = max(0, workers)
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Dict[str, Job] = {}
+        self._last_maintenance = 0.0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Spawn the worker tasks (called from the app lifespan)"""
+        if self.started or not self.workers:
+            return
+        self._wakeup = asyncio.Event()
+        # The first worker to run does the startup maintenance
+        self._last_maintenance = float("-inf")
+        self._tasks = [asyncio.ensure_future(self._work(index)) for index in range(self.workers)]
+        logger.info(f"Job workers started ({self.workers} workers, queue at {self.queue.path})")
+
+    async def shutdown(self) -> None:
+        """Stop the workers; jobs they were running go back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for job in list(self._running.values()):
+            await self.queue.run(self.queue.release, job)
+        if self._tasks:
+            logger.info("Job workers shut down")
+        self._tasks = []
+        self._running.clear()
+
+    def notify(self) -> None:
+        """Wake an idle worker after a job was enqueued in this process"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _work(self, index: int) -> None:
+        while True:
+            if time.monotonic() - self._last_maintenance >= self.poll_interval * 30:
+                self._last_maintenance = time.monotonic()
+                for failed in await self.queue.run(self.queue.maintain):
+                    if failed.callback_url:
+                        await self._deliver_callback(failed)
+            job = await self.queue.run(self.queue.claim)
+            if job is None:
+                # Sleep until notified, or poll for due retries and jobs enqueued by other processes
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        handler = self.handlers.get(job.kind)
+        self._running[job.id] = job
+        heartbeat = asyncio.ensure_future(self._keep_lease(job))
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind {job.kind!r}")
+            result = await handler(json.loads(job.payload), job)
+        except asyncio.CancelledError:
+            # Left in _running so shutdown() puts the job back in the queue
+            raise
+        except Exception as e:
+            await self.queue.run(self.queue.fail, job, str(e) or type(e).__name__)
+        else:
+            await self.queue.run(self.queue.complete, job, result)
+        finally:
+            heartbeat.cancel()
+        self._running.pop(job.id, None)
+        if job.status in (SUCCEEDED, FAILED) and job.callback_url:
+            await self._deliver_callback(job)
+
+    async def _keep_lease(self, job: Job) -> None:
+        """Renew the job's lease while it runs, so maintain() does not hand it to another worker"""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                renewed = await self.queue.run(self.queue.renew, job)
+            except Exception as e:
+                logger.warning(f"Could not renew the lease of job {job.id}: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"Job {job.id} lost its lease while running")
+                return
+
+    async def _deliver_callback(self, job: Job) -> None:
+        """POST the finished job to its callback URL, retrying with backoff on errors"""
+        try:
+            # Checked again here: the host may resolve differently than when the job was submitted
+            await check_callback_url(job.callback_url)
+        except CallbackURLError as e:
+            logger.warning(f"Callback for job {job.id} refused: {str(e)}")
+            await self.queue.run(self.queue.set_callback_status, job, f"refused ({str(e)})")
+            return
+        for attempt in range(JOB_CALLBACK_ATTEMPTS):
+            try:
+                # No redirects: they could lead anywhere the check above refuses
+                response = await http_pool.post(job.callback_url, json=job.as_dict(), timeout=JOB_CALLBACK_TIMEOUT,
+                                                follow_redirects=False)
+                if response.status_code < 500:
+                    status = "delivered" if response.status_code < 300 else f"rejected ({response.status_code})"
+                    await self.queue.run(self.queue.set_callback_status, job, status)
+                    return
+                error = f"status {response.status_code}"
+            except httpx.HTTPError as e:
+                error = str(e) or type(e).__name__
+            if attempt + 1 < JOB_CALLBACK_ATTEMPTS:
+                await asyncio.sleep(jittered_backoff(attempt, 1.0, 30.0))
+        logger.warning(f"Callback for job {job.id} failed: {error}")
+        await self.queue.run(self.queue.set_callback_status, job, f"failed ({error})")
+
+    def info(self) -> dict:
+        return {"workers": self.workers, "started": self.started, "running": len(self._running)}
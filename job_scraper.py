@@ -0,0 +1,521 @@
+"""
+Streaming job page extraction: per-domain rules and a single-pass HTML parser that stops once the
+description is collected
+"""
+
+import codecs
+import html
+import json
+import logging
+import os
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from executors import executor
+
+logger = logging.getLogger(__name__)
+
+# Extraction limits
+JOB_PAGE_MAX_BYTES = int(os.getenv("JOB_PAGE_MAX_BYTES", 2 * 1024 * 1024))  # Never read more of a page than this
+JOB_DESCRIPTION_MAX_CHARS = int(os.getenv("JOB_DESCRIPTION_MAX_CHARS", 5000))
+JSON_LD_MAX_CHARS = int(os.getenv("JSON_LD_MAX_CHARS", 512 * 1024))  # Largest JSON-LD block parsed
+SCRAPING_RULES_PATH = os.getenv("SCRAPING_RULES_PATH", os.path.join(os.path.dirname(__file__), "scraping_rules.json"))
+
+# Common job description selectors, best first (used for sites without a rule)
+JOB_DESCRIPTION_SELECTORS = (
+    '.job-description', '.jobsearch-jobDescriptionText', '[data-testid="job-description"]',
+    '.job-details', '.description', '.job-content', '.posting-description',
+)
+
+# Extraction strategies a rule chains together, tried in the rule's order:
+# its own selectors, a JSON-LD JobPosting, the generic selectors, then all paragraph text
+STRATEGIES = ("selectors", "json_ld", "default", "paragraphs")
+DEFAULT_CHAIN = ("selectors", "json_ld", "default", "paragraphs")
+
+# Elements whose text is never part of a description
+SKIPPED_TAGS = frozenset(('script', 'style', 'template', 'noscript'))
+VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source',
+                       'track', 'wbr'))
+# Elements that start a new line in the extracted text
+BLOCK_TAGS = frozenset(('address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'fieldset',
+                        'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+                        'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul'))
+
+_CHUNK_SIZE = 64 * 1024
+_SELECTOR_PART_RE = re.compile(r'^[\w-]+|\.[\w-]+|#[\w-]+|\[\s*([\w:-]+)\s*(?:=\s*["\']?([^"\'\]]*)["\']?\s*)?\]')
+
+
+class Selector:
+    """A compiled simple CSS selector: tag, #id, .class and [attr] / [attr="value"] parts"""
+
+    __slots__ = ("text", "tag", "element_id", "classes", "attributes")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tag: Optional[str] = None
+        self.element_id: Optional[str] = None
+        self.classes: frozenset = frozenset()
+        self.attributes: Tuple[Tuple[str, Optional[str]], ...] = ()
+        classes, attributes, position = [], [], 0
+        for match in _SELECTOR_PART_RE.finditer(text.strip()):
+            if match.start() != position:
+                break
+            position = match.end()
+            part = match.group(0)
+            if part.startswith('.'):
+                classes.append(part[1:])
+            elif part.startswith('#'):
+                self.element_id = part[1:]
+            elif part.startswith('['):
+                attributes.append((match.group(1).lower(), match.group(2)))
+            else:
+                self.tag = part.lower()
+        if position != len(text.strip()) or not position:
+            raise ValueError(f"Unsupported selector: {text!r}")
+        self.classes = frozenset(classes)
+        self.attributes = tuple(attributes)
+
+    @property
+    def needs_no_attributes(self) -> bool:
+        return not (self.element_id or self.classes or self.attributes)
+
+    def matches(self, tag: str, attrs: Dict[str, str]) -> bool:
+        if self.tag is not None and tag != self.tag:
+            return False
+        if self.element_id is not None and attrs.get('id') != self.element_id:
+            return False
+        if self.classes and not self.classes.issubset(attrs.get('class', '').split()):
+            return False
+        for name, value in self.attributes:
+            if name not in attrs or (value is not None and attrs[name] != value):
+                return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"Selector({self.text!r})"
+
+
+DEFAULT_SELECTORS = tuple(Selector(selector) for selector in JOB_DESCRIPTION_SELECTORS)
+
+
+class ScrapingRule:
+    """Compiled extraction rule for one job site: its selectors and the order strategies are tried in"""
+
+    __slots__ = ("name", "domains", "selectors", "chain", "groups", "_ranks")
+
+    def __init__(self, name: str, domains: Sequence[str] = (), selectors: Sequence[str] = (),
+                 chain: Sequence[str] = DEFAULT_CHAIN, default_selectors: Sequence[Selector] = DEFAULT_SELECTORS):
+        unknown = [strategy for strategy in chain if strategy not in STRATEGIES]
+        if unknown or not chain:
+            raise ValueError(f"Rule {name!r} has an invalid chain: {list(chain)}")
+        self.name = name
+        self.domains = tuple(domain.lower().lstrip('.') for domain in domains)
+        self.chain = tuple(chain)
+        site = [Selector(selector) for selector in selectors]
+        generic = list(default_selectors) if 'default' in self.chain else []
+        # Site and generic selectors share one priority list, so one parser pass matches both
+        self.selectors = tuple(site + generic)
+        self.groups = {"selectors": range(0, len(site)), "default": range(len(site), len(site) + len(generic))}
+        self._ranks = {strategy: rank for rank, strategy in enumerate(self.chain)}
+
+    def rank(self, strategy: str) -> int:
+        return self._ranks.get(strategy, len(self.chain))
+
+    def group_of(self, priority: int) -> str:
+        return "selectors" if priority in self.groups["selectors"] else "default"
+
+    @classmethod
+    def from_dict(cls, data: dict, default_selectors: Sequence[Selector] = DEFAULT_SELECTORS) -> "ScrapingRule":
+        return cls(data["name"], data.get("domains", ()), data.get("selectors", ()),
+                   data.get("chain", DEFAULT_CHAIN), default_selectors)
+
+    def __repr__(self) -> str:
+        return f"ScrapingRule({self.name!r}, {list(self.chain)})"
+
+
+class ScrapingRules:
+    """Domain-keyed registry: a URL's host, or its nearest parent domain, picks the rule"""
+
+    def __init__(self, rules: Sequence[ScrapingRule], default: ScrapingRule, path: Optional[str] = None):
+        self.rules = list(rules)
+        self.default = default
+        self.path = path
+        self._by_domain: Dict[str, ScrapingRule] = {}
+        for rule in self.rules:
+            for domain in rule.domains:
+                if domain in self._by_domain:
+                    raise ValueError(f"Domain {domain!r} is claimed by rules {self._by_domain[domain].name!r} and {rule.name!r}")
+                self._by_domain[domain] = rule
+        self.hits: Counter = Counter()
+        self.strategies: Counter = Counter()
+
+    def rule_for(self, url: str) -> ScrapingRule:
+        host = (urlsplit(url).hostname or '').lower()
+        labels = host.split('.')
+        for start in range(len(labels) - 1):
+            rule = self._by_domain.get('.'.join(labels[start:]))
+            if rule is not None:
+                return rule
+        return self.default
+
+    def record(self, rule: ScrapingRule, strategy: Optional[str]) -> None:
+        self.hits[rule.name] += 1
+        self.strategies[f"{rule.name}:{strategy or 'none'}"] += 1
+
+    @classmethod
+    def from_dict(cls, data: dict, path: Optional[str] = None) -> "ScrapingRules":
+        default_data = data.get("default", {})
+        default_selectors = tuple(Selector(selector) for selector in default_data.get("selectors", JOB_DESCRIPTION_SELECTORS))
+        default = ScrapingRule("default", (), (), default_data.get("chain", ("default", "json_ld", "paragraphs")),
+                               default_selectors)
+        rules = [ScrapingRule.from_dict(rule, default_selectors) for rule in data.get("rules", [])]
+        return cls(rules, default, path)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScrapingRules":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f), path)
+
+    def info(self) -> dict:
+        return {"path": self.path, "rules": len(self.rules), "domains": len(self._by_domain),
+                "hits": dict(self.hits), "strategies": dict(self.strategies)}
+
+
+def load_scraping_rules(path: str = SCRAPING_RULES_PATH) -> ScrapingRules:
+    """Load the rules file, falling back to the generic selectors when there is none"""
+    if not os.path.exists(path):
+        logger.warning(f"No scraping rules at {path}, using the generic selectors only")
+        return ScrapingRules.from_dict({})
+    rules = ScrapingRules.from_file(path)
+    logger.info(f"Loaded {len(rules.rules)} scraping rules from {path}")
+    return rules
+
+
+class _Capture:
+    __slots__ = ("priority", "parts", "chars", "open")
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.parts: List[str] = []
+        self.chars = 0
+        self.open = True
+
+    def add(self, text: str, limit: int) -> None:
+        if self.chars < limit:
+            self.parts.append(text)
+            self.chars += len(text) + 1
+
+    def newline(self) -> None:
+        if self.parts and self.parts[-1] != '\n':
+            self.parts.append('\n')
+
+    def text(self, limit: int) -> str:
+        lines, words = [], []
+        for part in self.parts:
+            if part == '\n':
+                if words:
+                    lines.append(' '.join(words))
+                    words = []
+            else:
+                words.append(part)
+        if words:
+            lines.append(' '.join(words))
+        return '\n'.join(lines)[:limit]
+
+
+class _TextParser(HTMLParser):
+    # Flattens an HTML fragment (such as a JSON-LD description) to text with block-level line breaks
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.capture = _Capture(0)
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in BLOCK_TAGS:
+            self.capture.newline()
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag in BLOCK_TAGS:
+            self.capture.newline()
+
+    def handle_data(self, data: str) -> None:
+        text = data.strip()
+        if text and not self._skip_depth:
+            self.capture.add(text, self.max_chars)
+
+
+def html_to_text(fragment: str, max_chars: int = JOB_DESCRIPTION_MAX_CHARS) -> str:
+    parser = _TextParser(max_chars)
+    parser.feed(fragment)
+    parser.close()
+    return parser.capture.text(max_chars)
+
+
+def job_posting_description(raw: str, max_chars: int = JOB_DESCRIPTION_MAX_CHARS) -> str:
+    """Description text of the first schema.org JobPosting in a JSON-LD block, or ''"""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return ''
+    nodes = data if isinstance(data, list) else [data]
+    while nodes:
+        node = nodes.pop(0)
+        if not isinstance(node, dict):
+            continue
+        node_type = node.get('@type')
+        types = node_type if isinstance(node_type, list) else [node_type]
+        description = node.get('description')
+        if 'JobPosting' in types and isinstance(description, str):
+            # Some sites escape the description's markup a second time
+            if '<' not in description and '&lt;' in description:
+                description = html.unescape(description)
+            return html_to_text(description, max_chars)
+        graph = node.get('@graph')
+        if isinstance(graph, list):
+            nodes.extend(graph)
+    return ''
+
+
+class JobDescriptionParser(HTMLParser):
+    """
+    Event-driven extractor running a rule's whole fallback chain in one pass over the page.
+
+    The first element matching each selector is captured, at most max_chars of it, along with the first
+    JSON-LD JobPosting and all paragraph text. Parsing stops once a capture holds max_chars and nothing
+    ranked above it is still pending, or once the best strategy that can still succeed has its text.
+    description() then returns the first non-empty result in chain order.
+    """
+
+    def __init__(self, rule: ScrapingRule, max_chars: int = JOB_DESCRIPTION_MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.rule = rule
+        self.selectors = list(rule.selectors)
+        self.max_chars = max_chars
+        self.done = False
+        self.strategy: Optional[str] = None
+        self._stack: List[Tuple[str, List[_Capture]]] = []
+        self._captures: Dict[int, _Capture] = {}
+        self._pending = list(enumerate(self.selectors))
+        self._attributeless = [entry for entry in self._pending if entry[1].needs_no_attributes]
+        self._open: List[_Capture] = []
+        self._paragraphs = _Capture(len(self.selectors))
+        self._paragraph_depth = 0
+        self._skip_depth = 0
+        self._wants_json_ld = 'json_ld' in rule.chain
+        self._json_ld_parts: Optional[List[str]] = None
+        self._json_ld_chars = 0
+        self._json_ld = ''
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self.done:
+            return
+        if tag in BLOCK_TAGS:
+            self._newline()
+        if tag in VOID_TAGS:
+            return
+        started = []
+        candidates = self._pending if attrs else self._attributeless
+        if candidates:
+            attr_map = {name: value or '' for name, value in attrs}
+            for priority, selector in candidates:
+                if priority not in self._captures and selector.matches(tag, attr_map):
+                    capture = self._captures[priority] = _Capture(priority)
+                    started.append(capture)
+                    self._open.append(capture)
+            if started:
+                self._pending = [entry for entry in self._pending if entry[0] not in self._captures]
+                self._attributeless = [entry for entry in self._attributeless if entry[0] not in self._captures]
+        if tag == 'p':
+            self._paragraph_depth += 1
+        elif tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            if tag == 'script' and self._wants_json_ld and not self._json_ld and self._json_ld_parts is None:
+                script_type = next((value for name, value in attrs if name == 'type'), None) or ''
+                if script_type.strip().lower() == 'application/ld+json':
+                    self._json_ld_parts = []
+        self._stack.append((tag, started))
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in BLOCK_TAGS and not self.done:
+            self._newline()
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.done or not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        # Pop until the matching start tag, closing anything left unclosed inside it
+        while self._stack:
+            open_tag, started = self._stack.pop()
+            if open_tag == 'p':
+                self._paragraph_depth -= 1
+            elif open_tag in SKIPPED_TAGS:
+                self._skip_depth -= 1
+                if open_tag == 'script' and self._json_ld_parts is not None:
+                    self._finish_json_ld()
+            for capture in started:
+                self._complete(capture)
+            if open_tag == tag:
+                break
+        if tag in BLOCK_TAGS:
+            self._newline()
+
+    def handle_data(self, data: str) -> None:
+        if self._json_ld_parts is not None:
+            if self._json_ld_chars < JSON_LD_MAX_CHARS:
+                self._json_ld_parts.append(data)
+                self._json_ld_chars += len(data)
+            return
+        if self.done or self._skip_depth:
+            return
+        text = data.strip()
+        if not text:
+            return
+        for capture in list(self._open):
+            capture.add(text, self.max_chars)
+            if capture.chars >= self.max_chars:
+                self._complete(capture)
+                # A full-length description is enough unless something ranked above it is still pending
+                self.done = self.done or self._nothing_pending_above(capture)
+                if self.done:
+                    return
+        if self._paragraph_depth:
+            self._paragraphs.add(text, self.max_chars)
+
+    def _newline(self) -> None:
+        for capture in self._open:
+            capture.newline()
+        self._paragraphs.newline()
+
+    def _complete(self, capture: _Capture) -> None:
+        if not capture.open:
+            return
+        capture.open = False
+        self._open.remove(capture)
+        self.done = self._resolved()
+
+    def _finish_json_ld(self) -> None:
+        raw = ''.join(self._json_ld_parts)
+        self._json_ld_parts = None
+        self._json_ld = job_posting_description(raw, self.max_chars)
+        if self._json_ld:
+            self.done = self.done or self._resolved()
+
+    def _nothing_pending_above(self, capture: _Capture) -> bool:
+        rank = self.rule.rank(self.rule.group_of(capture.priority))
+        if not self._json_ld and self.rule.rank('json_ld') < rank:
+            return False
+        return not any(other.priority < capture.priority for other in self._open)
+
+    def _resolved(self) -> bool:
+        # Finished once the best strategy that can still succeed has its text
+        for strategy in self.rule.chain:
+            if strategy == 'json_ld':
+                # A JobPosting block may still appear further down the page
+                return bool(self._json_ld)
+            if strategy == 'paragraphs':
+                return False
+            for priority in self.rule.groups[strategy]:
+                capture = self._captures.get(priority)
+                if capture is None or capture.open:
+                    return False
+                if capture.parts:
+                    return True
+        return False
+
+    def _strategy_text(self, strategy: str) -> str:
+        if strategy == 'json_ld':
+            return self._json_ld
+        if strategy == 'paragraphs':
+            return self._paragraphs.text(self.max_chars)
+        for priority in self.rule.groups[strategy]:
+            capture = self._captures.get(priority)
+            text = capture.text(self.max_chars) if capture is not None else ''
+            if text:
+                return text
+        return ''
+
+    def description(self) -> str:
+        """The first non-empty result in the rule's chain order"""
+        for strategy in self.rule.chain:
+            text = self._strategy_text(strategy)
+            if text:
+                self.strategy = strategy
+                return text
+        return ''
+
+
+scraping_rules = load_scraping_rules()
+
+
+def extract_job_description(content, rule: ScrapingRule, max_chars: int = JOB_DESCRIPTION_MAX_CHARS) -> Tuple[str, Optional[str]]:
+    """Run a rule over a whole page (bytes or str); returns the description and the strategy that found it"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    parser = JobDescriptionParser(rule, max_chars)
+    for start in range(0, len(content), _CHUNK_SIZE):
+        parser.feed(content[start:start + _CHUNK_SIZE])
+        if parser.done:
+            break
+    if not parser.done:
+        parser.close()
+    return parser.description(), parser.strategy
+
+
+def parse_job_description_html(content, url: str = '', max_chars: int = JOB_DESCRIPTION_MAX_CHARS) -> str:
+    """Extract the job description text from a whole job posting page using the rule for its URL"""
+    rule = scraping_rules.rule_for(url)
+    description, strategy = extract_job_description(content, rule, max_chars)
+    scraping_rules.record(rule, strategy)
+    return description
+
+
+def _feed(parser: JobDescriptionParser, decoder: codecs.IncrementalDecoder, chunk: bytes) -> None:
+    parser.feed(decoder.decode(chunk))
+
+
+def _finish_parse(parser: JobDescriptionParser, decoder: codecs.IncrementalDecoder) -> str:
+    """Flush the decoder and parser and build the description; the close can run a full-page fallback"""
+    if not parser.done:
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+    return parser.description()
+
+
+async def read_job_description(response: httpx.Response, rule: Optional[ScrapingRule] = None,
+                               max_bytes: int = JOB_PAGE_MAX_BYTES,
+                               max_chars: int = JOB_DESCRIPTION_MAX_CHARS) -> str:
+    """Parse a streamed response chunk by chunk, closing it as soon as the description is collected"""
+    # The final URL after redirects decides the site rule
+    rule = rule or scraping_rules.rule_for(str(response.url))
+    parser = JobDescriptionParser(rule, max_chars)
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset_encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    received = 0
+    async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+        received += len(chunk)
+        if received > max_bytes:
+            chunk = chunk[:len(chunk) - (received - max_bytes)]
+        # Chunks are decoded and parsed in order on the I/O pool so the event loop stays free
+        await executor.run_io("html_parse", _feed, parser, decoder, chunk)
+        if parser.done:
+            break
+        if received >= max_bytes:
+            logger.info(f"Job page exceeded {max_bytes} bytes, parsing only the first part")
+            break
+    description = await executor.run_io("html_parse", _finish_parse, parser, decoder)
+    scraping_rules.record(rule, parser.strategy)
+    logger.info(f"Parsed {min(received, max_bytes)} bytes of job page with rule {rule.name} "
+                f"({parser.strategy or 'no match'}, {'stopped early' if parser.done else 'full page'})")
+    return description
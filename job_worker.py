@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Standalone job worker: runs queued tailoring jobs without serving HTTP
+Point it at the API's JOB_QUEUE_PATH and scale it separately (set JOB_WORKERS=0 on the API to leave all jobs here)
+"""
+
+import asyncio
+import logging
+import os
+
+from app import job_queue, job_workers, llm_backend
+from executors import executor
+from http_client import http_pool
+from job_queue import JobWorkerPool
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", 4))
+
+
+async def main():
+    await http_pool.start()
+    executor.start()
+    await llm_backend.start()
+    workers = JobWorkerPool(job_queue, job_workers.handlers, JOB_WORKER_CONCURRENCY)
+    workers.start()
+    try:
+        # Run until interrupted
+        await asyncio.Event().wait()
+    finally:
+        await workers.shutdown()
+        job_queue.close()
+        await llm_backend.close()
+        await http_pool.close()
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        logger.info("Job worker stopped")
@@ -0,0 +1,110 @@
+"""
+Pattern-based resume optimizer: the rule engine used when no language model is available
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ats_score import score_tailoring
+from resume_parser import ResumeDocument, parse_resume
+from skills import SKILLS_TOP_K, RankedSkill, rank_skills
+
+# Engine id is part of the result cache key; bump it when the rules change
+RULE_ENGINE_ID = "rule-based:v5"
+
+
+def extract_skills_from_job_desc(job_desc: str, top_k: int = SKILLS_TOP_K) -> List[str]:
+    """Extract the top skills from job description, ranked deterministically"""
+    return [skill.name for skill in rank_skills(job_desc, top_k)]
+
+
+def intelligent_resume_optimization(resume: str, job_desc: str, document: Optional[ResumeDocument] = None,
+                                    required_skills: Optional[List[RankedSkill]] = None) -> dict:
+    """Intelligent resume optimization using pattern matching and keyword enhancement"""
+    
+    # Extract skills from job description
+    if required_skills is None:
+        required_skills = rank_skills(job_desc)
+    required_keys = {skill.skill for skill in required_skills}
+    
+    # Parse the resume once; every check below reads precomputed line attributes
+    if document is None:
+        document = parse_resume(resume)
+    optimized_lines = []
+    
+    # Track what we've enhanced
+    enhancements_made = []
+    
+    for parsed in document.lines:
+        line = parsed.text
+        
+        # Enhance job titles
+        if parsed.is_title and 'senior' not in parsed.lower and parsed.word_count < 6:
+            line = line.replace('Software Engineer', 'Senior Software Engineer')
+            line = line.replace('Developer', 'Senior Developer')
+            enhancements_made.append("Enhanced job titles")
+        
+        # Enhance bullet points with relevant skills
+        if parsed.is_bullet and not required_keys.isdisjoint(parsed.skill_keys):
+            # Add quantification if missing
+            if not parsed.has_number:
+                if 'developed' in parsed.lower:
+                    line = line.rstrip() + " (improved efficiency by 25%)"
+                elif 'managed' in parsed.lower or 'led' in parsed.lower:
+                    line = line.rstrip() + " (team of 5+ members)"
+                elif 'implemented' in parsed.lower:
+                    line = line.rstrip() + " (reduced processing time by 30%)"
+            
+            enhancements_made.append("Added quantifiable achievements")
+        
+        # Enhance skills section
+        if parsed.is_skills_line:
+            # Add top 5 relevant skills that might be missing
+            new_skills = [skill.name for skill in required_skills[:5] if skill.skill not in parsed.skill_keys]
+            
+            if new_skills:
+                line = line.rstrip() + ", " + ", ".join(new_skills)
+                enhancements_made.append("Enhanced skills section")
+        
+        optimized_lines.append(line)
+    
+    # Create optimization notes
+    if not enhancements_made:
+        enhancements_made = ["Optimized keyword density", "Improved ATS compatibility"]
+    
+    optimization_notes = f"Applied {len(enhancements_made)} key optimizations: {', '.join(dict.fromkeys(enhancements_made))}. Aligned resume with {len(required_skills)} job requirements for better ATS scoring."
+    
+    return {
+        "tailored_resume": '\n'.join(optimized_lines),
+        "key_skills_extracted": [skill.name for skill in required_skills],
+        "optimization_notes": optimization_notes
+    }
+
+
+def timed_resume_optimization(resume: str, job_desc: str) -> Tuple[dict, Dict[str, float]]:
+    """
+    intelligent_resume_optimization with its ATS match score, plus how long skill extraction, the
+    rewrite and the scoring took, for metrics
+    """
+    started = time.perf_counter()
+    required_skills = rank_skills(job_desc)
+    extracted = time.perf_counter()
+    document = parse_resume(resume)
+    result = intelligent_resume_optimization(resume, job_desc, document, required_skills)
+    optimized = time.perf_counter()
+    result["ats_score"] = score_tailoring(resume, result["tailored_resume"], job_desc, document, required_skills)
+    return result, {"skill_extraction": extracted - started, "optimization": optimized - extracted,
+                    "ats_score": time.perf_counter() - optimized}
+
+
+def optimize_for_descriptions(resume: str, job_descriptions: List[str]) -> List[dict]:
+    """Run the pattern-based optimizer and ATS scoring against several job descriptions, parsing the resume once"""
+    document = parse_resume(resume)
+    results = []
+    for job_description in job_descriptions:
+        required_skills = rank_skills(job_description)
+        result = intelligent_resume_optimization(resume, job_description, document, required_skills)
+        result["ats_score"] = score_tailoring(resume, result["tailored_resume"], job_description, document,
+                                              required_skills)
+        results.append(result)
+    return results
@@ -0,0 +1,285 @@
+"""
+Admission control: token-bucket rate limits per client and per upstream, and bounded request queues
+"""
+
+import asyncio
+import hashlib
+import ipaddress
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Optional: only needed for RATE_LIMIT_BACKEND=redis
+    redis_asyncio = None
+
+# Limiter configuration
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" (per process) or "redis" (shared by workers)
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 10000))  # Buckets kept in memory before the idlest is dropped
+
+# Per-client limits on the expensive endpoints; 0 disables
+CLIENT_RATE_PER_MINUTE = float(os.getenv("CLIENT_RATE_PER_MINUTE", 60))
+CLIENT_RATE_BURST = int(os.getenv("CLIENT_RATE_BURST", 20))
+CLIENT_ID_HEADER = os.getenv("CLIENT_ID_HEADER", "X-API-Key")  # Clients sending a key from CLIENT_API_KEYS are limited by it
+CLIENT_API_KEYS = [key.strip() for key in os.getenv("CLIENT_API_KEYS", "").split(",") if key.strip()]  # Comma-separated
+
+# Redis token bucket: refill, then take cost tokens if there are enough. Returns {allowed, seconds to wait}
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+class QueueFullError(Exception):
+    """Every slot is busy and the wait queue is full"""
+
+
+class LimiterStats:
+    """Admission counters for one limiter or gate"""
+
+    def __init__(self):
+        self.allowed = 0
+        self.rejected = 0
+        self.backend_errors = 0
+
+    def as_dict(self) -> dict:
+        return {"allowed": self.allowed, "rejected": self.rejected, "backend_errors": self.backend_errors}
+
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets, one per key: each holds up to burst tokens and refills at
+    rate_per_minute. A request takes cost tokens or is rejected with the seconds until it could pass.
+    """
+
+    backend = "memory"
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.name = name
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self.max_keys = max_keys
+        self.stats = LimiterStats()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    async def acquire(self, key: str = "", cost: float = 1) -> float:
+        """Take cost tokens from key's bucket; returns 0 when allowed, else seconds until retry"""
+        if not self.enabled:
+            return 0.0
+        wait = self._take(key, cost)
+        self._count(wait)
+        return wait
+
+    def _take(self, key: str, cost: float) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= cost:
+            bucket[0] = tokens - cost
+            return 0.0
+        bucket[0] = tokens
+        return (cost - tokens) / self.rate
+
+    def _count(self, wait: float) -> None:
+        if wait:
+            self.stats.rejected += 1
+        else:
+            self.stats.allowed += 1
+
+    def info(self) -> dict:
+        return {"backend": self.backend, "rate_per_minute": round(self.rate * 60, 2), "burst": self.burst,
+                "keys": len(self._buckets), **self.stats.as_dict()}
+
+
+class RedisTokenBucketLimiter(TokenBucketLimiter):
+    """The same buckets kept in Redis (or a compatible server) so every worker shares one limit"""
+
+    backend = "redis"
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, url: str = RATE_LIMIT_REDIS_URL):
+        super().__init__(name, rate_per_minute, burst)
+        self.url = url
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def acquire(self, key: str = "", cost: float = 1) -> float:
+        if not self.enabled:
+            return 0.0
+        try:
+            allowed, wait = await self._script(keys=[f"ratelimit:{self.name}:{key}"],
+                                               args=[self.rate, self.burst, time.time(), cost])
+        except Exception as e:
+            # Fail open on the shared store and fall back to this process's own bucket
+            self.stats.backend_errors += 1
+            logger.warning(f"Rate limit store unavailable for {self.name}: {str(e)}")
+            wait = self._take(key, cost)
+        else:
+            wait = 0.0 if int(allowed) else float(wait)
+        self._count(wait)
+        return wait
+
+    def info(self) -> dict:
+        return {**super().info(), "keys": None, "url": self.url}
+
+
+def create_limiter(name: str, rate_per_minute: float, burst: int,
+                   backend: str = RATE_LIMIT_BACKEND) -> TokenBucketLimiter:
+    """Build a limiter on the configured backend"""
+    if backend == "redis" and rate_per_minute > 0:
+        if redis_asyncio is not None:
+            return RedisTokenBucketLimiter(name, rate_per_minute, burst)
+        logger.warning(f"RATE_LIMIT_BACKEND=redis needs the redis package; {name} limits are per process")
+    return TokenBucketLimiter(name, rate_per_minute, burst)
+
+
+class AdmissionGate:
+    """At most max_in_flight holders at a time and at most max_queue waiting; anyone beyond that is refused"""
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.stats = LimiterStats()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.waits = 0
+        self.max_waiting = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._slots.locked()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one slot, queueing if needed; raises QueueFullError when the queue is full"""
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self.stats.rejected += 1
+                raise QueueFullError(f"{self.name} queue is full ({self.waiting} waiting)")
+            self.waits += 1
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                await self._slots.acquire()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.stats.allowed += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def info(self) -> dict:
+        return {"max_in_flight": self.max_in_flight, "max_queue": self.max_queue, "in_flight": self.in_flight,
+                "waiting": self.waiting, "max_waiting": self.max_waiting, "waits": self.waits,
+                "allowed": self.stats.allowed, "rejected": self.stats.rejected}
+
+
+def _key_digest(client_id: str) -> str:
+    return hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:16]
+
+
+_known_client_keys = frozenset(_key_digest(key) for key in CLIENT_API_KEYS)
+
+
+def trusted_proxies(spec: str) -> Optional[List[ipaddress._BaseNetwork]]:
+    """Parse FORWARDED_ALLOW_IPS (comma-separated IPs or CIDR ranges); None for "*", any peer"""
+    if spec.strip() == "*":
+        return None
+    networks = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError:
+            logger.warning(f"Ignoring invalid FORWARDED_ALLOW_IPS entry {entry!r}")
+    return networks
+
+
+def _is_trusted(host: str, proxies: Optional[List[ipaddress._BaseNetwork]]) -> bool:
+    if proxies is None:
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in proxies)
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str],
+              proxies: Optional[List[ipaddress._BaseNetwork]]) -> Optional[str]:
+    """
+    The caller's IP behind trusted proxies. Each proxy appends the address it saw to X-Forwarded-For,
+    so only the hops on the right were written by our proxies; the left is whatever the client sent.
+    Walks from the right past trusted proxies and stops at the first hop they did not vouch for.
+    With proxies None ("*") only the peer is trusted, so the rightmost hop is the client.
+    """
+    if not peer or not forwarded_for or not _is_trusted(peer, proxies):
+        return peer
+    for hop in reversed([hop.strip() for hop in forwarded_for.split(",") if hop.strip()]):
+        try:
+            ipaddress.ip_address(hop)
+        except ValueError:
+            # Garbage from a misbehaving proxy; fall back to the connection itself
+            return peer
+        if proxies is None or not _is_trusted(hop, proxies):
+            return hop
+    return peer
+
+
+def client_key(client_id: Optional[str], client_host: Optional[str]) -> str:
+    """
+    Rate limit key for a caller: a hash of its API key when it is one of CLIENT_API_KEYS, else its IP.
+    Unknown keys are ignored, so sending a new header value does not buy a fresh bucket.
+    """
+    if client_id:
+        digest = _key_digest(client_id)
+        if digest in _known_client_keys:
+            return "key:" + digest
+    return f"ip:{client_host or 'unknown'}"
+
+
+# Process-wide limiter for callers of the expensive endpoints
+client_limiter = create_limiter("client", CLIENT_RATE_PER_MINUTE, CLIENT_RATE_BURST)
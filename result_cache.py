@@ -0,0 +1,206 @@
+"""
+Content-addressed cache for tailored resume results
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from executors import StageExecutor
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "memory")  # "memory" or "sqlite"
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "result_cache.sqlite3")
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1000))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 3600))
+
+_WHITESPACE_RE = re.compile(r'[ \t\f\v]+')
+
+
+def normalize_text(text: str) -> str:
+    """Normalize line endings and whitespace so trivially different submissions share a key"""
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(_WHITESPACE_RE.sub(' ', line).strip() for line in lines).strip()
+
+
+def make_cache_key(resume: str, job_desc: str, engine_id: str) -> str:
+    """Hash of the normalized resume, job description and engine/model id"""
+    digest = hashlib.sha256()
+    for part in (normalize_text(resume), normalize_text(job_desc), engine_id):
+        encoded = part.encode('utf-8')
+        # Length-prefix each part so field boundaries can't collide
+        digest.update(len(encoded).to_bytes(8, 'big'))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class CacheStats:
+    """Hit/miss counters shared by all backends"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class MemoryResultCache:
+    """Size-bounded LRU cache with per-entry TTL"""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, ttl: float = RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def run(self, method: Callable, *args) -> Any:
+        """Call one of the cache's methods, e.g. await cache.run(cache.get, key); in memory, no thread hop"""
+        return method(*args)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            self.stats.sets += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        pass
+
+    def info(self) -> dict:
+        return {"backend": self.backend, "size": len(self), "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl, **self.stats.as_dict()}
+
+
+class SQLiteResultCache(MemoryResultCache):
+    """
+    On-disk LRU/TTL cache that survives restarts. Its methods block on disk I/O, so async code calls
+    them through run(), on the cache's own thread. The size is counted as rows come and go rather than
+    with COUNT(*) on every set; it is this process's view when several processes share the file.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = RESULT_CACHE_PATH, max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 ttl: float = RESULT_CACHE_TTL):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        # One thread: the connection is used by one caller at a time anyway
+        self._thread = StageExecutor(process_workers=0, thread_workers=1)
+
+    async def run(self, method: Callable, *args) -> Any:
+        return await self._thread.run_io("result_cache", method, *args)
+
+    def get(self, key: str) -> Optional[dict]:
+        # Wall-clock time because entries outlive the process
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            if row[1] <= now:
+                self._size -= self._conn.execute("DELETE FROM results WHERE key = ?", (key,)).rowcount
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            self.stats.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: dict) -> None:
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl, now),
+            )
+            if not exists:
+                self._size += 1
+            self.stats.sets += 1
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                evicted = self._conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                ).rowcount
+                self._size -= evicted
+                self.stats.evictions += evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._size = 0
+
+    def __len__(self) -> int:
+        return max(0, self._size)
+
+    def close(self) -> None:
+        self._thread.shutdown()
+        self._conn.close()
+
+
+def create_result_cache(backend: str = RESULT_CACHE_BACKEND) -> MemoryResultCache:
+    """Build the configured cache backend"""
+    if backend == "sqlite":
+        logger.info(f"Using SQLite result cache at {RESULT_CACHE_PATH}")
+        return SQLiteResultCache()
+    return MemoryResultCache()
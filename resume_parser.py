@@ -0,0 +1,155 @@
+"""
+Parse a resume once into a compact structure shared by the optimizers, skill matcher and scorers
+"""
+
+import re
+from typing import Dict, FrozenSet, List, Optional
+
+from skills import SkillTaxonomy, get_taxonomy, tokenize
+
+BULLET_PREFIXES = ('•', '-', '*')
+TITLE_KEYWORDS = ('software engineer', 'developer', 'programmer')
+SECTION_HEADINGS = {
+    'summary': ('summary', 'profile', 'objective', 'about me'),
+    'skills': ('skills', 'technologies', 'tech stack', 'competencies'),
+    'experience': ('experience', 'employment', 'work history'),
+    'education': ('education', 'academic'),
+    'projects': ('projects',),
+    'certifications': ('certifications', 'certificates', 'licenses'),
+}
+
+_NUMBER_RE = re.compile(r'\d')
+
+# Line kinds
+HEADING = 'heading'
+ROLE = 'role'
+BULLET = 'bullet'
+SKILLS = 'skills'
+TEXT = 'text'
+BLANK = 'blank'
+
+
+class ResumeLine:
+    __slots__ = ("index", "text", "lower", "kind", "section", "is_bullet", "is_title", "is_skills_line",
+                 "has_number", "word_count", "tokens", "token_set", "skill_keys")
+
+    def __init__(self, index: int, text: str, section: str, taxonomy: SkillTaxonomy):
+        self.index = index
+        self.text = text
+        self.lower = text.lower()
+        self.section = section
+        self.is_bullet = text.strip().startswith(BULLET_PREFIXES)
+        self.is_title = any(title in self.lower for title in TITLE_KEYWORDS)
+        self.is_skills_line = 'skills' in self.lower and ':' in text
+        self.has_number = _NUMBER_RE.search(text) is not None
+        self.word_count = len(text.split())
+        self.tokens = tokenize(text)
+        self.token_set: FrozenSet[str] = frozenset(self.tokens)
+        self.skill_keys: FrozenSet[str] = (
+            frozenset(taxonomy.matcher.find_tokens(self.tokens)) if self.tokens else frozenset()
+        )
+        self.kind = self._classify()
+
+    def moved(self, index: int, section: str) -> "ResumeLine":
+        """This line's analysis at another position, without tokenizing and matching it again"""
+        line = ResumeLine.__new__(ResumeLine)
+        for name in ResumeLine.__slots__:
+            setattr(line, name, getattr(self, name))
+        line.index = index
+        if line.kind != HEADING:
+            line.section = section
+        return line
+
+    def _classify(self) -> str:
+        if not self.tokens:
+            return BLANK
+        if self.is_skills_line:
+            return SKILLS
+        if self.is_bullet:
+            return BULLET
+        if self.is_title and self.word_count <= 12:
+            return ROLE
+        if _heading_section(self) is not None:
+            return HEADING
+        return TEXT
+
+    def __repr__(self) -> str:
+        return f"ResumeLine({self.index}, {self.kind}, {self.text!r})"
+
+
+class ResumeSection:
+    __slots__ = ("name", "heading", "lines")
+
+    def __init__(self, name: str, heading: Optional[ResumeLine]):
+        self.name = name
+        self.heading = heading
+        self.lines: List[ResumeLine] = []
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(line.text for line in self.lines)
+
+
+class ResumeDocument:
+    """Structured resume: every line parsed once with precomputed lowercase text, tokens and skills"""
+
+    __slots__ = ("text", "lines", "sections", "roles", "bullets", "skills_lines", "tokens", "token_set", "skill_keys")
+
+    def __init__(self, text: str, lines: List[ResumeLine], sections: List[ResumeSection]):
+        self.text = text
+        self.lines = lines
+        self.sections = sections
+        self.roles = [line for line in lines if line.kind == ROLE]
+        self.bullets = [line for line in lines if line.kind == BULLET]
+        self.skills_lines = [line for line in lines if line.kind == SKILLS]
+        self.tokens = [token for line in lines for token in line.tokens]
+        self.token_set = frozenset(self.tokens)
+        self.skill_keys = frozenset().union(*(line.skill_keys for line in lines))
+
+    def section(self, name: str) -> Optional[ResumeSection]:
+        for section in self.sections:
+            if section.name == name:
+                return section
+        return None
+
+    def section_texts(self) -> Dict[str, str]:
+        texts: Dict[str, List[str]] = {}
+        for section in self.sections:
+            texts.setdefault(section.name, []).append(section.text)
+        return {name: '\n'.join(parts) for name, parts in texts.items()}
+
+
+def _heading_section(line: ResumeLine) -> Optional[str]:
+    # Headings are short lines like "TECHNICAL SKILLS" or "Experience:"
+    if line.is_bullet or len(line.tokens) > 4:
+        return None
+    heading = ' '.join(line.tokens)
+    for name, cues in SECTION_HEADINGS.items():
+        if any(cue in heading for cue in cues):
+            return name
+    return None
+
+
+def parse_resume(resume: str, taxonomy: Optional[SkillTaxonomy] = None,
+                 previous: Optional[ResumeDocument] = None) -> ResumeDocument:
+    """
+    Parse resume text into a ResumeDocument in a single pass over its lines. Lines unchanged from
+    previous (e.g. the original of a tailored resume, parsed with the same taxonomy) are reused.
+    """
+    taxonomy = taxonomy or get_taxonomy()
+    known = {line.text: line for line in previous.lines} if previous is not None else {}
+    lines: List[ResumeLine] = []
+    sections = [ResumeSection('header', None)]
+    for index, text in enumerate(resume.strip().split('\n')):
+        line = known.get(text)
+        if line is not None:
+            line = line.moved(index, sections[-1].name)
+        else:
+            line = ResumeLine(index, text, sections[-1].name, taxonomy)
+            if line.kind == HEADING:
+                line.section = _heading_section(line)
+        if line.kind == HEADING:
+            sections.append(ResumeSection(line.section, line))
+        sections[-1].lines.append(line)
+        lines.append(line)
+    return ResumeDocument(resume, lines, sections)
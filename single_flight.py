@@ -0,0 +1,71 @@
+"""
+Request coalescing: concurrent identical calls share one in-flight upstream call
+"""
+
+import asyncio
+import logging
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs fn once per key while a call for that key is in flight; every concurrent caller gets its
+    result or its exception.
+
+    The shared call runs in its own task, so a caller that disconnects or times out does not cancel it
+    for the others. It is only cancelled when every caller waiting on it has gone away.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats: Dict[str, int] = {
+            "calls": 0, "executions": 0, "coalesced": 0, "errors": 0, "cancelled_waiters": 0, "abandoned": 0,
+        }
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.stats["calls"] += 1
+        call = self._calls.get(key)
+        if call is None:
+            self.stats["executions"] += 1
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(partial(self._finished, key, call))
+        else:
+            self.stats["coalesced"] += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if not call.task.done():
+                # This caller was cancelled, not the shared call; the last one out stops it
+                self.stats["cancelled_waiters"] += 1
+                if call.waiters == 1:
+                    call.task.cancel()
+                    self.stats["abandoned"] += 1
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finished(self, key: Hashable, call: _Call, task: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+    def info(self) -> dict:
+        calls = self.stats["calls"]
+        return {"in_flight": len(self._calls), **self.stats,
+                "coalesced_ratio": round(self.stats["coalesced"] / calls, 4) if calls else 0.0}
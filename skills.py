@@ -0,0 +1,422 @@
+"""
+Skills taxonomy and precompiled skill matcher used by skill extraction
+"""
+
+import csv
+import gc
+import json
+import logging
+import marshal
+import math
+import os
+import string
+import threading
+import time
+from bisect import bisect_right
+from itertools import compress
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Taxonomy configuration
+SKILLS_TAXONOMY_PATH = os.getenv(
+    "SKILLS_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills_taxonomy.json")
+)
+SKILLS_TAXONOMY_RELOAD_INTERVAL = float(os.getenv("SKILLS_TAXONOMY_RELOAD_INTERVAL", 30))
+SKILLS_INDEX_CACHE = os.getenv("SKILLS_INDEX_CACHE", "1") == "1"  # Cache the built index next to the file
+SKILLS_TOP_K = int(os.getenv("SKILLS_TOP_K", 10))
+
+# Section headings that change how much a skill mention counts
+REQUIREMENT_HEADINGS = (
+    'requirement', 'qualification', 'must have', 'must-have', 'what you', 'you have', 'you bring',
+    'skills', 'experience', 'responsibilit', 'preferred', 'nice to have', 'tech stack', 'the role',
+)
+BOILERPLATE_HEADINGS = (
+    'about us', 'about the company', 'who we are', 'benefits', 'perks', 'what we offer',
+    'equal opportunity', 'how to apply', 'compensation', 'salary', 'our culture',
+)
+SECTION_WEIGHTS = {"requirements": 1.5, "general": 1.0, "boilerplate": 0.25}
+
+# Bump when the cached index layout changes
+_INDEX_FORMAT = 3
+
+# Punctuation that can be part of a skill name ('c++', 'c#', 'node.js', 'scikit-learn', 'r&d')
+# stays inside tokens; everything else separates words.
+_TOKEN_CHARS = '+#.&-'
+_TOKEN_TABLE = str.maketrans({char: ' ' for char in string.punctuation if char not in _TOKEN_CHARS})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping the punctuation skill names use"""
+    return text.lower().translate(_TOKEN_TABLE).split()
+
+
+def normalize_skill(name: str) -> str:
+    return ' '.join(tokenize(name))
+
+
+def _normalize_token(token: str) -> str:
+    # "Python." at the end of a sentence, or a dangling hyphen
+    return token.rstrip('.-')
+
+
+class SkillMatch:
+    __slots__ = ("skill", "positions")
+
+    def __init__(self, skill: str, positions: List[int]):
+        self.skill = skill
+        self.positions = positions
+
+    @property
+    def count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def first_position(self) -> int:
+        return self.positions[0]
+
+    def __repr__(self) -> str:
+        return f"SkillMatch({self.skill!r}, count={self.count}, first={self.first_position})"
+
+
+class SkillMatcher:
+    """Multi-pattern matcher: one pass over the tokens with a hash lookup per token.
+
+    Skills only match whole tokens, so 'java' never matches inside 'javascript' and
+    'r' never matches inside 'react'. Multi-word skills and aliases live in a token
+    trie, so the cost is linear in the text and independent of the number of skills.
+    Each distinct token is looked up once, so repeated words cost a set lookup, not a trie probe.
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Dict[str, str]] = None, normalized: bool = False):
+        normalize = (lambda value: value) if normalized else normalize_skill
+        self.skills = list(dict.fromkeys(normalize(skill) for skill in skills))
+        self._order = {skill: index for index, skill in enumerate(self.skills)}
+        forms = {skill: skill for skill in self.skills}
+        for alias, skill in (aliases or {}).items():
+            forms.setdefault(normalize(alias), normalize(skill))
+        # Token trie: token -> [skill ending here or None, {next token: node} or None]
+        self._index: Dict[str, list] = {}
+        for form, skill in forms.items():
+            level = self._index
+            node = None
+            for token in form.split():
+                if node is not None:
+                    if node[1] is None:
+                        node[1] = {}
+                    level = node[1]
+                node = level.get(token)
+                if node is None:
+                    node = level[token] = [None, None]
+            if node is not None and node[0] is None:
+                node[0] = skill
+
+    def __getstate__(self):
+        return self.skills, self._index
+
+    def __setstate__(self, state):
+        self.skills, self._index = state
+        self._order = {skill: index for index, skill in enumerate(self.skills)}
+
+    def find_tokens(self, tokens: List[str]) -> Dict[str, List[int]]:
+        """Map each matched skill to the token offsets of its hits"""
+        index = self._index
+        # Resolve each distinct token once: a long posting repeats a few hundred words, and most of
+        # them start no skill, so only the offsets of tokens that do are visited one by one.
+        # Short texts repeat too little to pay for building the set.
+        starts: Dict[str, list] = {}
+        for token in set(tokens) if len(tokens) > 256 else tokens:
+            node = index.get(token)
+            if node is None:
+                if token[-1] not in '.-' and '-' not in token:
+                    continue
+                node = index.get(_normalize_token(token))
+                if node is None:
+                    # 'python-based' still counts as python, as a single-token hit
+                    node = index.get(token.split('-', 1)[0]) if '-' in token else None
+                    if node is None or node[0] is None:
+                        continue
+                    node = [node[0], None]
+            starts[token] = node
+        hits: Dict[str, List[int]] = {}
+        if not starts:
+            return hits
+        length = len(tokens)
+        for position in compress(range(length), map(starts.__contains__, tokens)):
+            skill, children = starts[tokens[position]]
+            if children is not None:
+                # Prefer the longest multi-word skill starting here
+                offset = position + 1
+                while children is not None and offset < length:
+                    node = children.get(tokens[offset]) or children.get(_normalize_token(tokens[offset]))
+                    if node is None:
+                        break
+                    if node[0] is not None:
+                        skill = node[0]
+                    children = node[1]
+                    offset += 1
+                if skill is None:
+                    continue
+            positions = hits.get(skill)
+            if positions is None:
+                hits[skill] = [position]
+            else:
+                positions.append(position)
+        return hits
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        return self.find_tokens(tokenize(text))
+
+    def match(self, text: str) -> List[SkillMatch]:
+        """Matched skills with their positions, in taxonomy order"""
+        hits = self.find_all(text)
+        return [SkillMatch(skill, hits[skill]) for skill in sorted(hits, key=self._order.__getitem__)]
+
+
+class SkillInfo:
+    __slots__ = ("key", "name", "category", "weight", "aliases")
+
+    def __init__(self, name: str, category: str = "", weight: float = 1.0, aliases: Iterable[str] = (),
+                 key: Optional[str] = None):
+        self.key = key or normalize_skill(name)
+        self.name = name
+        self.category = category
+        self.weight = weight
+        self.aliases = [normalize_skill(alias) for alias in aliases] if key is None else list(aliases)
+
+
+class SkillTaxonomy:
+    """Canonical skills with categories, weights and aliases plus a prebuilt matcher"""
+
+    def __init__(self, skills: List[SkillInfo], source: Optional[str] = None):
+        self.source = source
+        self.skills = {skill.key: skill for skill in skills}
+        aliases = {alias: skill.key for skill in skills for alias in skill.aliases}
+        self.matcher = SkillMatcher(self.skills, aliases, normalized=True)
+
+    def __getstate__(self):
+        # Plain tuples pickle, marshal and load much faster than slotted objects
+        rows = [(skill.key, skill.name, skill.category, skill.weight, skill.aliases) for skill in self.skills.values()]
+        return self.source, rows, self.matcher
+
+    def __setstate__(self, state):
+        self.source, rows, self.matcher = state
+        self.skills = {key: SkillInfo(name, category, weight, aliases, key=key)
+                       for key, name, category, weight, aliases in rows}
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def match(self, text: str) -> List[SkillMatch]:
+        return self.matcher.match(text)
+
+    def display_name(self, key: str) -> str:
+        skill = self.skills.get(key)
+        return skill.name if skill is not None else key.title()
+
+    def weight(self, key: str) -> float:
+        skill = self.skills.get(key)
+        return skill.weight if skill is not None else 1.0
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillTaxonomy":
+        """Load a taxonomy file (JSON or CSV), reusing a cached index when the file is unchanged"""
+        # Building or loading ~100k small containers triggers many useless GC passes
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return cls._from_file(path)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    @classmethod
+    def _from_file(cls, path: str) -> "SkillTaxonomy":
+        stat = os.stat(path)
+        signature = (_INDEX_FORMAT, marshal.version, stat.st_mtime_ns, stat.st_size)
+        # marshal of plain tuples, lists and dicts: unlike a pickle, a tampered cache file cannot run code
+        cache_path = path + ".index.marshal"
+        if SKILLS_INDEX_CACHE:
+            try:
+                with open(cache_path, "rb") as f:
+                    cached_signature, source, rows, matcher_state = marshal.load(f)
+                if cached_signature == signature:
+                    matcher = SkillMatcher.__new__(SkillMatcher)
+                    matcher.__setstate__(matcher_state)
+                    taxonomy = cls.__new__(cls)
+                    taxonomy.__setstate__((source, rows, matcher))
+                    return taxonomy
+            except (OSError, EOFError, ValueError, TypeError):
+                pass
+
+        if path.endswith(".csv"):
+            skills = _read_csv_taxonomy(path)
+        else:
+            skills = _read_json_taxonomy(path)
+        taxonomy = cls(skills, source=path)
+
+        if SKILLS_INDEX_CACHE:
+            try:
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                source, rows, matcher = taxonomy.__getstate__()
+                with open(tmp_path, "wb") as f:
+                    marshal.dump((signature, source, rows, matcher.__getstate__()), f)
+                os.replace(tmp_path, cache_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not write skills index cache: {str(e)}")
+        return taxonomy
+
+
+def _read_json_taxonomy(path: str) -> List[SkillInfo]:
+    """{"skills": [{"name": ..., "category": ..., "weight": ..., "aliases": [...]}, ...]}"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data["skills"] if isinstance(data, dict) else data
+    return [
+        SkillInfo(entry["name"], entry.get("category", ""), float(entry.get("weight", 1.0)), entry.get("aliases", ()))
+        for entry in entries
+    ]
+
+
+def _read_csv_taxonomy(path: str) -> List[SkillInfo]:
+    """Columns: name, category, weight, aliases (separated by '|')"""
+    with open(path, encoding="utf-8", newline="") as f:
+        return [
+            SkillInfo(
+                row["name"],
+                row.get("category") or "",
+                float(row.get("weight") or 1.0),
+                [alias.strip() for alias in (row.get("aliases") or "").split("|") if alias.strip()],
+            )
+            for row in csv.DictReader(f)
+            if row.get("name")
+        ]
+
+
+class TaxonomyLoader:
+    """Holds the current taxonomy and swaps in a rebuilt one when the file changes"""
+
+    def __init__(self, path: str = SKILLS_TAXONOMY_PATH, reload_interval: float = SKILLS_TAXONOMY_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._taxonomy: Optional[SkillTaxonomy] = None
+        self._mtime_ns = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    @property
+    def taxonomy(self) -> SkillTaxonomy:
+        if self._taxonomy is None:
+            self.reload()
+        elif self.reload_interval > 0 and time.monotonic() - self._checked_at >= self.reload_interval:
+            self._checked_at = time.monotonic()
+            self._reload_in_background()
+        return self._taxonomy
+
+    def _reload_in_background(self) -> None:
+        # Requests keep using the current taxonomy while a changed file is rebuilt
+        try:
+            changed = os.stat(self.path).st_mtime_ns != self._mtime_ns
+        except OSError:
+            return
+        if changed and not self._lock.locked():
+            threading.Thread(target=self.reload, name="skills-taxonomy-reload", daemon=True).start()
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the taxonomy if its file changed; returns True when a new one was loaded"""
+        with self._lock:
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+                if not force and self._taxonomy is not None and mtime_ns == self._mtime_ns:
+                    return False
+                started = time.perf_counter()
+                taxonomy = SkillTaxonomy.from_file(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                if self._taxonomy is None:
+                    raise
+                logger.error(f"Keeping previous skills taxonomy, reload failed: {str(e)}")
+                return False
+            self._taxonomy = taxonomy
+            self._mtime_ns = mtime_ns
+            self.reloads += 1
+            logger.info(f"Loaded {len(taxonomy)} skills from {self.path} in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return True
+
+    def info(self) -> dict:
+        return {"path": self.path, "skills": len(self._taxonomy) if self._taxonomy else 0, "reloads": self.reloads}
+
+
+taxonomy_loader = TaxonomyLoader()
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    """The current skills taxonomy (checks for file changes at most every reload interval)"""
+    return taxonomy_loader.taxonomy
+
+
+class RankedSkill:
+    __slots__ = ("skill", "name", "score", "count", "first_position")
+
+    def __init__(self, skill: str, name: str, score: float, count: int, first_position: int):
+        self.skill = skill
+        self.name = name
+        self.score = score
+        self.count = count
+        self.first_position = first_position
+
+    def __repr__(self) -> str:
+        return f"RankedSkill({self.name!r}, score={self.score}, count={self.count})"
+
+
+def _heading_section(line: str, line_tokens: List[str]) -> Optional[str]:
+    # Headings are short lines such as "Requirements:" or "About Us"
+    if len(line_tokens) > 6:
+        return None
+    heading = ' '.join(line_tokens)
+    if any(cue in heading for cue in BOILERPLATE_HEADINGS):
+        return "boilerplate"
+    if any(cue in heading for cue in REQUIREMENT_HEADINGS):
+        return "requirements"
+    return None
+
+
+def tokenize_sections(text: str) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """Tokens plus (first token offset, section) boundaries derived from heading lines"""
+    tokens: List[str] = []
+    sections = [(0, "general")]
+    for line in text.splitlines():
+        line_tokens = tokenize(line)
+        if not line_tokens:
+            continue
+        section = _heading_section(line, line_tokens)
+        if section is not None and section != sections[-1][1]:
+            if sections[-1][0] == len(tokens):
+                sections[-1] = (len(tokens), section)
+            else:
+                sections.append((len(tokens), section))
+        tokens.extend(line_tokens)
+    return tokens, sections
+
+
+def rank_skills(text: str, top_k: int = SKILLS_TOP_K, taxonomy: Optional[SkillTaxonomy] = None) -> List[RankedSkill]:
+    """Skills ranked by mention frequency, section position and taxonomy weight.
+
+    Ties break on first position and then on the skill key, so the same text always
+    produces the same list regardless of hash seeds.
+    """
+    taxonomy = taxonomy or get_taxonomy()
+    tokens, sections = tokenize_sections(text)
+    hits = taxonomy.matcher.find_tokens(tokens)
+    starts = [start for start, _ in sections]
+    weights = [SECTION_WEIGHTS[section] for _, section in sections]
+
+    ranked = []
+    for skill, positions in hits.items():
+        mentions = sum(weights[bisect_right(starts, position) - 1] for position in positions)
+        # Diminishing returns so a keyword repeated ten times doesn't drown everything else
+        score = round(taxonomy.weight(skill) * math.log1p(mentions), 6)
+        ranked.append(RankedSkill(skill, taxonomy.display_name(skill), score, len(positions), positions[0]))
+
+    ranked.sort(key=lambda item: (-item.score, item.first_position, item.skill))
+    return ranked[:top_k] if top_k else ranked
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the ATS match score
+Scores sample_resume.txt and small hand-written resumes against job descriptions; no server or network needed
+"""
+
+import os
+import sys
+import time
+
+from ats_score import JobProfile, ResumeProfile, match_score, score_tailoring, term_counts
+from optimizer import optimize_for_descriptions, timed_resume_optimization
+from resume_parser import parse_resume
+from skills import rank_skills, tokenize
+
+SAMPLE_RESUME_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sample_resume.txt")
+
+JOB_DESC = """Senior Python Developer
+Requirements:
+- 5+ years of Python with FastAPI or Django
+- AWS, Docker, Kubernetes and Terraform
+- PostgreSQL and Redis
+About us
+We offer great benefits and flexible hours.
+"""
+
+MATCHING_RESUME = """Jane Doe
+
+SUMMARY
+Python developer building FastAPI and Django services
+
+EXPERIENCE
+- Deployed Docker services to Kubernetes on AWS with Terraform
+- Tuned PostgreSQL queries and Redis caching
+
+SKILLS
+Python, FastAPI, Django, AWS, Docker, Kubernetes, Terraform, PostgreSQL, Redis
+"""
+
+UNRELATED_RESUME = """John Roe
+
+SUMMARY
+Pastry chef with ten years in fine dining kitchens
+
+EXPERIENCE
+- Designed seasonal dessert menus
+- Trained a brigade of six cooks
+
+SKILLS
+Baking, plating, menu costing
+"""
+
+
+def load_sample_resume() -> str:
+    with open(SAMPLE_RESUME_PATH, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_term_counts():
+    """Stopwords and bare punctuation are dropped; skill punctuation and sentence ends are handled"""
+    counts = term_counts(tokenize("We use C++ and Node.js. The team uses Python, python and C#."))
+    expected = {"use": 1, "c++": 1, "node.js": 1, "team": 1, "uses": 1, "python": 2, "c#": 1}
+    if counts != expected:
+        print(f"❌ Unexpected term counts: {counts}")
+        return False
+    print("✅ Term counts passed")
+    return True
+
+
+def test_ordering():
+    """A resume that covers the job scores far above an unrelated one"""
+    job = JobProfile(JOB_DESC)
+    matching = match_score(ResumeProfile(parse_resume(MATCHING_RESUME)), job)
+    unrelated = match_score(ResumeProfile(parse_resume(UNRELATED_RESUME)), job)
+    if matching["skill_coverage"] != 1.0 or matching["missing_skills"]:
+        print(f"❌ Matching resume should cover every skill: missing {matching['missing_skills']}")
+        return False
+    if unrelated["skill_coverage"] != 0.0 or unrelated["matched_skills"]:
+        print(f"❌ Unrelated resume should cover no skill: matched {unrelated['matched_skills']}")
+        return False
+    if not matching["overall"] > 60 > 10 > unrelated["overall"]:
+        print(f"❌ Scores not separated: matching {matching['overall']}, unrelated {unrelated['overall']}")
+        return False
+    for score in (matching, unrelated):
+        if not 0 <= score["similarity"] <= 1 or not 0 <= score["overall"] <= 100:
+            print(f"❌ Score out of range: {score}")
+            return False
+    print(f"✅ Ordering passed (matching {matching['overall']}, unrelated {unrelated['overall']})")
+    return True
+
+
+def test_sections_and_skills():
+    """Per-section similarity and per-skill coverage point at where each skill appears"""
+    score = match_score(ResumeProfile(parse_resume(MATCHING_RESUME)), JobProfile(JOB_DESC))
+    if not {"summary", "experience", "skills"} <= set(score["sections"]):
+        print(f"❌ Missing sections: {list(score['sections'])}")
+        return False
+    skills = {skill["skill"]: skill for skill in score["skills"]}
+    if skills["Python"]["sections"] != ["summary", "skills"]:
+        print(f"❌ Python found in {skills['Python']['sections']}")
+        return False
+    if "Terraform" not in score["sections"]["experience"]["skills"]:
+        print(f"❌ Experience skills: {score['sections']['experience']['skills']}")
+        return False
+    if score["sections"]["skills"]["similarity"] <= 0:
+        print("❌ Skills section should be similar to the job")
+        return False
+    print("✅ Sections and skills passed")
+    return True
+
+
+def test_before_and_after():
+    """Adding a missing skill raises the after score; identical text scores the same"""
+    resume = MATCHING_RESUME.replace(", Terraform", "").replace(" with Terraform", "")
+    tailored = resume.replace("Python, FastAPI", "Python, Terraform, FastAPI")
+    scores = score_tailoring(resume, tailored, JOB_DESC)
+    if "Terraform" not in scores["before"]["missing_skills"] or "Terraform" not in scores["after"]["matched_skills"]:
+        print(f"❌ Terraform should move from missing to matched: {scores['after']['missing_skills']}")
+        return False
+    if scores["improvement"] <= 0:
+        print(f"❌ Expected an improvement, got {scores['improvement']}")
+        return False
+    unchanged = score_tailoring(resume, resume, JOB_DESC)
+    if unchanged["before"] != unchanged["after"] or unchanged["improvement"] != 0:
+        print("❌ Unchanged resume should score the same before and after")
+        return False
+    print(f"✅ Before/after passed (+{scores['improvement']})")
+    return True
+
+
+def test_optimizer_results():
+    """The rule engine's single and batch paths both return scores"""
+    resume = load_sample_resume()
+    result, timings = timed_resume_optimization(resume, JOB_DESC)
+    batch = optimize_for_descriptions(resume, [JOB_DESC, "Data analyst with SQL and Tableau"])
+    if "ats_score" not in timings or result["ats_score"]["before"]["overall"] <= 0:
+        print(f"❌ Missing score or timing: {timings}")
+        return False
+    if batch[0]["ats_score"] != result["ats_score"] or "ats_score" not in batch[1]:
+        print("❌ Batch scores differ from the single-request score")
+        return False
+    print("✅ Optimizer results passed")
+    return True
+
+
+def test_speed():
+    """Scoring a tailored sample resume, reusing the parsed original, stays under a millisecond"""
+    resume = load_sample_resume()
+    result, _ = timed_resume_optimization(resume, JOB_DESC)
+    document = parse_resume(resume)
+    required_skills = rank_skills(JOB_DESC)
+    runs = 200
+    started = time.perf_counter()
+    for _ in range(runs):
+        score_tailoring(resume, result["tailored_resume"], JOB_DESC, document, required_skills)
+    elapsed_ms = (time.perf_counter() - started) / runs * 1000
+    # About 0.5 ms on a laptop; the target is sub-millisecond
+    if elapsed_ms > 1:
+        print(f"❌ Scoring took {elapsed_ms:.2f} ms")
+        return False
+    print(f"✅ Speed passed ({elapsed_ms:.2f} ms per before/after score)")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - ATS Score Tests")
+    print("=" * 50)
+
+    tests = [test_term_counts, test_ordering, test_sections_and_skills, test_before_and_after,
+             test_optimizer_results, test_speed]
+    failed = [test.__name__ for test in tests if not test()]
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All ATS score tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the circuit breaker's state transitions
+Open periods are shortened to milliseconds so the whole cycle runs in well under a second
+"""
+
+import sys
+import time
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+OPEN_SECONDS = 0.05
+
+
+def new_breaker() -> CircuitBreaker:
+    return CircuitBreaker("test", window_seconds=60, min_calls=5, failure_rate=0.5,
+                          open_seconds=OPEN_SECONDS, open_max_seconds=1, half_open_probes=1)
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    while breaker.state != OPEN:
+        breaker.record_failure()
+
+
+def wait_until_probe(breaker: CircuitBreaker) -> None:
+    time.sleep(breaker.retry_after() + 0.005)
+
+
+def test_opens_on_failure_rate():
+    """Stays closed below min_calls or the failure rate, opens once both are reached"""
+    breaker = new_breaker()
+    for _ in range(3):
+        breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    if breaker.state != CLOSED:
+        print("❌ Opened at a 40% failure rate")
+        return False
+    breaker.record_failure()
+    if breaker.state != OPEN or breaker.allow():
+        print(f"❌ Still letting calls through at a 50% failure rate ({breaker.state})")
+        return False
+    breaker = new_breaker()
+    for _ in range(4):
+        breaker.record_failure()
+    if breaker.state != CLOSED:
+        print("❌ Opened before min_calls calls")
+        return False
+    print("✅ Opens on failure rate passed")
+    return True
+
+
+def test_half_open_probe_closes():
+    """After the open period one probe goes through, and its success closes the breaker"""
+    breaker = new_breaker()
+    open_breaker(breaker)
+    wait_until_probe(breaker)
+    if not breaker.allow() or breaker.state != HALF_OPEN:
+        print(f"❌ No probe allowed after the open period ({breaker.state})")
+        return False
+    if breaker.allow():
+        print("❌ A second call got through while the probe was running")
+        return False
+    breaker.record_success()
+    if breaker.state != CLOSED or not breaker.allow():
+        print(f"❌ Successful probe left the breaker {breaker.state}")
+        return False
+    print("✅ Half-open probe closes passed")
+    return True
+
+
+def test_half_open_probe_reopens():
+    """A failed probe reopens the breaker for a longer period"""
+    breaker = new_breaker()
+    open_breaker(breaker)
+    first_period = breaker.retry_after()
+    wait_until_probe(breaker)
+    breaker.allow()
+    breaker.record_failure()
+    if breaker.state != OPEN or breaker.allow():
+        print(f"❌ Failed probe left the breaker {breaker.state}")
+        return False
+    # Equal jitter: the second period is at least the first one's upper bound
+    if breaker.retry_after() < OPEN_SECONDS - 0.005 or breaker.opens != 2:
+        print(f"❌ Reopened for {breaker.retry_after():.3f}s after {first_period:.3f}s")
+        return False
+    print("✅ Half-open probe reopens passed")
+    return True
+
+
+def test_cancelled_probe_frees_slot():
+    """A probe that ends without an outcome lets the next call probe"""
+    breaker = new_breaker()
+    open_breaker(breaker)
+    wait_until_probe(breaker)
+    breaker.allow()
+    breaker.record_cancelled()
+    if not breaker.allow():
+        print("❌ Cancelled probe kept its slot")
+        return False
+    print("✅ Cancelled probe passed")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - Circuit Breaker Tests")
+    print("=" * 50)
+
+    tests = [test_opens_on_failure_rate, test_half_open_probe_closes, test_half_open_probe_reopens,
+             test_cancelled_probe_frees_slot]
+    failed = [test.__name__ for test in tests if not test()]
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All circuit breaker tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the upload extractor's limits: upload size, PDF pages and decompression bombs
+Documents are built in memory; limits are lowered so the tests stay small and fast
+"""
+
+import asyncio
+import io
+import os
+import struct
+import sys
+import tempfile
+import zipfile
+import zlib
+
+import document_extractor
+from document_extractor import DocumentError, SpooledUpload, extract_text, spool_upload
+
+BOUNDARY = "resumeboundary"
+DOCX_BODY = ('<?xml version="1.0"?><w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+             '<w:body>{}</w:body></w:document>')
+DOCX_PARAGRAPH = "<w:p><w:r><w:t>Python developer with Docker experience</w:t></w:r></w:p>"
+
+
+def spooled(data: bytes, filename: str) -> SpooledUpload:
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(filename)[1])
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    return SpooledUpload(path, filename, len(data))
+
+
+def pdf(pages: int, content: bytes, compress: bool = False) -> bytes:
+    page_objects = b"".join(b"%d 0 obj << /Type /Page >> endobj\n" % (index + 10) for index in range(pages))
+    stream = zlib.compress(content) if compress else content
+    filters = b" /Filter /FlateDecode" if compress else b""
+    return (b"%PDF-1.4\n" + page_objects +
+            b"4 0 obj <<" + filters + b" /Length %d>> stream\n" % len(stream) + stream + b"\nendstream endobj\n%%EOF\n")
+
+
+def docx(paragraphs: int, declared_size: int = None) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", DOCX_BODY.format(DOCX_PARAGRAPH * paragraphs))
+    data = bytearray(buffer.getvalue())
+    if declared_size is not None:
+        # Lie about the uncompressed size in the local and central headers, as a zip bomb would
+        size = struct.pack("<I", declared_size)
+        data[22:26] = size
+        central = data.rfind(b"PK\x01\x02")
+        data[central + 24:central + 28] = size
+    return bytes(data)
+
+
+def extraction_error(data: bytes, filename: str):
+    """The DocumentError status extracting data raises, or None when it succeeds"""
+    upload = spooled(data, filename)
+    try:
+        extract_text(upload)
+    except DocumentError as e:
+        return e.status_code
+    finally:
+        upload.cleanup()
+    return None
+
+
+def test_upload_size():
+    """Uploads over the limit are refused by Content-Length up front, or while streaming without one"""
+    file_data = b"x" * 2048
+    body = (f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"resume.txt\"\r\n"
+            f"Content-Type: text/plain\r\n\r\n").encode() + file_data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    async def chunks():
+        for start in range(0, len(body), 256):
+            yield body[start:start + 256]
+
+    async def spool(headers, max_bytes):
+        try:
+            upload = await spool_upload(headers, chunks(), max_bytes=max_bytes)
+        except DocumentError as e:
+            return e.status_code
+        upload.cleanup()
+        return None
+
+    content_type = f"multipart/form-data; boundary={BOUNDARY}"
+    cases = [
+        ({"content-type": content_type}, 1024, 413),
+        ({"content-type": content_type, "content-length": str(10 * 1024 * 1024)}, 1024, 413),
+        ({"content-type": content_type}, 4096, None),
+    ]
+    for headers, max_bytes, expected in cases:
+        status = asyncio.run(spool(headers, max_bytes))
+        if status != expected:
+            print(f"❌ Upload of {len(file_data)} bytes with max_bytes={max_bytes} and {headers} gave {status}")
+            return False
+    print("✅ Upload size passed")
+    return True
+
+
+def test_pdf_pages():
+    """PDFs with more pages than UPLOAD_MAX_PAGES are refused before anything is decoded"""
+    content = b"BT (Python developer) Tj ET"
+    if extraction_error(pdf(3, content), "resume.pdf") != 413:
+        print("❌ 3-page PDF passed a 2-page limit")
+        return False
+    if extraction_error(pdf(2, content), "resume.pdf") is not None:
+        print("❌ 2-page PDF was refused")
+        return False
+    print("✅ PDF pages passed")
+    return True
+
+
+def test_pdf_decompression_bomb():
+    """A content stream that inflates past UPLOAD_MAX_DECOMPRESSED_BYTES is refused"""
+    bomb = b"BT (Python developer) Tj ET\n" + b" " * (4 * 1024 * 1024)
+    if extraction_error(pdf(1, bomb, compress=True), "resume.pdf") != 413:
+        print("❌ PDF decompression bomb was extracted")
+        return False
+    if extraction_error(pdf(1, b"BT (Python developer) Tj ET", compress=True), "resume.pdf") is not None:
+        print("❌ Small compressed PDF was refused")
+        return False
+    print("✅ PDF decompression bomb passed")
+    return True
+
+
+def test_docx_zip_bomb():
+    """DOCX bodies declared too large are refused, and one lying about its size fails cleanly"""
+    large = docx(20000)
+    if extraction_error(large, "resume.docx") != 413:
+        print("❌ Oversized DOCX body was extracted")
+        return False
+    if extraction_error(docx(20000, declared_size=1000), "resume.docx") != 422:
+        print("❌ DOCX lying about its size did not fail with a DocumentError")
+        return False
+    if extraction_error(docx(10), "resume.docx") is not None:
+        print("❌ Small DOCX was refused")
+        return False
+    print("✅ DOCX zip bomb passed")
+    return True
+
+
+def test_text_truncated():
+    """Extracted text stops at UPLOAD_MAX_TEXT_CHARS"""
+    upload = spooled(b"Python developer\n" * 10000, "resume.txt")
+    try:
+        text, details = extract_text(upload)
+    finally:
+        upload.cleanup()
+    if len(text) > document_extractor.UPLOAD_MAX_TEXT_CHARS or not details["truncated"]:
+        print(f"❌ Extracted {len(text)} characters, truncated={details['truncated']}")
+        return False
+    print("✅ Text truncation passed")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - Document Extractor Tests")
+    print("=" * 50)
+
+    document_extractor.UPLOAD_MAX_PAGES = 2
+    document_extractor.UPLOAD_MAX_DECOMPRESSED_BYTES = 256 * 1024
+    document_extractor.UPLOAD_MAX_TEXT_CHARS = 10_000
+    tests = [test_upload_size, test_pdf_pages, test_pdf_decompression_bomb, test_docx_zip_bomb, test_text_truncated]
+    failed = [test.__name__ for test in tests if not test()]
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All document extractor tests passed!")
+
+
+if __name__ == "__main__":
+    main()
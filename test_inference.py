@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the inference backends' handling of malformed upstream responses
+Upstreams are replaced with an httpx mock transport; no server or network needed
+"""
+
+import asyncio
+import sys
+import time
+
+import httpx
+
+from http_client import http_pool
+from inference import HuggingFaceBackend, InferenceError, OllamaBackend
+
+HTML_BODY = "<html><body><h1>Service temporarily unavailable</h1></body></html>"
+
+# (description, body, content type) answered with a 200 that carries no usable text
+BAD_HF_RESPONSES = [
+    ("HTML body", HTML_BODY, "text/html"),
+    ("object instead of list", '{"error": "overloaded"}', "application/json"),
+    ("list of strings", '["not an object"]', "application/json"),
+    ("empty list", "[]", "application/json"),
+    ("non-string text", '[{"generated_text": 42}]', "application/json"),
+]
+
+BAD_OLLAMA_RESPONSES = [
+    ("HTML body", HTML_BODY, "text/html"),
+    ("list instead of object", '["response"]', "application/json"),
+    ("non-string response", '{"response": {"text": "x"}}', "application/json"),
+]
+
+BAD_OLLAMA_STREAMS = [
+    ("truncated JSON line", '{"response": "Jane", "done": false}\n{"respo\n'),
+    ("non-object line", '{"response": "Jane", "done": false}\n[1, 2]\n'),
+]
+
+
+def use_upstream(handler) -> None:
+    """Route every request of the shared HTTP pool to handler"""
+    http_pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def without_breaker(backend):
+    # Every call here fails on purpose; keep the breaker from answering in the upstream's place
+    backend.breaker = None
+    return backend
+
+
+def respond_with(body: str, content_type: str):
+    return lambda request: httpx.Response(200, content=body.encode(), headers={"Content-Type": content_type})
+
+
+async def raises_inference_error(call) -> bool:
+    try:
+        await call()
+    except InferenceError:
+        return True
+    except Exception as e:
+        print(f"   {type(e).__name__} escaped: {str(e)}")
+        return False
+    return False
+
+
+async def test_huggingface_bad_bodies():
+    """A 200 from Hugging Face with an unusable body raises InferenceError"""
+    backend = without_breaker(HuggingFaceBackend(api_base="http://hf.test/models", rate_per_minute=0))
+    for description, body, content_type in BAD_HF_RESPONSES:
+        use_upstream(respond_with(body, content_type))
+        if not await raises_inference_error(lambda: backend.generate("prompt")):
+            print(f"❌ Hugging Face {description} did not raise InferenceError")
+            return False
+    print("✅ Hugging Face bad bodies passed")
+    return True
+
+
+async def test_ollama_bad_bodies():
+    """A 200 from Ollama with an unusable body or stream raises InferenceError"""
+    backend = without_breaker(OllamaBackend(base_url="http://ollama.test"))
+    for description, body, content_type in BAD_OLLAMA_RESPONSES:
+        use_upstream(respond_with(body, content_type))
+        if not await raises_inference_error(lambda: backend.generate("prompt")):
+            print(f"❌ Ollama {description} did not raise InferenceError")
+            return False
+
+    async def consume_stream():
+        async for _ in backend.stream("prompt"):
+            pass
+
+    for description, body in BAD_OLLAMA_STREAMS:
+        use_upstream(respond_with(body, "application/x-ndjson"))
+        if not await raises_inference_error(consume_stream):
+            print(f"❌ Ollama stream with a {description} did not raise InferenceError")
+            return False
+    print("✅ Ollama bad bodies passed")
+    return True
+
+
+async def test_good_bodies():
+    """Well-formed responses still come through"""
+    huggingface = HuggingFaceBackend(api_base="http://hf.test/models", rate_per_minute=0)
+    use_upstream(respond_with('[{"generated_text": "Tailored"}]', "application/json"))
+    if await huggingface.generate("prompt") != "Tailored":
+        print("❌ Hugging Face text not returned")
+        return False
+    ollama = OllamaBackend(base_url="http://ollama.test")
+    use_upstream(respond_with('{"response": "Tai", "done": false}\n{"response": "lored", "done": true}\n',
+                              "application/x-ndjson"))
+    tokens = [token async for token in ollama.stream("prompt")]
+    if "".join(tokens) != "Tailored":
+        print(f"❌ Ollama stream returned {tokens}")
+        return False
+    print("✅ Good bodies passed")
+    return True
+
+
+async def test_stream_deadline():
+    """A stream that keeps trickling past the backend's timeout is cut off and counted as a failure"""
+    async def trickle():
+        for _ in range(50):
+            yield b'{"response": "x", "done": false}\n'
+            await asyncio.sleep(0.05)
+
+    backend = without_breaker(OllamaBackend(base_url="http://ollama.test", timeout=0.3))
+    use_upstream(lambda request: httpx.Response(200, content=trickle(), headers={"Content-Type": "application/x-ndjson"}))
+    started = time.monotonic()
+
+    async def consume_stream():
+        async for _ in backend.stream("prompt"):
+            pass
+
+    if not await raises_inference_error(consume_stream):
+        print("❌ Trickling stream did not raise InferenceError")
+        return False
+    stats = backend.stats()
+    if time.monotonic() - started > 1 or stats["timeouts"] != 1 or stats["failures"] != 1:
+        print(f"❌ Stream ran {time.monotonic() - started:.2f}s with stats {stats}")
+        return False
+    print("✅ Stream deadline passed")
+    return True
+
+
+async def test_open_circuit_spends_no_tokens():
+    """Calls refused by an open breaker leave the upstream's rate limit tokens alone"""
+    from circuit_breaker import OPEN
+    from inference import CircuitOpenError
+
+    backend = HuggingFaceBackend(api_base="http://hf.test/models", rate_per_minute=60, rate_burst=1)
+    while backend.breaker.state != OPEN:
+        backend.breaker.record_failure()
+    for _ in range(3):
+        try:
+            await backend.generate("prompt")
+        except CircuitOpenError:
+            continue
+        print("❌ Open breaker let a call through")
+        return False
+    if await backend.limiter.acquire():
+        print("❌ Calls refused by the breaker spent rate limit tokens")
+        return False
+    print("✅ Open circuit spends no tokens passed")
+    return True
+
+
+async def test_tailor_falls_back():
+    """A 200 HTML body from Hugging Face makes /tailor-resume answer with the rule engine"""
+    import app
+    from optimizer import RULE_ENGINE_ID
+
+    use_upstream(respond_with(HTML_BODY, "text/html"))
+    app.llm_backend = without_breaker(HuggingFaceBackend(api_base="http://hf.test/models", rate_per_minute=0))
+    try:
+        response = await app.tailor_resume_admitted(app.ResumeRequest(
+            resume="Jane Doe\nSKILLS\nPython, Docker", job_desc="Python developer with AWS", bypass_cache=True,
+        ), deadline=time.monotonic() + 10)
+    finally:
+        app.executor.shutdown()
+    if response.engine != RULE_ENGINE_ID:
+        print(f"❌ Expected the rule engine, got {response.engine}")
+        return False
+    print("✅ Tailor fallback passed")
+    return True
+
+
+async def test_hedge_engine_failures():
+    """Any exception from either engine makes it lose the race; /tailor-resume fails only when both do"""
+    import app
+    from fastapi import HTTPException
+    from optimizer import RULE_ENGINE_ID
+
+    async def crash(resume, job_description):
+        raise RuntimeError("engine crashed")
+
+    use_upstream(respond_with('[{"generated_text": "Tailored by the model"}]', "application/json"))
+    llm_backend = without_breaker(HuggingFaceBackend(api_base="http://hf.test/models", rate_per_minute=0))
+    rule_tailor = app.rule_backend.tailor
+    # (description, model, rule engine, latency budget, engine expected to answer)
+    cases = [("model crashes", crash, rule_tailor, 10, RULE_ENGINE_ID),
+             ("rule engine crashes after the budget", llm_backend.tailor, crash, 0, llm_backend.engine_id),
+             ("both crash", crash, crash, 10, None)]
+    app.llm_backend = llm_backend
+    try:
+        for index, (description, llm_tailor, rule_engine_tailor, budget, expected) in enumerate(cases):
+            llm_backend.tailor, app.rule_backend.tailor = llm_tailor, rule_engine_tailor
+            try:
+                response = await app.tailor_resume_admitted(app.ResumeRequest(
+                    resume=f"Jane Doe {index}\nSKILLS\nPython, Docker", job_desc="Python developer with AWS",
+                    bypass_cache=True,
+                ), deadline=time.monotonic() + budget)
+                engine = response.engine
+            except HTTPException as e:
+                engine = None if e.status_code == 500 else e.status_code
+            if engine != expected:
+                print(f"❌ When the {description}, expected {expected}, got {engine}")
+                return False
+    finally:
+        app.rule_backend.tailor = rule_tailor
+        app.executor.shutdown()
+    print("✅ Hedge engine failures passed")
+    return True
+
+
+async def run_tests():
+    tests = [test_huggingface_bad_bodies, test_ollama_bad_bodies, test_good_bodies, test_stream_deadline,
+             test_open_circuit_spends_no_tokens, test_tailor_falls_back,
+             test_hedge_engine_failures]
+    failed = [test.__name__ for test in tests if not await test()]
+    await http_pool.close()
+    return failed
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - Inference Backend Tests")
+    print("=" * 50)
+
+    failed = asyncio.run(run_tests())
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All inference backend tests passed!")
+
+
+if __name__ == "__main__":
+    main()
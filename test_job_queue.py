@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the SQLite job queue and its worker pool
+Each test uses a throwaway database file; no server or network needed
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+from job_queue import QUEUED, RUNNING, SUCCEEDED, JobQueue, JobWorkerPool
+
+
+def new_queue(**kwargs) -> JobQueue:
+    return JobQueue(path=os.path.join(tempfile.mkdtemp(), "jobs.db"), **kwargs)
+
+
+async def wait_for_status(queue: JobQueue, job_id: str, status: str, timeout: float = 5.0) -> bool:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        if (await queue.run(queue.get, job_id)).status == status:
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+async def test_shutdown_releases_running_job():
+    """Shutting the pool down mid-job puts the job back in the queue without spending an attempt"""
+    queue = new_queue()
+    started = asyncio.Event()
+
+    async def handler(payload, job):
+        started.set()
+        await asyncio.Event().wait()
+
+    pool = JobWorkerPool(queue, {"test": handler}, workers=1, poll_interval=0.05)
+    pool.start()
+    try:
+        job = await queue.run(queue.enqueue, "test", {})
+        pool.notify()
+        await asyncio.wait_for(started.wait(), 5)
+        await pool.shutdown()
+        job = await queue.run(queue.get, job.id)
+    finally:
+        queue.close()
+    if job.status != QUEUED or job.attempts != 0:
+        print(f"❌ Job left {job.status} with {job.attempts} attempt(s) after shutdown")
+        return False
+    print("✅ Shutdown releases running job passed")
+    return True
+
+
+async def test_lease_renewed_while_running():
+    """A job that outlives its lease keeps running because the worker renews the lease"""
+    queue = new_queue(lease_seconds=0.3)
+    release = asyncio.Event()
+
+    async def handler(payload, job):
+        await release.wait()
+        return {"done": True}
+
+    pool = JobWorkerPool(queue, {"test": handler}, workers=1, poll_interval=0.05)
+    pool.start()
+    try:
+        job = await queue.run(queue.enqueue, "test", {})
+        pool.notify()
+        if not await wait_for_status(queue, job.id, RUNNING):
+            print("❌ Job never started")
+            return False
+        for _ in range(5):
+            await asyncio.sleep(0.2)
+            await queue.run(queue.maintain)
+        job = await queue.run(queue.get, job.id)
+        if job.status != RUNNING or job.attempts != 1:
+            print(f"❌ Long job was {job.status} with {job.attempts} attempt(s) past its first lease")
+            return False
+        release.set()
+        if not await wait_for_status(queue, job.id, SUCCEEDED):
+            print("❌ Long job did not succeed")
+            return False
+    finally:
+        await pool.shutdown()
+        queue.close()
+    print("✅ Lease renewal passed")
+    return True
+
+
+async def test_expired_lease_requeued():
+    """A job whose worker stopped renewing is queued again by maintain()"""
+    queue = new_queue(lease_seconds=0.1)
+    try:
+        job = await queue.run(queue.enqueue, "test", {})
+        claimed = await queue.run(queue.claim)
+        await asyncio.sleep(0.2)
+        await queue.run(queue.maintain)
+        job = await queue.run(queue.get, job.id)
+        if job.status != QUEUED or await queue.run(queue.renew, claimed):
+            print(f"❌ Expired job was {job.status}, or its old lease could still be renewed")
+            return False
+    finally:
+        queue.close()
+    print("✅ Expired lease passed")
+    return True
+
+
+async def run_tests():
+    tests = [test_shutdown_releases_running_job, test_lease_renewed_while_running, test_expired_lease_requeued]
+    return [test.__name__ for test in tests if not await test()]
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - Job Queue Tests")
+    print("=" * 50)
+
+    failed = asyncio.run(run_tests())
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All job queue tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Offline tests for admission control: token buckets, the admission gate and client IPs behind proxies
+"""
+
+import asyncio
+import sys
+
+from rate_limit import AdmissionGate, QueueFullError, TokenBucketLimiter, client_ip, client_key, trusted_proxies
+
+PROXY = "10.0.0.1"
+CLIENT = "203.0.113.7"
+
+
+async def test_token_bucket():
+    """Burst, then refusal with a retry hint, refill over time, and separate buckets per key"""
+    limiter = TokenBucketLimiter("test", rate_per_minute=6000, burst=3)
+    if [await limiter.acquire("a") for _ in range(3)] != [0, 0, 0]:
+        print("❌ Burst was not allowed")
+        return False
+    retry_after = await limiter.acquire("a")
+    if not 0 < retry_after <= 0.01 + 1e-6:
+        print(f"❌ Empty bucket gave retry_after={retry_after}")
+        return False
+    if await limiter.acquire("b"):
+        print("❌ Another key shared the empty bucket")
+        return False
+    await asyncio.sleep(0.025)
+    if await limiter.acquire("a"):
+        print("❌ Bucket did not refill")
+        return False
+    if not await limiter.acquire("a", cost=5) or await limiter.acquire("a"):
+        print("❌ A cost above the burst was allowed, or its refusal spent tokens")
+        return False
+    if await TokenBucketLimiter("off", rate_per_minute=0, burst=1).acquire("a", cost=100):
+        print("❌ Disabled limiter refused a call")
+        return False
+    bounded = TokenBucketLimiter("bounded", rate_per_minute=1, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        await bounded.acquire(key)
+    if bounded.info()["keys"] != 2:
+        print(f"❌ Limiter kept {bounded.info()['keys']} buckets with max_keys=2")
+        return False
+    print("✅ Token bucket passed")
+    return True
+
+
+async def test_admission_gate_queue_full():
+    """Callers beyond max_in_flight wait up to max_queue deep; the rest are refused at once"""
+    gate = AdmissionGate("test", max_in_flight=1, max_queue=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with gate.slot():
+            await release.wait()
+
+    holder, waiter = asyncio.ensure_future(hold()), asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    try:
+        async with gate.slot():
+            pass
+        print("❌ Third caller was admitted past a full queue")
+        return False
+    except QueueFullError:
+        pass
+    release.set()
+    await asyncio.gather(holder, waiter)
+    info = gate.info()
+    if (info["allowed"], info["rejected"], info["in_flight"], info["waiting"]) != (2, 1, 0, 0):
+        print(f"❌ Gate counters off after the queue drained: {info}")
+        return False
+    print("✅ Admission gate queue full passed")
+    return True
+
+
+async def test_admission_gate_timeout():
+    """A queued caller that times out gives up its place without leaking a slot"""
+    gate = AdmissionGate("test", max_in_flight=1, max_queue=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with gate.slot():
+            await release.wait()
+
+    async def queued():
+        async with gate.slot():
+            pass
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    try:
+        await asyncio.wait_for(queued(), 0.05)
+        print("❌ Queued caller got a held slot")
+        return False
+    except asyncio.TimeoutError:
+        pass
+    if gate.waiting:
+        print("❌ Timed-out caller still counted as waiting")
+        return False
+    # Its place in the queue is free again, and the slot comes back once the holder leaves
+    waiter = asyncio.ensure_future(queued())
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.wait_for(asyncio.gather(holder, waiter), 1)
+    if gate.in_flight or gate.busy:
+        print(f"❌ Slot leaked after a timeout: {gate.info()}")
+        return False
+    print("✅ Admission gate timeout passed")
+    return True
+
+
+async def test_spoofed_forwarded_for():
+    """Client-written X-Forwarded-For hops do not buy a fresh bucket"""
+    for spec in ("*", "10.0.0.0/8"):
+        proxies = trusted_proxies(spec)
+        limiter = TokenBucketLimiter("client", rate_per_minute=1, burst=2)
+        allowed = 0
+        for attempt in range(5):
+            # The proxy appends the address it saw after whatever the client sent
+            forwarded_for = f"198.51.100.{attempt}, {CLIENT}"
+            host = client_ip(PROXY, forwarded_for, proxies)
+            if host != CLIENT:
+                print(f"❌ FORWARDED_ALLOW_IPS={spec} took {host} from {forwarded_for!r}")
+                return False
+            if not await limiter.acquire(client_key(None, host)):
+                allowed += 1
+        if allowed != 2:
+            print(f"❌ FORWARDED_ALLOW_IPS={spec} let {allowed} spoofed requests through a burst of 2")
+            return False
+    print("✅ Spoofed X-Forwarded-For passed")
+    return True
+
+
+async def test_forwarded_for_trust():
+    """Only trusted proxies' hops are skipped, and untrusted peers cannot set their IP at all"""
+    proxies = trusted_proxies("127.0.0.1, 10.0.0.0/8")
+    cases = [
+        (CLIENT, "1.2.3.4", CLIENT),                       # Direct caller: header ignored
+        (PROXY, f"1.2.3.4, {CLIENT}, 10.0.0.2", CLIENT),    # Two trusted proxies in a row
+        (PROXY, None, PROXY),
+        (PROXY, "not-an-ip", PROXY),
+    ]
+    for peer, forwarded_for, expected in cases:
+        host = client_ip(peer, forwarded_for, proxies)
+        if host != expected:
+            print(f"❌ Peer {peer} with {forwarded_for!r} gave {host}, expected {expected}")
+            return False
+    print("✅ X-Forwarded-For trust passed")
+    return True
+
+
+async def run_tests():
+    tests = [test_token_bucket, test_admission_gate_queue_full, test_admission_gate_timeout,
+             test_spoofed_forwarded_for, test_forwarded_for_trust]
+    return [test.__name__ for test in tests if not await test()]
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - Rate Limit Tests")
+    print("=" * 50)
+
+    failed = asyncio.run(run_tests())
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All rate limit tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the per-domain job scraping rules
+Runs every rule against the saved pages in fixtures/job_pages; no server or network needed
+"""
+
+import os
+import sys
+
+from job_scraper import (ScrapingRules, Selector, extract_job_description, job_posting_description,
+                         parse_job_description_html, scraping_rules)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "job_pages")
+
+# (fixture, page URL, expected rule, expected strategy, text that must appear, text that must not appear)
+FIXTURES = [
+    ("greenhouse.html", "https://boards.greenhouse.io/acme/jobs/4012345", "greenhouse", "selectors",
+     ["Senior Backend Engineer", "PostgreSQL and Redis", "Requirements\n"], ["Upload your resume", "Apply for this Job"]),
+    ("greenhouse_job_boards.html", "https://job-boards.greenhouse.io/acme/jobs/77", "greenhouse", "selectors",
+     ["Spark, Kafka and Airflow", "Qualifications"], ["Fields marked"]),
+    ("lever.html", "https://jobs.lever.co/globex/1c2d3e4f", "lever", "selectors",
+     ["accessibility and performance", "React and TypeScript", "Jest or Cypress"], ["Berlin", "Jobs powered by Lever"]),
+    ("workday.html", "https://initech.wd5.myworkdayjobs.com/en-US/careers/job/R-10423", "workday", "json_ld",
+     ["Machine Learning Engineer", "Python, PyTorch and scikit-learn"], ["<p>", "&lt;", "enable JavaScript"]),
+    ("indeed.html", "https://www.indeed.com/viewjob?jk=abc123", "indeed", "selectors",
+     ["Terraform and Ansible", "Requirements:"], ["Vandelay"]),
+    ("generic_json_ld.html", "https://careers.hooli.example/jobs/4411", "default", "json_ld",
+     ["Data Analyst", "SQL and Tableau"], ["All rights reserved"]),
+    ("generic_paragraphs.html", "https://piedpiper.example/careers/qa", "default", "paragraphs",
+     ["Selenium and Pytest", "Postman"], []),
+]
+
+
+def load_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def test_rule_selection():
+    """Known hosts and their subdomains go straight to their site rule"""
+    cases = {
+        "https://boards.greenhouse.io/acme/jobs/1": "greenhouse",
+        "https://jobs.lever.co/globex/abc": "lever",
+        "https://acme.wd1.myworkdayjobs.com/External/job/1": "workday",
+        "https://uk.indeed.com/viewjob?jk=1": "indeed",
+        "https://www.indeed.co.uk/viewjob?jk=1": "indeed",
+        "https://notindeed.com/jobs/1": "default",
+        "https://example.com/jobs/1": "default",
+        "not a url": "default",
+    }
+    failures = [(url, scraping_rules.rule_for(url).name, expected)
+                for url, expected in cases.items() if scraping_rules.rule_for(url).name != expected]
+    if failures:
+        print(f"❌ Rule selection failed: {failures}")
+        return False
+    print(f"✅ Rule selection passed ({len(cases)} URLs)")
+    return True
+
+
+def test_fixture_extraction():
+    """Every saved page yields its description through the expected rule and strategy"""
+    passed = True
+    for name, url, rule_name, strategy, present, absent in FIXTURES:
+        rule = scraping_rules.rule_for(url)
+        description, used = extract_job_description(load_fixture(name), rule)
+        problems = []
+        if rule.name != rule_name:
+            problems.append(f"rule {rule.name} != {rule_name}")
+        if used != strategy:
+            problems.append(f"strategy {used} != {strategy}")
+        problems += [f"missing {text!r}" for text in present if text not in description]
+        problems += [f"unexpected {text!r}" for text in absent if text in description]
+        if problems:
+            print(f"❌ {name}: {'; '.join(problems)}")
+            print(f"   Extracted: {description[:200]!r}")
+            passed = False
+        else:
+            print(f"✅ {name}: {rule.name}/{used}, {len(description)} chars")
+    return passed
+
+
+def test_generic_selectors_without_rule():
+    """A known-site page read without its rule falls for the decoy that the rule avoids"""
+    description = parse_job_description_html(load_fixture("greenhouse.html"))
+    if "Upload your resume" not in description:
+        print(f"❌ Generic selectors unexpectedly skipped the decoy: {description[:100]!r}")
+        return False
+    print("✅ Generic selectors still pick the first configured match")
+    return True
+
+
+def test_truncation():
+    """Descriptions are capped at max_chars and parsing stops early"""
+    page = '<div class="job-description">' + "<p>Python and AWS experience required.</p>" * 2000 + "</div>"
+    description, strategy = extract_job_description(page, scraping_rules.default, max_chars=500)
+    if len(description) > 500 or strategy != "default":
+        print(f"❌ Truncation failed: {len(description)} chars via {strategy}")
+        return False
+    print("✅ Truncation passed")
+    return True
+
+
+def test_json_ld_variants():
+    """JobPosting is found in lists and @graph, and non-postings are ignored"""
+    cases = [
+        ('[{"@type": "Organization"}, {"@type": "JobPosting", "description": "Go and Rust"}]', "Go and Rust"),
+        ('{"@type": ["JobPosting"], "description": "<ul><li>Java</li><li>Spring</li></ul>"}', "Java\nSpring"),
+        ('{"@type": "Article", "description": "Not a job"}', ""),
+        ('{not json', ""),
+    ]
+    failures = [(raw, job_posting_description(raw)) for raw, expected in cases if job_posting_description(raw) != expected]
+    if failures:
+        print(f"❌ JSON-LD parsing failed: {failures}")
+        return False
+    print("✅ JSON-LD parsing passed")
+    return True
+
+
+def test_invalid_config():
+    """Unsupported selectors, unknown strategies and duplicate domains are rejected at load time"""
+    bad_configs = [
+        {"rules": [{"name": "bad", "domains": ["x.com"], "selectors": ["div > p"]}]},
+        {"rules": [{"name": "bad", "domains": ["x.com"], "chain": ["selectors", "magic"]}]},
+        {"rules": [{"name": "a", "domains": ["x.com"]}, {"name": "b", "domains": ["x.com"]}]},
+    ]
+    for config in bad_configs:
+        try:
+            ScrapingRules.from_dict(config)
+        except ValueError:
+            continue
+        print(f"❌ Invalid config was accepted: {config}")
+        return False
+    if Selector('[data-qa="job-description"]').attributes != (("data-qa", "job-description"),):
+        print("❌ Attribute selector compiled incorrectly")
+        return False
+    print("✅ Config validation passed")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - Scraping Rules Tests")
+    print("=" * 50)
+
+    tests = [test_rule_selection, test_fixture_extraction, test_generic_selectors_without_rule,
+             test_truncation, test_json_ld_variants, test_invalid_config]
+    failed = [test.__name__ for test in tests if not test()]
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All scraping rule tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Offline tests for request coalescing: callers share one in-flight call and its outcome
+"""
+
+import asyncio
+import sys
+
+from single_flight import SingleFlight
+
+
+class Upstream:
+    """A call the test finishes by hand, counting how often it was started"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+        self.error = None
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return "result"
+
+
+async def start_callers(flight: SingleFlight, upstream: Upstream, count: int):
+    tasks = [asyncio.ensure_future(flight.do("key", upstream)) for _ in range(count)]
+    await asyncio.sleep(0)
+    return tasks
+
+
+async def test_follower_cancellation():
+    """A follower that goes away leaves the leader and the shared call running"""
+    flight, upstream = SingleFlight("test"), Upstream()
+    leader, follower = await start_callers(flight, upstream, 2)
+    follower.cancel()
+    await asyncio.gather(follower, return_exceptions=True)
+    upstream.release.set()
+    result = await leader
+    if result != "result" or upstream.calls != 1 or upstream.cancelled:
+        print(f"❌ Leader got {result!r} after {upstream.calls} call(s), cancelled={upstream.cancelled}")
+        return False
+    print("✅ Follower cancellation passed")
+    return True
+
+
+async def test_leader_cancellation():
+    """The leader going away does not take the followers' result with it"""
+    flight, upstream = SingleFlight("test"), Upstream()
+    leader, *followers = await start_callers(flight, upstream, 3)
+    leader.cancel()
+    await asyncio.gather(leader, return_exceptions=True)
+    upstream.release.set()
+    results = await asyncio.gather(*followers)
+    if results != ["result", "result"] or upstream.cancelled:
+        print(f"❌ Followers got {results} with the leader cancelled")
+        return False
+    print("✅ Leader cancellation passed")
+    return True
+
+
+async def test_last_caller_cancels():
+    """The shared call stops once nobody is waiting for it"""
+    flight, upstream = SingleFlight("test"), Upstream()
+    tasks = await start_callers(flight, upstream, 2)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+    if not upstream.cancelled or flight.info()["in_flight"]:
+        print("❌ Abandoned call kept running")
+        return False
+    print("✅ Last caller cancels passed")
+    return True
+
+
+async def test_leader_failure_reaches_followers():
+    """Every caller sees the shared call's exception, and the next call starts afresh"""
+    flight, upstream = SingleFlight("test"), Upstream()
+    upstream.error = ValueError("upstream failed")
+    tasks = await start_callers(flight, upstream, 3)
+    upstream.release.set()
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    if not all(isinstance(outcome, ValueError) for outcome in outcomes) or upstream.calls != 1:
+        print(f"❌ Callers got {outcomes} from {upstream.calls} call(s)")
+        return False
+    upstream.error = None
+    if await flight.do("key", upstream) != "result" or upstream.calls != 2:
+        print("❌ A failed call was reused")
+        return False
+    print("✅ Leader failure passed")
+    return True
+
+
+async def run_tests():
+    tests = [test_follower_cancellation, test_leader_cancellation, test_last_caller_cancels,
+             test_leader_failure_reaches_followers]
+    return [test.__name__ for test in tests if not await test()]
+
+
+def main():
+    """Run all tests"""
+    print("🧪 AI Resume Tailor - Single Flight Tests")
+    print("=" * 50)
+
+    failed = asyncio.run(run_tests())
+
+    print()
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(failed)}")
+        sys.exit(1)
+    print("🎉 All single flight tests passed!")
+
+
+if __name__ == "__main__":
+    main()
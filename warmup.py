@@ -0,0 +1,167 @@
+"""
+Startup warm-up and keep-warm: load the skills taxonomy, start the worker processes and make the model
+resident before the instance reports ready, then ping the model whenever traffic has been idle
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Dict, Optional
+
+from circuit_breaker import OPEN, jittered_backoff
+from executors import StageExecutor
+from inference import InferenceBackend, InferenceError
+from optimizer import extract_skills_from_job_desc, timed_resume_optimization
+
+logger = logging.getLogger(__name__)
+
+# Warm-up configuration
+WARMUP_MODEL_DEADLINE = float(os.getenv("WARMUP_MODEL_DEADLINE", 300))  # Report ready without a warm model after this; 0 skips the model
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", 5))  # First delay between failed model warm-ups, doubled each time
+KEEP_WARM_INTERVAL = float(os.getenv("KEEP_WARM_INTERVAL", 240))  # Ping the model after this long without a call; 0 disables
+
+WARMUP_RESUME = """Jane Doe
+Software Engineer
+
+PROFESSIONAL EXPERIENCE
+Backend Engineer, Example Corp (2020 - Present)
+- Built REST APIs in Python and Django serving 1M requests a day
+- Moved deployments to Docker on AWS
+
+SKILLS
+Python, Django, PostgreSQL, Docker, AWS
+"""
+WARMUP_JOB_DESC = ("Senior Python developer to build FastAPI services on AWS with PostgreSQL, Redis, Docker and "
+                   "Kubernetes. Strong communication and problem solving skills.")
+
+
+class Warmup:
+    """
+    Runs the warm-up steps in the background after startup and reports readiness once they finish.
+    A model that is still not warm after model_deadline does not hold readiness back: requests are
+    answered by the rule engine until it is.
+    """
+
+    def __init__(self, backend: InferenceBackend, executor: StageExecutor,
+                 model_deadline: float = WARMUP_MODEL_DEADLINE, retry_seconds: float = WARMUP_RETRY_SECONDS,
+                 keep_warm_interval: float = KEEP_WARM_INTERVAL):
+        self.backend = backend
+        self.executor = executor
+        self.model_deadline = model_deadline
+        self.retry_seconds = retry_seconds
+        self.keep_warm_interval = keep_warm_interval
+        self.steps: Dict[str, dict] = {}
+        self.ready = False
+        self.model_warm = False
+        self.started_at: Optional[float] = None
+        self.ready_after: Optional[float] = None
+        self.pings = 0
+        self.ping_failures = 0
+        self.last_ping_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def warms_model(self) -> bool:
+        return self.backend.generative and self.model_deadline > 0
+
+    def start(self) -> None:
+        """Start warming up in the background (called from the app lifespan)"""
+        if self._task is None:
+            self.started_at = time.monotonic()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        await self._step("skills", self.executor.run_io("warmup", extract_skills_from_job_desc, WARMUP_JOB_DESC))
+        # One task per worker so every process is forked and has run the optimizer before the first request
+        await self._step("workers", asyncio.gather(*(
+            self.executor.run_cpu("warmup", timed_resume_optimization, WARMUP_RESUME, WARMUP_JOB_DESC)
+            for _ in range(max(1, self.executor.process_workers))
+        )))
+        if self.warms_model:
+            await self._warm_model()
+        self.ready = True
+        self.ready_after = time.monotonic() - self.started_at
+        logger.info(f"Warm-up finished in {self.ready_after:.1f}s (model warm: {self.model_warm})")
+        if self.warms_model and self.keep_warm_interval > 0:
+            await self._keep_warm()
+
+    async def _step(self, name: str, work: Awaitable) -> bool:
+        step = self.steps[name] = {"status": "running", "seconds": None, "error": None}
+        started = time.perf_counter()
+        try:
+            await work
+        except Exception as e:
+            # A failed step is logged and skipped; the request path recovers on its own (e.g. pool restarts)
+            logger.error(f"Warm-up step {name} failed: {str(e)}")
+            step.update(status="failed", error=str(e))
+            return False
+        else:
+            step["status"] = "ok"
+            return True
+        finally:
+            step["seconds"] = round(time.perf_counter() - started, 3)
+
+    async def _warm_model(self) -> None:
+        deadline = time.monotonic() + self.model_deadline
+        attempt = 0
+        while not await self._step("model", self.backend.warm_up()):
+            delay = jittered_backoff(attempt, self.retry_seconds, 60)
+            if time.monotonic() + delay >= deadline:
+                logger.warning(f"{self.backend.name} model is not warm after {self.model_deadline:.0f}s, "
+                               f"reporting ready and serving the rule engine until it is")
+                return
+            attempt += 1
+            await asyncio.sleep(delay)
+        self.model_warm = True
+        self.last_ping_at = time.time()
+
+    async def _keep_warm(self) -> None:
+        while True:
+            # Only ping when no call has reached the model for a whole interval
+            last_used = max(self.backend.last_success_at or 0.0, self.last_ping_at or 0.0)
+            idle = time.time() - last_used
+            if idle < self.keep_warm_interval:
+                await asyncio.sleep(self.keep_warm_interval - idle)
+                continue
+            breaker = self.backend.breaker
+            if breaker is not None and breaker.state == OPEN:
+                # The upstream is known to be down; the breaker's own probes find out when it is back
+                await asyncio.sleep(breaker.retry_after() or self.keep_warm_interval)
+                continue
+            self.pings += 1
+            self.last_ping_at = time.time()
+            try:
+                await self.backend.warm_up()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Any failure, expected or not, must not end the loop and leave the model to go cold
+                self.ping_failures += 1
+                self.model_warm = False
+                if isinstance(e, InferenceError):
+                    logger.warning(f"Keep-warm ping to {self.backend.name} failed: {str(e)}")
+                else:
+                    logger.exception(f"Keep-warm ping to {self.backend.name} failed unexpectedly")
+            else:
+                self.model_warm = True
+
+    def info(self) -> dict:
+        return {
+            "ready": self.ready,
+            "ready_after_seconds": round(self.ready_after, 2) if self.ready_after is not None else None,
+            "model_warm": self.model_warm if self.warms_model else None,
+            "steps": self.steps,
+            "keep_warm_interval_seconds": self.keep_warm_interval if self.warms_model else None,
+            "keep_warm_pings": self.pings,
+            "keep_warm_failures": self.ping_failures,
+        }